@@ -0,0 +1 @@
+"""效能量測腳本，以 `python -m thsr_ticket.benchmark.<name>` 執行"""
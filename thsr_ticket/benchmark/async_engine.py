@@ -0,0 +1,81 @@
+"""同步與非同步訂票流程的端對端耗時比較（使用替身伺服器）
+
+    python -m thsr_ticket.benchmark.async_engine [runs] [latency_ms]
+
+兩種流程都以相同的 STEP_DELAY 執行完整的三步驟訂票，第一次驗證碼故意答錯以包含一次重試。
+輸出每次訂票的平均與中位數耗時（秒）。
+"""
+import contextlib
+import io
+import statistics
+import sys
+import time
+from typing import Callable, List
+
+from thsr_ticket.configs.user_config import parse_config
+from thsr_ticket.controller.async_booking_flow import AsyncAutoBookingFlow
+from thsr_ticket.controller.auto_booking_flow import AutoBookingFlow
+from thsr_ticket.remote.async_http_request import AsyncHTTPRequest
+from thsr_ticket.remote.http_request import HTTPRequest
+from thsr_ticket.standin import StandinConfig, StandinServer
+from thsr_ticket.standin.captcha import plain_captcha
+
+CONFIG = parse_config({
+    "start_station": "台北",
+    "dest_station": "左營",
+    "outbound_date": "2030-01-25",
+    "outbound_time": "06:00",
+    "personal_id": "A123456789",
+    "phone": "0912345678",
+    "tickets": {"adult": 1},
+})
+
+
+def _solver(server: StandinServer, client: HTTPRequest) -> Callable[[bytes, bool], str]:
+    attempts = []
+
+    def solve(img: bytes, force_manual: bool) -> str:
+        attempts.append(force_manual)
+        if len(attempts) == 1:
+            return "0000"
+        return server.captcha_answer(client.sess.cookies["JSESSIONID"])
+    return solve
+
+
+def run_sync(server: StandinServer) -> None:
+    client = HTTPRequest(base_url=server.base_url)
+    AutoBookingFlow(client, _solver(server, client)).book(CONFIG)
+
+
+def run_async(server: StandinServer) -> None:
+    client = AsyncHTTPRequest(base_url=server.base_url)
+    AsyncAutoBookingFlow(client, _solver(server, client.client)).book(CONFIG)
+
+
+def measure(engine: Callable[[StandinServer], None], server: StandinServer, runs: int) -> List[float]:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine(server)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main(runs: int = 5, latency_ms: int = 80) -> None:
+    config = StandinConfig(
+        latency=latency_ms / 1000,
+        jitter=latency_ms / 2000,
+        page_padding=60000,
+        seed=0,
+    )
+    with StandinServer(config, captcha_factory=plain_captcha) as server:
+        print(f"latency {latency_ms} ms (+0~{latency_ms // 2} ms jitter), {runs} runs")
+        print(f"{'engine':<10}{'mean (s)':>12}{'median (s)':>12}")
+        for name, engine in (("sync", run_sync), ("async", run_async)):
+            times = measure(engine, server, runs)
+            print(f"{name:<10}{statistics.mean(times):>12.3f}{statistics.median(times):>12.3f}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,56 @@
+"""第一頁送出參數的組成成本（每次驗證碼嘗試）
+
+    python -m thsr_ticket.benchmark.form_params [repeat]
+
+- model + json：每次重建 `BookingModel`（執行所有驗證器），再以 `json()` / `json.loads()` 取得參數
+- model + params：每次重建 `BookingModel`，以 `params()` 直接取得參數
+- retry copy：沿用已驗證的 model，只以 `with_security_code()` 換上新驗證碼
+- plan：預先編譯的 `BookingPlan` 填入插槽
+"""
+import json
+import sys
+from typing import Any, Dict
+
+from thsr_ticket.benchmark.pages import time_per_call
+from thsr_ticket.configs.user_config import parse_config
+from thsr_ticket.configs.web.param_schema import BookingModel
+from thsr_ticket.model.booking_plan import compile_plan
+from thsr_ticket.view_model.booking_page import BookingPageDefaults
+
+CONFIG = parse_config({
+    "start_station": "台北",
+    "dest_station": "左營",
+    "outbound_date": "2030-01-25",
+    "outbound_time": "06:00",
+    "personal_id": "A123456789",
+    "tickets": {"adult": 2, "child": 1},
+})
+DEFAULTS = BookingPageDefaults(security_img_src="", seat_prefer="radio17", types_of_trip=0, search_by="radio31")
+FORM_DATA: Dict[str, Any] = {
+    "seat_prefer": DEFAULTS.seat_prefer,
+    "types_of_trip": DEFAULTS.types_of_trip,
+    "search_by": DEFAULTS.search_by,
+    "security_code": "AB12",
+    **{name: value for name, value in CONFIG.items() if name in BookingModel.__fields__},
+}
+
+
+def main(repeat: int = 2000) -> None:
+    model = BookingModel(**FORM_DATA)
+    plan = compile_plan(CONFIG)
+    cases = {
+        "model + json": lambda: json.loads(BookingModel(**FORM_DATA).json(by_alias=True)),
+        "model + params": lambda: BookingModel(**FORM_DATA).params(),
+        "retry copy": lambda: model.with_security_code("AB12").params(),
+        "plan": lambda: plan.booking_params("AB12", DEFAULTS),
+    }
+    baseline = None
+    print(f"{'params per attempt':<24}{'us/attempt':>14}{'speedup':>14}")
+    for label, build in cases.items():
+        cost = time_per_call(build, repeat) * 1000
+        baseline = baseline or cost
+        print(f"{label:<24}{cost:>14.2f}{baseline / cost:>14.1f}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,90 @@
+"""表單驗證的每次呼叫成本
+
+    python -m thsr_ticket.benchmark.form_validation [repeat]
+
+比較 `jsonschema.validate()`（每次重新選擇驗證器並檢查 schema）與預先編譯的 `CompiledSchema`，
+以及 `BookingForm._validate_value` 原本逐一比對 enum 串列與 frozenset 查表的差異。
+"""
+import sys
+from typing import Any, Dict
+
+import jsonschema
+
+from thsr_ticket.benchmark.pages import time_per_call
+from thsr_ticket.configs.web.param_schema import (
+    BOOKING_SCHEMA,
+    BOOKING_VALIDATOR,
+    CONFIRM_TICKET_SHEMA,
+    CONFIRM_TICKET_VALIDATOR,
+    CONFIRM_TRAIN_SCHEMA,
+    CONFIRM_TRAIN_VALIDATOR,
+    BookingModel,
+)
+from thsr_ticket.model.web.booking_form.booking_form import BookingForm
+from thsr_ticket.model.web.confirm_ticket import ConfirmTicket
+from thsr_ticket.model.web.confirm_train import ConfirmTrain
+
+
+def _booking_form() -> BookingForm:
+    form = BookingForm()
+    form.start_station = 2
+    form.dest_station = 12
+    form.search_by = "radio31"
+    form.seat_prefer = "radio17"
+    form.outbound_date = "2030/01/25"
+    form.outbound_time = "600A"
+    form.security_code = "AB12"
+    return form
+
+
+def _confirm_train() -> ConfirmTrain:
+    train = ConfirmTrain()
+    train.selection = "radio21"
+    return train
+
+
+def _confirm_ticket() -> ConfirmTicket:
+    ticket = ConfirmTicket()
+    ticket.personal_id = "A123456789"
+    ticket.member_radio = "radio2"
+    return ticket
+
+
+def _list_scan(proper: str, value: object) -> bool:
+    enums = BOOKING_SCHEMA["properties"][proper].get("enum")
+    return not enums or value in enums
+
+
+def main(repeat: int = 2000) -> None:
+    booking = dict(_booking_form().get_params(val=False))
+    booking.pop("ticketPanel:rows:5:ticketAmount")  # BOOKING_SCHEMA 中沒有此欄位
+    train = _confirm_train().get_params(val=False)
+    ticket = _confirm_ticket().get_params(val=False)
+    cases = [
+        ("booking", BOOKING_SCHEMA, BOOKING_VALIDATOR, booking),
+        ("confirm_train", CONFIRM_TRAIN_SCHEMA, CONFIRM_TRAIN_VALIDATOR, train),
+        ("confirm_ticket", CONFIRM_TICKET_SHEMA, CONFIRM_TICKET_VALIDATOR, ticket),
+    ]
+
+    print(f"{'validate (us/call)':<24}{'jsonschema':>14}{'compiled':>14}{'speedup':>14}")
+    for label, schema, validator, params in cases:
+        before = time_per_call(lambda: jsonschema.validate(params, schema=schema), repeat // 10) * 1000
+        after = time_per_call(lambda: validator.validate(params), repeat) * 1000
+        print(f"{label:<24}{before:>14.2f}{after:>14.2f}{before / after:>14.1f}")
+
+    print(f"\n{'enum check (us/call)':<24}{'list scan':>14}{'frozenset':>14}{'speedup':>14}")
+    for proper, value in [("toTimeTable", "1130P"), ("selectDestinationStation", 12)]:
+        before = time_per_call(lambda: _list_scan(proper, value), repeat * 10) * 1000
+        after = time_per_call(lambda: BOOKING_VALIDATOR.allows(proper, value), repeat * 10) * 1000
+        print(f"{proper:<24}{before:>14.3f}{after:>14.3f}{before / after:>14.1f}")
+
+    fields: Dict[str, Any] = dict(
+        start_station=2, dest_station=12, search_by="radio31", types_of_trip=0, outbound_date="2030-01-25",
+        outbound_time="600A", security_code="AB12", seat_prefer="radio17",
+    )
+    cost = time_per_call(lambda: BookingModel(**fields), repeat) * 1000
+    print(f"\nBookingModel construction (precompiled regexes): {cost:.2f} us/call")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
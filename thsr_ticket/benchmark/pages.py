@@ -0,0 +1,59 @@
+"""量測用的頁面樣本"""
+import os
+import re
+import time
+from typing import Callable, Dict
+
+from thsr_ticket import MODULE_PATH
+
+FIXTURE_DIR = os.path.join(MODULE_PATH, "unittest", "fixtures")
+
+SAMPLE_PAGES = {
+    "booking_page": "booking_page.html",
+    "avail_trains": "avail_trains.html",
+    "confirm_ticket": "confirm_ticket.html",
+    "booking_result": "booking_result.html",
+    "error_page": "error_page.html",
+}
+
+_TRAIN_ITEM = re.compile(rb'<label class="uk-radio-label result-item">.*?</label>', re.S)
+
+
+def load_page(name: str) -> bytes:
+    with open(os.path.join(FIXTURE_DIR, SAMPLE_PAGES[name]), "rb") as f:
+        return f.read()
+
+
+def synthetic_train_page(num_trains: int) -> bytes:
+    """複製班次樣本，產生含有 `num_trains` 筆班次的第二頁"""
+    html = load_page("avail_trains")
+    items = _TRAIN_ITEM.findall(html)
+    first = _TRAIN_ITEM.search(html)
+    last = list(_TRAIN_ITEM.finditer(html))[-1]
+    body = b"\n".join(items[i % len(items)] for i in range(num_trains))
+    return html[:first.start()] + body + html[last.end():]
+
+
+def synthetic_result_page(padding: int) -> bytes:
+    """在結果頁面前後插入 `padding` 個無關元素，模擬較大的頁面"""
+    html = load_page("booking_result")
+    filler = b"".join(
+        b'<div class="ad-block"><p class="note">notice %d</p><span>filler</span></div>' % i
+        for i in range(padding)
+    )
+    head, sep, tail = html.partition(b'<div id="content" class="uk-container">')
+    tail_body, sep2, rest = tail.rpartition(b"</body>")
+    return head + sep + filler + tail_body + filler + sep2 + rest
+
+
+def time_per_call(func: Callable[[], object], repeat: int) -> float:
+    """回傳每次呼叫的平均毫秒數"""
+    func()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def format_row(label: str, cols: Dict[str, float]) -> str:
+    return f"{label:<24}" + "".join(f"{v:>14.3f}" for v in cols.values())
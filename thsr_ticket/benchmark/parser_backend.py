@@ -0,0 +1,50 @@
+"""各 HTML 解析器後端的效能比較
+
+    python -m thsr_ticket.benchmark.parser_backend [repeat]
+
+輸出每個頁面在各後端的解析加萃取時間（ms/page）。
+"""
+import sys
+from typing import Callable, Dict
+
+from thsr_ticket.benchmark.pages import (
+    SAMPLE_PAGES,
+    format_row,
+    load_page,
+    synthetic_train_page,
+    time_per_call,
+)
+from thsr_ticket.controller.booking_engine import _parse_passenger_id_fields
+from thsr_ticket.view_model.avail_trains import AvailTrains
+from thsr_ticket.view_model.booking_result import BookingResult
+from thsr_ticket.view_model.error_feedback import ErrorFeedback
+from thsr_ticket.view_model.parsed_page import ParsedPage
+from thsr_ticket.view_model.parser_backend import available_backends
+
+EXTRACTORS: Dict[str, Callable[[ParsedPage], object]] = {
+    "booking_page": lambda page: page.soup,
+    "avail_trains": lambda page: AvailTrains().parse(page),
+    "confirm_ticket": _parse_passenger_id_fields,
+    "booking_result": lambda page: BookingResult().parse(page),
+    "error_page": lambda page: ErrorFeedback().parse(page),
+    "avail_trains_x40": lambda page: AvailTrains().parse(page),
+}
+
+
+def main(repeat: int = 200) -> None:
+    pages = {name: load_page(name) for name in SAMPLE_PAGES}
+    pages["avail_trains_x40"] = synthetic_train_page(40)
+    backends = available_backends()
+
+    print(f"{'page (ms/page)':<24}" + "".join(f"{b:>14}" for b in backends))
+    for name, html in pages.items():
+        extract = EXTRACTORS[name]
+        cols = {
+            backend: time_per_call(lambda: extract(ParsedPage(html, backend)), repeat)
+            for backend in backends
+        }
+        print(format_row(name, cols))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
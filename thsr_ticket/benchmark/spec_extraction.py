@@ -0,0 +1,63 @@
+"""單次走訪萃取器與逐欄位 find() 的效能比較
+
+    python -m thsr_ticket.benchmark.spec_extraction [repeat]
+
+在結果頁面中插入不同數量的無關元素，比較兩種方式萃取 `BOOKING_RESULT` 全部欄位的時間。
+逐欄位 find() 的成本約為「欄位數 × 頁面大小」，單次走訪則只與頁面大小成正比。
+"""
+import sys
+from typing import Any, Dict, List, Optional
+
+from bs4 import BeautifulSoup
+from bs4.element import Tag
+
+from thsr_ticket.benchmark.pages import format_row, synthetic_result_page, synthetic_train_page, time_per_call
+from thsr_ticket.configs.web.parse_avail_train import ParseAvailTrain
+from thsr_ticket.configs.web.parse_html_element import BOOKING_RESULT
+from thsr_ticket.view_model.avail_trains import _TRAIN_SPEC
+from thsr_ticket.view_model.parsed_page import ParsedPage
+from thsr_ticket.view_model.spec_compiler import compile_spec
+
+PADDINGS = (0, 500, 2000, 8000)
+TRAIN_COUNTS = (10, 40, 160)
+
+
+def find_each_field(soup: BeautifulSoup) -> Dict[str, Optional[Tag]]:
+    return {field: soup.find(**spec) for field, spec in BOOKING_RESULT.items()}
+
+
+def find_each_train(soup: BeautifulSoup) -> List[List[Optional[Tag]]]:
+    cond = ParseAvailTrain()
+    specs: List[Dict[str, Any]] = [cond.train_id, cond.depart, cond.arrival, cond.duration,
+                                   cond.early_bird_discount, cond.college_student_discount, cond.form_value]
+    group: Dict[str, Any] = cond.from_html
+    return [[item.find(**spec) for spec in specs] for item in soup.find_all("label", **group)]
+
+
+def main(repeat: int = 20) -> None:
+    compiled = compile_spec(BOOKING_RESULT)
+    print(f"BOOKING_RESULT ({len(BOOKING_RESULT)} fields), extraction only, tree prebuilt")
+    print(f"{'padding (ms)':<24}{'find() each':>14}{'single pass':>14}{'speedup':>14}")
+    for padding in PADDINGS:
+        soup = ParsedPage(synthetic_result_page(padding)).soup
+        cols = {
+            "find": time_per_call(lambda: find_each_field(soup), repeat),
+            "compiled": time_per_call(lambda: compiled.extract(soup), repeat),
+        }
+        cols["speedup"] = cols["find"] / cols["compiled"]
+        print(format_row(str(padding), cols))
+
+    print(f"\nAvailTrains ({len(_TRAIN_SPEC.fields)} fields per train)")
+    print(f"{'trains (ms)':<24}{'find() each':>14}{'single pass':>14}{'speedup':>14}")
+    for count in TRAIN_COUNTS:
+        soup = ParsedPage(synthetic_train_page(count)).soup
+        cols = {
+            "find": time_per_call(lambda: find_each_train(soup), repeat),
+            "compiled": time_per_call(lambda: _TRAIN_SPEC.extract_groups(soup), repeat),
+        }
+        cols["speedup"] = cols["find"] / cols["compiled"]
+        print(format_row(str(count), cols))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
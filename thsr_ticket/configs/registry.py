@@ -0,0 +1,78 @@
+"""車站、時刻與票數的對照表
+
+所有轉換在匯入時建立一次，之後都是 O(1) 的查表：
+
+- 車站：網頁表單代碼（`StationMapping`）↔ PTX `StationID` ↔ 中文 / 英文名稱
+- 時刻：24 小時制（"06:00"）↔ 時刻表代碼（`AVAILABLE_TIME_TABLE`，"600A"）
+- 票數：(票種, 張數) ↔ 表單代碼（"2F"）
+
+對照表都是唯讀的 `MappingProxyType`。
+"""
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Tuple
+
+from thsr_ticket.configs.common import AVAILABLE_TIME_TABLE, MAX_TICKET_NUM
+from thsr_ticket.configs.web.enums import StationMapping, TicketType
+
+
+class Station(NamedTuple):
+    web_id: int  # 訂票表單的車站代碼
+    ptx_id: str  # PTX API 的 StationID
+    zh: str
+    en: str  # 與 `StationMapping` 的名稱相同
+
+    @property
+    def mapping(self) -> StationMapping:
+        return StationMapping(self.web_id)
+
+
+_STATION_TABLE = (
+    (StationMapping.Nangang, "0990", "南港"),
+    (StationMapping.Taipei, "1000", "台北"),
+    (StationMapping.Banqiao, "1010", "板橋"),
+    (StationMapping.Taoyuan, "1020", "桃園"),
+    (StationMapping.Hsinchu, "1030", "新竹"),
+    (StationMapping.Miaoli, "1035", "苗栗"),
+    (StationMapping.Taichung, "1040", "台中"),
+    (StationMapping.Changhua, "1043", "彰化"),
+    (StationMapping.Yunlin, "1047", "雲林"),
+    (StationMapping.Chiayi, "1050", "嘉義"),
+    (StationMapping.Tainan, "1060", "台南"),
+    (StationMapping.Zuouing, "1070", "左營"),
+)
+
+STATIONS: Tuple[Station, ...] = tuple(
+    Station(web_id=mapping.value, ptx_id=ptx_id, zh=zh, en=mapping.name) for mapping, ptx_id, zh in _STATION_TABLE
+)
+STATION_BY_WEB_ID: Mapping[int, Station] = MappingProxyType({s.web_id: s for s in STATIONS})
+STATION_BY_PTX_ID: Mapping[str, Station] = MappingProxyType({s.ptx_id: s for s in STATIONS})
+# 中文名稱、英文名稱與代碼字串（"2"）都可查詢
+STATION_BY_NAME: Mapping[str, Station] = MappingProxyType({
+    **{str(s.web_id): s for s in STATIONS},
+    **{s.en: s for s in STATIONS},
+    **{s.zh: s for s in STATIONS},
+})
+
+
+def _slot_to_time(slot: str) -> str:
+    """時刻表代碼轉為 24 小時制，如 "1201A" → "00:01"、"1200N" → "12:00"、"130P" → "13:30" """
+    digits, suffix = slot[:-1], slot[-1]
+    hour, minute = int(digits[:-2]), int(digits[-2:])
+    if suffix == "A" and hour == 12:
+        hour = 0
+    elif suffix == "P" and hour != 12:
+        hour += 12
+    return f"{hour:02d}:{minute:02d}"
+
+
+TIME_SLOTS: Tuple[str, ...] = tuple(AVAILABLE_TIME_TABLE)
+TIME_BY_SLOT: Mapping[str, str] = MappingProxyType({slot: _slot_to_time(slot) for slot in TIME_SLOTS})
+SLOT_BY_TIME: Mapping[str, str] = MappingProxyType({time: slot for slot, time in TIME_BY_SLOT.items()})
+
+TICKET_COUNTS = range(MAX_TICKET_NUM + 1)
+TICKET_CODE: Mapping[Tuple[TicketType, int], str] = MappingProxyType({
+    (ticket_type, count): f"{count}{ticket_type.value}" for ticket_type in TicketType for count in TICKET_COUNTS
+})
+TICKET_BY_CODE: Mapping[str, Tuple[TicketType, int]] = MappingProxyType({
+    code: key for key, code in TICKET_CODE.items()
+})
@@ -3,25 +3,20 @@ import json
 import os
 from typing import Optional
 
-from .common import AVAILABLE_TIME_TABLE
-from .web.enums import StationMapping, TicketType
+from .registry import (
+    SLOT_BY_TIME,
+    STATION_BY_NAME,
+    STATION_BY_WEB_ID,
+    STATIONS,
+    TICKET_CODE,
+    TICKET_COUNTS,
+    TIME_BY_SLOT,
+)
+from .web.enums import BookingMethod, TicketType, TripType
 
 
 # 車站中文名稱對照表（用於顯示）
-STATION_CHINESE_NAME = {
-    StationMapping.Nangang: "南港",
-    StationMapping.Taipei: "台北",
-    StationMapping.Banqiao: "板橋",
-    StationMapping.Taoyuan: "桃園",
-    StationMapping.Hsinchu: "新竹",
-    StationMapping.Miaoli: "苗栗",
-    StationMapping.Taichung: "台中",
-    StationMapping.Changhua: "彰化",
-    StationMapping.Yunlin: "雲林",
-    StationMapping.Chiayi: "嘉義",
-    StationMapping.Tainan: "台南",
-    StationMapping.Zuouing: "左營",
-}
+STATION_CHINESE_NAME = {station.mapping: station.zh for station in STATIONS}
 
 # 票種中文名稱對照表
 TICKET_TYPE_NAME_MAP = {
@@ -55,6 +50,27 @@ def load_config() -> Optional[dict]:
         return json.load(f)
 
 
+def load_itineraries(config: dict) -> list:
+    """取得設定檔中的所有行程
+
+    `itineraries` 列出多個行程時，其餘頂層欄位（如 personal_id、phone）為各行程的共用設定，
+    行程內的欄位優先；沒有 `itineraries` 時整份設定即為唯一的行程。
+
+    Returns:
+        list: 各行程的原始設定（尚未解析）
+
+    Raises:
+        ValueError: `itineraries` 不是非空的列表
+    """
+    if "itineraries" not in config:
+        return [config]
+    itineraries = config["itineraries"]
+    if not isinstance(itineraries, list) or not itineraries:
+        raise ValueError("itineraries 必須是非空的行程列表")
+    shared = {key: value for key, value in config.items() if key != "itineraries"}
+    return [{**shared, **itinerary} for itinerary in itineraries]
+
+
 def station_name_to_code(name: str) -> int:
     """將車站名稱轉換為車站代碼
 
@@ -67,24 +83,18 @@ def station_name_to_code(name: str) -> int:
     Raises:
         ValueError: 若車站名稱無效
     """
-    # 嘗試用中文名稱查詢（從 STATION_CHINESE_NAME 反向查詢）
-    for station, chinese_name in STATION_CHINESE_NAME.items():
-        if name == chinese_name:
-            return station.value
-
-    # 嘗試用英文名稱查詢 StationMapping enum
-    try:
-        return StationMapping[name].value
-    except KeyError:
-        pass
+    # 中文名稱、英文名稱（StationMapping）或代碼字串
+    station = STATION_BY_NAME.get(str(name))
+    if station is not None:
+        return station.web_id
 
-    # 嘗試直接用數字
+    # 嘗試直接用數字（如 "02"）
     try:
-        code = int(name)
-        if 1 <= code <= 12:
-            return code
+        station = STATION_BY_WEB_ID.get(int(name))
     except ValueError:
-        pass
+        station = None
+    if station is not None:
+        return station.web_id
 
     valid_names = ", ".join(STATION_CHINESE_NAME.values())
     raise ValueError(f"無效的車站名稱: {name}。有效選項: {valid_names}")
@@ -116,28 +126,8 @@ def time_to_system_format(time_str: str) -> str:
     if not (0 <= hour <= 23 and 0 <= minute <= 59):
         raise ValueError(f"無效的時間: {time_str}")
 
-    # 轉換為系統格式
-    if hour == 0:
-        # 00:xx -> 12xxA
-        system_time = f"12{minute:02d}A" if minute > 0 else "1200A"
-        # 特殊處理: 00:01 -> 1201A, 00:30 -> 1230A
-        system_time = f"12{minute:02d}A"
-    elif hour < 12:
-        # 01:00-11:59 -> 時分A
-        system_time = f"{hour}{minute:02d}A" if minute > 0 else f"{hour}00A"
-    elif hour == 12:
-        if minute == 0:
-            system_time = "1200N"
-        else:
-            system_time = f"12{minute:02d}P"
-    else:
-        # 13:00-23:59 -> (時-12)分P
-        h = hour - 12
-        system_time = f"{h}{minute:02d}P" if minute > 0 else f"{h}00P"
-
-    # 驗證是否在可用時間表中
-    if system_time not in AVAILABLE_TIME_TABLE:
-        # 嘗試找最接近的時間
+    system_time = SLOT_BY_TIME.get(f"{hour:02d}:{minute:02d}")
+    if system_time is None:
         available_times = ", ".join(_format_available_times())
         raise ValueError(f"時間 {time_str} 不在可用時間表中。可用時間: {available_times}")
 
@@ -146,10 +136,7 @@ def time_to_system_format(time_str: str) -> str:
 
 def _format_available_times() -> list:
     """將系統時間格式轉回 24 小時制顯示"""
-    result = []
-    for t in AVAILABLE_TIME_TABLE:
-        result.append(system_format_to_time(t))
-    return result
+    return list(TIME_BY_SLOT.values())
 
 
 def system_format_to_time(system_time: str) -> str:
@@ -160,27 +147,14 @@ def system_format_to_time(system_time: str) -> str:
 
     Returns:
         str: 24 小時制時間（如 "06:00", "13:30"）
-    """
-    suffix = system_time[-1]
-    time_part = system_time[:-1]
-
-    if len(time_part) == 3:
-        hour = int(time_part[0])
-        minute = int(time_part[1:])
-    else:
-        hour = int(time_part[:2])
-        minute = int(time_part[2:])
-
-    if suffix == "A":
-        if hour == 12:
-            hour = 0
-    elif suffix == "N":
-        hour = 12
-    elif suffix == "P":
-        if hour != 12:
-            hour += 12
 
-    return f"{hour:02d}:{minute:02d}"
+    Raises:
+        ValueError: 不在可用時間表中的代碼
+    """
+    try:
+        return TIME_BY_SLOT[system_time]
+    except KeyError:
+        raise ValueError(f"無效的時間代碼: {system_time}")
 
 
 def format_ticket_num(count: int, ticket_type: TicketType) -> str:
@@ -192,8 +166,86 @@ def format_ticket_num(count: int, ticket_type: TicketType) -> str:
 
     Returns:
         str: 格式化的票數字串（如 "1F", "0H"）
+
+    Raises:
+        ValueError: 票數超出 0~MAX_TICKET_NUM
     """
-    return f"{count}{ticket_type.value}"
+    try:
+        return TICKET_CODE[(ticket_type, count)]
+    except KeyError:
+        name = TICKET_TYPE_NAME_MAP[ticket_type]
+        raise ValueError(f"無效的{name}票數: {count}（可訂 {TICKET_COUNTS[0]}~{TICKET_COUNTS[-1]} 張）")
+
+
+# 自動選車條件的欄位，見 `view_model.train_ranking.RankingPolicy`
+_TRAIN_POLICY_KEYS = frozenset({
+    "depart_after", "depart_before", "arrive_by", "prefer_discount", "train_ids", "exclude_train_ids",
+    "travel_weight", "depart_weight", "discount_bonus",
+})
+
+
+def _clock_to_minutes(time_str: str, name: str) -> int:
+    """24 小時制時間轉為午夜起算的分鐘數"""
+    parts = str(time_str).split(":")
+    try:
+        hour, minute = (int(part) for part in parts)
+    except ValueError:
+        raise ValueError(f"無效的 {name} 時間: {time_str}，請使用 HH:MM 格式")
+    if not (0 <= hour <= 23 and 0 <= minute <= 59):
+        raise ValueError(f"無效的 {name} 時間: {time_str}")
+    return hour * 60 + minute
+
+
+def _train_ids(values: list, name: str) -> list:
+    try:
+        return sorted({int(value) for value in values})
+    except (TypeError, ValueError):
+        raise ValueError(f"無效的 {name}: {values}，請填寫車次號碼列表")
+
+
+def parse_train_policy(policy: dict) -> dict:
+    """解析自動選車條件（`train_policy`），時刻轉為分鐘數
+
+    結果的鍵與 `RankingPolicy` 的欄位相同，保持可序列化為 JSON。
+
+    Raises:
+        ValueError: 時間、車次或權重格式無效
+    """
+    unknown = set(policy) - _TRAIN_POLICY_KEYS
+    if unknown:
+        raise ValueError(f"未知的選車條件: {', '.join(sorted(unknown))}")
+
+    parsed: dict = {}
+    for key in ("depart_after", "depart_before", "arrive_by"):
+        if policy.get(key):
+            parsed[key] = _clock_to_minutes(policy[key], key)
+    if "prefer_discount" in policy:
+        parsed["prefer_discount"] = bool(policy["prefer_discount"])
+    for key in ("train_ids", "exclude_train_ids"):
+        if policy.get(key):
+            parsed[key] = _train_ids(policy[key], key)
+    for key in ("travel_weight", "depart_weight", "discount_bonus"):
+        if key in policy:
+            value = policy[key]
+            if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+                raise ValueError(f"無效的 {key}: {value}，請填寫非負整數")
+            parsed[key] = value
+    return parsed
+
+
+def parse_train_id(train_id) -> int:
+    """解析依車次訂票的車次號碼（如 "0803" 或 803）
+
+    Raises:
+        ValueError: 不是正整數
+    """
+    try:
+        value = int(str(train_id).strip())
+    except ValueError:
+        value = 0
+    if value <= 0:
+        raise ValueError(f"無效的車次號碼: {train_id}")
+    return value
 
 
 def parse_config(config: dict) -> dict:
@@ -203,11 +255,16 @@ def parse_config(config: dict) -> dict:
         config: 原始設定檔內容
 
     Returns:
-        dict: 解析後的設定，包含轉換後的車站代碼和時間格式
+        dict: 解析後的設定，包含轉換後的車站代碼和時間格式；
+            設定了 `train_id` 時另含依車次訂票的 `search_by` 與 `to_train_id`，
+            設定了 `inbound_date` 時另含去回程的 `types_of_trip`、`inbound_date`、`inbound_time` 等欄位
+
+    Raises:
+        ValueError: 設定內容無效
     """
     tickets = config.get("tickets", {})
 
-    return {
+    parsed = {
         "start_station": station_name_to_code(config["start_station"]),
         "dest_station": station_name_to_code(config["dest_station"]),
         "outbound_date": config["outbound_date"],
@@ -223,4 +280,28 @@ def parse_config(config: dict) -> dict:
         "elder_ticket_num": format_ticket_num(tickets.get("elder", 0), TicketType.ELDER),
         "college_ticket_num": format_ticket_num(tickets.get("college", 0), TicketType.COLLEGE),
         "youth_ticket_num": format_ticket_num(tickets.get("youth", 0), TicketType.YOUTH),
+        "train_policy": parse_train_policy(config.get("train_policy", {})),
+    }
+    if config.get("train_id"):
+        parsed["search_by"] = BookingMethod.TRAIN_ID.value
+        parsed["to_train_id"] = parse_train_id(config["train_id"])
+    if config.get("inbound_date"):
+        parsed.update(_parse_inbound(config, by_train_id="to_train_id" in parsed))
+    return parsed
+
+
+def _parse_inbound(config: dict, by_train_id: bool) -> dict:
+    """去回程的回程設定"""
+    if not config.get("inbound_time"):
+        raise ValueError("購買去回程時需同時填寫 inbound_time")
+    inbound = {
+        "types_of_trip": TripType.ROUND_TRIP.value,
+        "inbound_date": config["inbound_date"],
+        "inbound_time": time_to_system_format(config["inbound_time"]),
+        "return_train_policy": parse_train_policy(config.get("return_train_policy", {})),
     }
+    if by_train_id:
+        if not config.get("inbound_train_id"):
+            raise ValueError("依車次訂購去回程時需同時填寫 inbound_train_id")
+        inbound["back_train_id"] = parse_train_id(config["inbound_train_id"])
+    return inbound
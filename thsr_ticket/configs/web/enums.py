@@ -16,6 +16,16 @@ class StationMapping(Enum):
     Zuouing = 12
 
 
+class BookingMethod(Enum):
+    TIME = 'radio31'  # 依時間搜尋，第二頁選擇班次
+    TRAIN_ID = 'radio33'  # 直接輸入車次號碼，送出後直接進入第三頁
+
+
+class TripType(Enum):
+    ONE_WAY = 0
+    ROUND_TRIP = 1
+
+
 class TicketType(Enum):
     ADULT = 'F'
     CHILD = 'H'
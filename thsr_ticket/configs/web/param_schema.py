@@ -1,6 +1,7 @@
 import re
 from datetime import date, datetime
-from typing import Mapping, Any
+from functools import lru_cache
+from typing import Any, Dict, Mapping, Tuple, Type
 
 from pydantic import (
     BaseModel as PydanticBaseModel,
@@ -8,7 +9,7 @@ from pydantic import (
     validator
 )
 
-from thsr_ticket.configs.common import AVAILABLE_TIME_TABLE
+from thsr_ticket.configs.web.schema_validator import compile_schema
 
 
 BOOKING_SCHEMA: Mapping[str, Any] = {
@@ -92,7 +93,8 @@ CONFIRM_TRAIN_SCHEMA: Mapping[str, Any] = {
     'type': 'object',
     'properties': {
         'BookingS2Form:hf:0': {'type': 'string'},
-        'TrainQueryDataViewPanel:TrainGroup': {'type': 'string'}
+        'TrainQueryDataViewPanel:TrainGroup': {'type': 'string'},
+        'TrainQueryDataViewPanel2:TrainGroup': {'type': 'string'},  # Inbound train of a round trip
     },
     'required': ['TrainQueryDataViewPanel:TrainGroup'],
     'additionalProperties': False
@@ -117,14 +119,47 @@ CONFIRM_TICKET_SHEMA: Mapping[str, Any] = {
     'additionalProperties': False
 }
 
+BOOKING_VALIDATOR = compile_schema(BOOKING_SCHEMA)
+CONFIRM_TRAIN_VALIDATOR = compile_schema(CONFIRM_TRAIN_SCHEMA)
+CONFIRM_TICKET_VALIDATOR = compile_schema(CONFIRM_TICKET_SHEMA)
+
+_SEARCH_BY_RE = re.compile(r'radio\d+')
+_DATE_COMPACT_RE = re.compile(r'\d{8}')
+_DATE_DASH_RE = re.compile(r'\d{4}-[0]?\d+-[0]?\d+')
+_DATE_SLASH_RE = re.compile(r'\d{4}/[0]?\d+/[0]?\d+')
+_TICKET_NUM_RE = {
+    suffix: re.compile(r'\d+' + suffix) for suffix in ('F', 'H', 'W', 'E', 'P', 'T')
+}
+
+
+def _encode_date(dt: date) -> str:
+    return dt.strftime('%Y/%m/%d')
+
 
 class BaseModel(PydanticBaseModel):
     class Config:
         allow_population_by_field_name = True
         json_encoders = {
-            date: lambda dt: dt.strftime('%Y/%m/%d')
+            date: _encode_date
         }
 
+    def params(self) -> Dict[str, Any]:
+        """以表單欄位名稱（alias）為鍵的送出參數
+
+        結果與 `json.loads(self.json(by_alias=True))` 相同，但直接由欄位取值，不經過 JSON 字串。
+        """
+        values = self.__dict__
+        return {
+            alias: _encode_date(values[name]) if isinstance(values[name], date) else values[name]
+            for name, alias in _form_fields(type(self))
+        }
+
+
+@lru_cache(maxsize=None)
+def _form_fields(model: Type[BaseModel]) -> Tuple[Tuple[str, str], ...]:
+    """每個 model 的 (欄位名稱, alias)，依宣告順序，只計算一次"""
+    return tuple((field.name, field.alias) for field in model.__fields__.values())
+
 
 class BookingModel(BaseModel):
 
@@ -149,21 +184,25 @@ class BookingModel(BaseModel):
     college_ticket_num: str = Field('0P', alias='ticketPanel:rows:4:ticketAmount')
     youth_ticket_num: str = Field('0T', alias='ticketPanel:rows:5:ticketAmount')
 
+    def with_security_code(self, security_code: str) -> 'BookingModel':
+        """換上新的驗證碼，其餘已驗證的欄位直接沿用（不再執行驗證）"""
+        return self.copy(update={'security_code': security_code})
+
     @validator('start_station', 'dest_station')
     def check_station(cls, station):
-        if station not in range(1, 13):
+        if not BOOKING_VALIDATOR.allows('selectStartStation', station):
             raise ValueError(f'Unknown station number: {station}')
         return station
 
     @validator('search_by')
     def check_search_by(cls, value):
-        if not re.match(r'radio\d+', value):
+        if not _SEARCH_BY_RE.match(value):
             raise ValueError(f'Invalid search_by format: {value}')
         return value
 
     @validator('types_of_trip')
     def check_types_of_trip(cls, value):
-        if value not in [0, 1]:
+        if not BOOKING_VALIDATOR.allows('tripCon:typesoftrip', value):
             raise ValueError(f'Invalid type of trip: {value}')
         return value
 
@@ -171,13 +210,13 @@ class BookingModel(BaseModel):
     def check_date(cls, value):
         if value is None:
             return date.today().strftime('%Y/%m/%d')
-        if matched := re.match(r'\d{8}', value):
+        if matched := _DATE_COMPACT_RE.match(value):
             # 20220101
             target_date = datetime.strptime(matched.string, '%Y%m%d').date()
-        elif matched := re.match(r'\d{4}-[0]?\d+-[0]?\d+', value):
+        elif matched := _DATE_DASH_RE.match(value):
             # 2022-01-01, 2022-1-1
             target_date = datetime.strptime(matched.string, '%Y-%m-%d').date()
-        elif matched := re.match(r'\d{4}/[0]?\d+/[0]?\d+', value):
+        elif matched := _DATE_SLASH_RE.match(value):
             # 2022/01/01, 2022/10/1
             target_date = datetime.strptime(matched.string, '%Y/%m/%d').date()
         else:
@@ -189,43 +228,43 @@ class BookingModel(BaseModel):
 
     @validator('inbound_time', 'outbound_time')
     def check_time(cls, value):
-        if value not in AVAILABLE_TIME_TABLE:
+        if not BOOKING_VALIDATOR.allows('toTimeTable', value):
             raise ValueError(f'Unknown time string: {value}')
         return value
 
     @validator('adult_ticket_num')
     def check_adult_ticket_num(cls, value):
-        if not re.match(r'\d+F', value):
+        if not _TICKET_NUM_RE['F'].match(value):
             raise ValueError(f'Invalid adult ticket num format: {value}')
         return value
 
     @validator('child_ticket_num')
     def check_child_ticket_num(cls, value):
-        if not re.match(r'\d+H', value):
+        if not _TICKET_NUM_RE['H'].match(value):
             raise ValueError(f'Invalid child ticket num format: {value}')
         return value
 
     @validator('disabled_ticket_num')
     def check_disabled_ticket_num(cls, value):
-        if not re.match(r'\d+W', value):
+        if not _TICKET_NUM_RE['W'].match(value):
             raise ValueError(f'Invalid disabled ticket num format: {value}')
         return value
 
     @validator('elder_ticket_num')
     def check_elder_ticket_num(cls, value):
-        if not re.match(r'\d+E', value):
+        if not _TICKET_NUM_RE['E'].match(value):
             raise ValueError(f'Invalid elder ticket num format: {value}')
         return value
 
     @validator('college_ticket_num')
     def check_college_ticket_num(cls, value):
-        if not re.match(r'\d+P', value):
+        if not _TICKET_NUM_RE['P'].match(value):
             raise ValueError(f'Invalid college ticket num format: {value}')
         return value
 
     @validator('youth_ticket_num')
     def check_youth_ticket_num(cls, value):
-        if not re.match(r'\d+T', value):
+        if not _TICKET_NUM_RE['T'].match(value):
             raise ValueError(f'Invalid youth ticket num format: {value}')
         return value
 
@@ -237,11 +276,14 @@ class Train(BaseModel):
     travel_time: str
     discount_str: str
     form_value: str
+    early_bird: bool = False
+    student_discount: bool = False
 
 
 class ConfirmTrainModel(BaseModel):
     selected_train: str = Field(..., alias='TrainQueryDataViewPanel:TrainGroup')
     form_mark: str = Field('', alias='BookingS2Form:hf:0')
+    selected_inbound_train: str = Field(None, alias='TrainQueryDataViewPanel2:TrainGroup')
 
 
 class ConfirmTicketModel(BaseModel):
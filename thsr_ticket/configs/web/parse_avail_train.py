@@ -44,3 +44,11 @@ class ParseAvailTrain:
             "name": "TrainQueryDataViewPanel:TrainGroup"
         }
     }
+
+    # 去回程時回程班次的選項
+    inbound_form_value = {
+        "name": "input",
+        "attrs": {
+            "name": "TrainQueryDataViewPanel2:TrainGroup"
+        }
+    }
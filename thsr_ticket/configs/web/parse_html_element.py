@@ -10,6 +10,10 @@ BOOKING_PAGE: Mapping[str, Any] = {
     },
     "types_of_trip": {
         "id": "BookingS1Form_tripCon_typesoftrip"
+    },
+    "search_by_radio": {
+        "name": "input",
+        "attrs": {"name": "bookingMethod", "checked": True}
     }
 }
 
@@ -26,9 +30,19 @@ TICKET_CONFIRMATION: Mapping[str, Any] = {
     },
     "mobile_input_radio": {
         "id": "mobileInputRadio"
+    },
+    "ticket_form": {
+        "name": "form",
+        "attrs": {"id": "BookingS3FormSP"}
     }
 }
 
+# 訂位結果中每個方向的車票區塊，回程的車站、日期與座位在第二個區塊中
+TICKET_CARD: Mapping[str, Any] = {
+    "name": "div",
+    "attrs": {"class": "ticket-card"}
+}
+
 BOOKING_RESULT: Mapping[str, Any] = {
     "ticket_id": {
         "name": "p",
@@ -39,7 +53,7 @@ BOOKING_RESULT: Mapping[str, Any] = {
         "attrs": {"class": "payment-status"}
     },
     "phone": {
-        "text": "行動電話"
+        "string": "行動電話"
     },
     "info": {
         "name": "table",
@@ -48,14 +62,14 @@ BOOKING_RESULT: Mapping[str, Any] = {
         }
     },
     "outbound_info": {
-        "text": "去程"
+        "string": "去程"
     },
     "seat_class": {
-        "text": "車廂",
+        "string": "車廂",
     },
     "ticket_num": {
         "name": "p",
-        "text": "票數"
+        "string": "票數"
     },
     "total_price": {
         "id": "setTrainTotalPriceValue"
@@ -69,6 +83,16 @@ BOOKING_RESULT: Mapping[str, Any] = {
     "arrival_time": {
         "id": "setTrainArrival0"
     },
+    # 去回程的回程車次，單程時不存在
+    "inbound_train_id": {
+        "id": "setTrainCode1"
+    },
+    "inbound_depart_time": {
+        "id": "setTrainDeparture1"
+    },
+    "inbound_arrival_time": {
+        "id": "setTrainArrival1"
+    },
     "seat_num": {
         "name": "div",
         "attrs": {
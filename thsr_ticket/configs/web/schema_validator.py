@@ -0,0 +1,142 @@
+"""預先編譯的表單 schema 驗證器
+
+`jsonschema.validate()` 每次呼叫都會重新選擇驗證器類別並檢查 schema 本身，
+enum 也是逐一比對串列。表單的 schema 都是單層物件，只用到 `type`、`enum`、`pattern`、
+`required` 與 `additionalProperties`，這裡把它們編譯成 frozenset 與預先編譯的正規表示式，
+只在快速檢查不通過（或無法確定）時才交給 jsonschema，以取得與原本相同的例外與錯誤訊息。
+"""
+import re
+from typing import Any, Callable, Dict, FrozenSet, Mapping, Optional, Pattern, Tuple
+
+from jsonschema.validators import validator_for
+
+# 快速檢查支援的關鍵字，schema 使用其他關鍵字時一律交給 jsonschema
+_OBJECT_KEYWORDS = frozenset({"type", "properties", "required", "additionalProperties"})
+_PROPERTY_KEYWORDS = frozenset({"type", "enum", "pattern"})
+
+
+def _is_integer(value: Any) -> bool:
+    # 與 jsonschema 相同：bool 不算整數，整數值的 float 算
+    if isinstance(value, bool):
+        return False
+    return isinstance(value, int) or (isinstance(value, float) and value.is_integer())
+
+
+def _is_string(value: Any) -> bool:
+    return isinstance(value, str)
+
+
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "integer": _is_integer,
+    "string": _is_string,
+}
+
+
+class _Property:
+    def __init__(self, spec: Mapping[str, Any]) -> None:
+        self.type_check = _TYPE_CHECKS[spec["type"]] if "type" in spec else None
+        self.enum: Optional[FrozenSet[Any]] = frozenset(spec["enum"]) if "enum" in spec else None
+        self.pattern: Optional[Pattern[str]] = re.compile(spec["pattern"]) if "pattern" in spec else None
+
+    def accepts(self, value: Any) -> bool:
+        """確定合法時回傳 True；不合法或無法確定時回傳 False"""
+        if self.type_check is not None and not self.type_check(value):
+            return False
+        if self.enum is not None:
+            # bool 與 1 / 0 在 frozenset 中相等，但 jsonschema 視為不同
+            if isinstance(value, bool) or not enum_contains(self.enum, value):
+                return False
+        if self.pattern is not None and isinstance(value, str) and not self.pattern.search(value):
+            return False
+        return True
+
+
+def enum_contains(enum: FrozenSet[Any], value: Any) -> bool:
+    """`value in enum`，無法雜湊的值視為不在其中（與在串列中比對的結果相同）"""
+    try:
+        return value in enum
+    except TypeError:
+        return False
+
+
+class CompiledSchema:
+    """單層物件 schema 的驗證器，建立時檢查一次 schema，之後重複使用"""
+
+    def __init__(self, schema: Mapping[str, Any]) -> None:
+        validator_cls = validator_for(schema)
+        validator_cls.check_schema(schema)
+        self.schema = schema
+        self.validator = validator_cls(schema)
+        properties = schema.get("properties", {})
+        self.properties = frozenset(properties)
+        self.enums: Dict[str, FrozenSet[Any]] = {
+            name: frozenset(spec["enum"]) for name, spec in properties.items() if "enum" in spec
+        }
+        self._fast = self._compile_fast_path(schema)
+
+    def _compile_fast_path(
+        self, schema: Mapping[str, Any]
+    ) -> Optional[Tuple[Dict[str, _Property], FrozenSet[str], bool]]:
+        properties = schema.get("properties", {})
+        supported = (
+            schema.get("type") == "object"
+            and set(schema) <= _OBJECT_KEYWORDS
+            and schema.get("additionalProperties", True) in (True, False)
+            and all(
+                set(spec) <= _PROPERTY_KEYWORDS and spec.get("type", "string") in _TYPE_CHECKS
+                for spec in properties.values()
+            )
+        )
+        if not supported:
+            return None
+        compiled = {name: _Property(spec) for name, spec in properties.items()}
+        return compiled, frozenset(schema.get("required", ())), schema.get("additionalProperties", True)
+
+    def is_valid(self, params: Mapping[str, Any]) -> bool:
+        if self._fast is None or not isinstance(params, dict):
+            return self.validator.is_valid(params)
+        properties, required, additional = self._fast
+        if not required.issubset(params):
+            return False
+        for name, value in params.items():
+            prop = properties.get(name)
+            if prop is None:
+                if not additional:
+                    return False
+            elif not prop.accepts(value):
+                return self.validator.is_valid(params)
+        return True
+
+    def validate(self, params: Mapping[str, Any]) -> None:
+        """與 `jsonschema.validate(params, schema)` 相同
+
+        Raises:
+            jsonschema.exceptions.ValidationError: 參數不符合 schema
+        """
+        if not self.is_valid(params):
+            self.validator.validate(params)
+
+    def allows(self, name: str, value: Any) -> bool:
+        """`name` 欄位的 enum 是否允許 `value`（沒有 enum 的欄位一律允許）
+
+        Raises:
+            KeyError: schema 中沒有 `name` 欄位
+        """
+        enum = self.enums.get(name)
+        if enum is None:
+            if name not in self.properties:
+                raise KeyError(name)
+            return True
+        return enum_contains(enum, value)
+
+
+_CACHE: Dict[int, Tuple[Mapping[str, Any], CompiledSchema]] = {}
+
+
+def compile_schema(schema: Mapping[str, Any]) -> CompiledSchema:
+    """取得 schema 的編譯結果，同一個 schema 物件只編譯一次"""
+    cached = _CACHE.get(id(schema))
+    if cached is None or cached[0] is not schema:
+        cached = (schema, CompiledSchema(schema))
+        _CACHE[id(schema)] = cached
+    return cached[1]
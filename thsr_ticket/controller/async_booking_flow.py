@@ -0,0 +1,174 @@
+"""非同步的自動訂票流程
+
+與 `BookingEngine` 步驟相同，但以 asyncio 讓彼此獨立的工作重疊執行：
+
+- 首頁下載時同時在背景載入 OCR 引擎
+- 驗證碼圖片與首頁剩餘內容同時下載
+- OCR 與頁面解析在執行緒池中執行
+- 步驟間隔改為「兩次請求之間至少間隔 STEP_DELAY」，解析與顯示的時間計入間隔內
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from requests.models import Response
+
+from thsr_ticket.controller.auto_booking_flow import STEP_DELAY, AutoBookingFlow
+from thsr_ticket.controller.booking_engine import BookingEngine, BookingState, EngineHook, EventKind, Step
+from thsr_ticket.controller.captcha_helper import CAPTCHA_RETRY_INTERVAL, input_captcha
+from thsr_ticket.controller.engine_hooks import CheckpointHook, ConsoleHook
+from thsr_ticket.controller.input_provider import ConfigInputProvider, InputProvider
+from thsr_ticket.ml.ocr import warm_up_ocr
+from thsr_ticket.model.booking_plan import BookingPlan, PlanCache
+from thsr_ticket.model.checkpoint import FLOW_AUTO, CheckpointStore
+from thsr_ticket.remote.async_http_request import AsyncHTTPRequest
+
+
+class AsyncBookingEngine(BookingEngine):
+    """以 asyncio 執行的 `BookingEngine`，hook 與不涉及網路的部分與同步版本共用"""
+
+    def __init__(
+        self,
+        client: AsyncHTTPRequest,
+        inputs: InputProvider,
+        hooks: Sequence[EngineHook] = (),
+        step_delay: float = STEP_DELAY,
+    ) -> None:
+        super(AsyncBookingEngine, self).__init__(client.client, inputs, hooks)
+        self.async_client = client
+        self.step_delay = step_delay
+        self._last_request: Optional[float] = None
+        self.async_handlers: Dict[Step, Callable[[BookingState], Awaitable[Optional[Step]]]] = {
+            Step.FORM: self._form_async,
+            Step.LANDING: self._landing_async,
+            Step.CAPTCHA: self._captcha_async,
+            Step.S1_SUBMIT: self._s1_submit_async,
+            Step.S2_SELECT: self._s2_select_async,
+            Step.S3_SUBMIT: self._s3_submit_async,
+            Step.RESULT: self._result_async,
+        }
+
+    async def run_async(self, state: Optional[BookingState] = None, start: Step = Step.FORM) -> BookingState:
+        state = state or BookingState()
+        step: Optional[Step] = start
+        while step is not None:
+            for hook in self.hooks:
+                hook.before_step(step, state)
+            next_step = await self.async_handlers[step](state)
+            for hook in self.hooks:
+                hook.after_step(step, state, next_step)
+            step = next_step
+        return state
+
+    async def _request(self, send: Callable[..., Any], *args: Any) -> Any:
+        """送出請求，並確保與上一次請求至少間隔 step_delay 秒"""
+        loop = asyncio.get_running_loop()
+        if self._last_request is not None:
+            wait = self._last_request + self.step_delay - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+        try:
+            return await send(*args)
+        finally:
+            self._last_request = loop.time()
+
+    async def _form_async(self, state: BookingState) -> Optional[Step]:
+        return self._form(state)
+
+    async def _landing_async(self, state: BookingState) -> Step:
+        if state.landing is not None:
+            return Step.CAPTCHA
+        run = self.async_client.run
+        self.emit(EventKind.PROGRESS, Step.LANDING, "正在載入訂票頁面...")
+        warm_up = None
+        if self.inputs.captcha_solver is input_captcha:
+            warm_up = asyncio.ensure_future(run(warm_up_ocr))
+        landing = await self._request(self.async_client.open_booking_page)
+
+        # 驗證碼圖片與首頁剩餘內容同時下載
+        img_task = asyncio.ensure_future(self._request(self.async_client.request_security_code_img, landing))
+        drain_task = asyncio.ensure_future(self.async_client.release(landing))
+        state.captcha_image = (await img_task).content
+        await drain_task
+        if warm_up is not None:
+            await warm_up
+        state.landing = landing
+        return Step.CAPTCHA
+
+    async def _captcha_async(self, state: BookingState) -> Step:
+        if state.captcha_image is None:
+            # 沿用同一個 session 與已解析的表單預設值，只重新取得驗證碼
+            state.captcha_image = (await self._request(
+                self.async_client.refresh_security_code_img, state.landing.defaults.security_img_src, state.book_resp
+            )).content
+        state.security_code = await self.async_client.run(
+            self.inputs.captcha, state.captcha_image, self.use_manual_captcha(state)
+        )
+        return Step.S1_SUBMIT
+
+    async def _s1_submit_async(self, state: BookingState) -> Optional[Step]:
+        params = self.booking_params(state)
+        self.emit(EventKind.PROGRESS, Step.S1_SUBMIT, "正在提交訂票表單...")
+        state.book_resp = state.response = await self._request(self.async_client.submit_booking_form, params)
+        next_step = await self.async_client.run(self.after_booking, state)
+        if next_step is Step.CAPTCHA:
+            await asyncio.sleep(CAPTCHA_RETRY_INTERVAL)
+        return next_step
+
+    async def _s2_select_async(self, state: BookingState) -> Optional[Step]:
+        run = self.async_client.run
+        params = await run(self.train_params, state)
+        self.emit(EventKind.PROGRESS, Step.S2_SELECT, "正在提交班次選擇...")
+        state.train_resp = state.response = await self._request(self.async_client.submit_train, params)
+        return None if await run(self.reject, state, Step.S2_SELECT, state.train_resp) else Step.S3_SUBMIT
+
+    async def _s3_submit_async(self, state: BookingState) -> Optional[Step]:
+        run = self.async_client.run
+        params = await run(self.ticket_params, state)
+        self.emit(EventKind.PROGRESS, Step.S3_SUBMIT, "正在提交乘客資訊...")
+        state.ticket_resp = state.response = await self._request(
+            self.async_client.submit_ticket, params, state.ticket_action
+        )
+        return None if await run(self.reject, state, Step.S3_SUBMIT, state.ticket_resp) else Step.RESULT
+
+    async def _result_async(self, state: BookingState) -> None:
+        await self.async_client.run(self._result, state)
+
+
+class AsyncAutoBookingFlow(AutoBookingFlow):
+    """以 asyncio 執行的自動訂票流程"""
+
+    def __init__(
+        self,
+        client: Optional[AsyncHTTPRequest] = None,
+        captcha_solver: Callable[[bytes, bool], str] = input_captcha,
+        step_delay: float = STEP_DELAY,
+        checkpoints: Optional[CheckpointStore] = None,
+        plans: Optional[PlanCache] = None,
+    ) -> None:
+        self.async_client = client or AsyncHTTPRequest()
+        super(AsyncAutoBookingFlow, self).__init__(self.async_client.client, captcha_solver, checkpoints, plans)
+        self.step_delay = step_delay
+
+    def run(self) -> Response:
+        plan = self.load_plan()
+        if plan is None:
+            return None
+        return self.book_plan(plan)
+
+    def book_plan(self, plan: BookingPlan) -> Response:
+        return asyncio.run(self.book_async(plan))
+
+    async def book_async(self, plan: BookingPlan) -> Response:
+        """以預先編譯的計畫執行訂票"""
+        self.config = plan.config
+        self.client.start_run()
+        state = await self.async_engine(plan).run_async()
+        return state.response
+
+    def async_engine(self, plan: BookingPlan) -> AsyncBookingEngine:
+        # 步驟間隔由 AsyncBookingEngine 以請求間隔處理，不使用 StepDelayHook
+        hooks: List[EngineHook] = [ConsoleHook()]
+        if self.checkpoints is not None:
+            hooks.append(CheckpointHook(self.checkpoints, self.client, FLOW_AUTO, plan.config))
+        inputs = ConfigInputProvider(plan.config, self.captcha_solver, plan)
+        return AsyncBookingEngine(self.async_client, inputs, hooks, self.step_delay)
@@ -1,33 +1,23 @@
 """自動訂票流程控制器
 
 從 config.json 讀取設定，自動完成訂票流程。
+設定在連線前就編譯成 `BookingPlan`（並依內容雜湊快取），訂票時不再驗證與序列化表單。
+指定 `watch` 時以監看模式執行（見 `availability_watch`），查無符合條件的班次時定期重新查詢。
 """
-import json
 import time
-from typing import Tuple
+from typing import Callable, List, Optional
 
-from bs4 import BeautifulSoup
 from requests.models import Response
 
 from thsr_ticket.remote.http_request import HTTPRequest
-from thsr_ticket.configs.web.param_schema import BookingModel, ConfirmTrainModel, ConfirmTicketModel
-from thsr_ticket.configs.web.parse_html_element import BOOKING_PAGE
-from thsr_ticket.configs.user_config import load_config, parse_config
-from thsr_ticket.view_model.avail_trains import AvailTrains
-from thsr_ticket.view_model.error_feedback import ErrorFeedback
-from thsr_ticket.view_model.booking_result import BookingResult
-from thsr_ticket.view.web.show_error_msg import ShowErrorMsg
-from thsr_ticket.view.web.show_booking_result import ShowBookingResult
-from thsr_ticket.view.web.show_avail_trains import ShowAvailTrains
-from thsr_ticket.controller.captcha_helper import (
-    MAX_CAPTCHA_RETRY,
-    CAPTCHA_RETRY_INTERVAL,
-    input_captcha,
-    parse_error_feedback,
-    is_captcha_error,
-    is_no_train_error,
-    has_train_data,
-)
+from thsr_ticket.configs.user_config import load_config
+from thsr_ticket.controller.availability_watch import WatchingEngine, WatchPolicy
+from thsr_ticket.controller.booking_engine import BookingEngine, BookingState, EngineHook
+from thsr_ticket.controller.captcha_helper import input_captcha
+from thsr_ticket.controller.engine_hooks import CheckpointHook, ConsoleHook, StepDelayHook, resume_state
+from thsr_ticket.controller.input_provider import ConfigInputProvider
+from thsr_ticket.model.booking_plan import BookingPlan, PlanCache, compile_plan
+from thsr_ticket.model.checkpoint import FLOW_AUTO, Checkpoint, CheckpointStore
 
 
 STEP_DELAY = 0.2  # 每個步驟之間的延遲（秒）
@@ -36,23 +26,85 @@ STEP_DELAY = 0.2  # 每個步驟之間的延遲（秒）
 class AutoBookingFlow:
     """自動訂票流程"""
 
-    def __init__(self) -> None:
-        self.client = HTTPRequest()
-        self.error_feedback = ErrorFeedback()
-        self.show_error_msg = ShowErrorMsg()
-        self.show_trains = ShowAvailTrains()
+    def __init__(
+        self,
+        client: Optional[HTTPRequest] = None,
+        captcha_solver: Callable[[bytes, bool], str] = input_captcha,
+        checkpoints: Optional[CheckpointStore] = None,
+        plans: Optional[PlanCache] = None,
+        watch: Optional[WatchPolicy] = None,
+    ) -> None:
+        """
+        Args:
+            client: 指定的 HTTPRequest（如指向替身伺服器），未指定時連線至高鐵網站
+            captcha_solver: 驗證碼輸入方式，參數為 (圖片 bytes, 是否強制手動輸入)
+            checkpoints: 每完成一個步驟就儲存檢查點，未指定時不儲存
+            plans: 編譯後的 config.json 快取，未指定時使用預設位置
+            watch: 監看模式的查詢間隔與停止條件，未指定時查無班次即結束
+        """
+        self.client = client or HTTPRequest()
+        self.captcha_solver = captcha_solver
+        self.checkpoints = checkpoints
+        self.plans = plans
+        self.watch = watch
         self.config = None
 
     def run(self) -> Response:
-        # 載入設定檔
+        plan = self.load_plan()
+        if plan is None:
+            return None
+        time.sleep(STEP_DELAY)
+        return self.book_plan(plan)
+
+    def book(self, config: dict) -> Response:
+        """以已解析的設定（`parse_config` 的結果）執行訂票"""
+        return self.book_plan(compile_plan(config))
+
+    def book_plan(self, plan: BookingPlan) -> Response:
+        """以預先編譯的計畫執行訂票"""
+        return self.run_plan(plan).response
+
+    def run_plan(self, plan: BookingPlan) -> BookingState:
+        """以預先編譯的計畫執行訂票，回傳引擎最後的狀態"""
+        self.config = plan.config
+        self.client.start_run()
+        return self.engine(plan.config, plan).run()
+
+    def resume(self, checkpoint: Checkpoint) -> Response:
+        """從檢查點最後完成的步驟繼續訂票"""
+        print(f"從上次中斷處繼續訂票（{int(checkpoint.age())} 秒前）...")
+        self.config = checkpoint.context
+        self.client.start_run()
+        checkpoint.restore_cookies(self.client.sess)
+        start, state = resume_state(checkpoint)
+        return self.engine(self.config).run(state, start).response
+
+    def engine(self, config: dict, plan: Optional[BookingPlan] = None) -> BookingEngine:
+        inputs = ConfigInputProvider(config, self.captcha_solver, plan)
+        if self.watch is not None:
+            return WatchingEngine(self.client, inputs, self.hooks(config), self.watch)
+        return BookingEngine(self.client, inputs, self.hooks(config))
+
+    def hooks(self, config: dict) -> List[EngineHook]:
+        hooks: List[EngineHook] = [ConsoleHook(), StepDelayHook(STEP_DELAY)]
+        if self.checkpoints is not None:
+            hooks.append(CheckpointHook(self.checkpoints, self.client, FLOW_AUTO, config))
+        return hooks
+
+    def load_plan(self) -> Optional[BookingPlan]:
+        """載入 config.json 並取得編譯後的計畫（內容未變更時讀取快取），失敗時顯示錯誤並回傳 None"""
         raw_config = load_config()
         if not raw_config:
             print("錯誤：找不到 config.json 設定檔")
             print("請複製 config.example.json 為 config.json 並填入設定")
             return None
+        if "itineraries" in raw_config:
+            print("錯誤：config.json 含多個行程（itineraries），請使用 --batch 批次訂票")
+            return None
 
+        plans = self.plans or PlanCache()
         try:
-            self.config = parse_config(raw_config)
+            plan = plans.load_or_compile(raw_config)
         except ValueError as e:
             print(f"設定檔錯誤：{e}")
             return None
@@ -63,257 +115,4 @@ class AutoBookingFlow:
         print(f"出發日期：{raw_config['outbound_date']}")
         print(f"出發時間：{raw_config['outbound_time']}")
         print()
-        time.sleep(STEP_DELAY)
-
-        # 第一頁：訂票表單
-        book_resp, book_model = self._first_page_flow()
-        if book_resp is None:
-            return None
-        if self._show_error(book_resp.content):
-            return book_resp
-        time.sleep(STEP_DELAY)
-
-        # 第二頁：班次確認（自動選擇乘車時間最短）
-        train_resp, train_model = self._confirm_train_flow(book_resp)
-        if self._show_error(train_resp.content):
-            return train_resp
-        time.sleep(STEP_DELAY)
-
-        # 第三頁：乘客資訊
-        ticket_resp, ticket_model = self._confirm_ticket_flow(train_resp)
-        if self._show_error(ticket_resp.content):
-            return ticket_resp
-        time.sleep(STEP_DELAY)
-
-        # 結果頁面
-        result_model = BookingResult().parse(ticket_resp.content)
-        book = ShowBookingResult()
-        book.show(result_model)
-        print("\n請使用官方提供的管道完成後續付款以及取票!!")
-
-        return ticket_resp
-
-    def _first_page_flow(self) -> Tuple[Response, BookingModel]:
-        """第一頁：訂票表單（自動填入）"""
-        print("正在載入訂票頁面...")
-        book_page = self.client.request_booking_page().content
-        time.sleep(STEP_DELAY)
-        img_resp = self.client.request_security_code_img(book_page).content
-        time.sleep(STEP_DELAY)
-        page = BeautifulSoup(book_page, features="html.parser")
-
-        form_data = {
-            "start_station": self.config["start_station"],
-            "dest_station": self.config["dest_station"],
-            "outbound_date": self.config["outbound_date"],
-            "outbound_time": self.config["outbound_time"],
-            "adult_ticket_num": self.config["adult_ticket_num"],
-            "child_ticket_num": self.config["child_ticket_num"],
-            "disabled_ticket_num": self.config["disabled_ticket_num"],
-            "elder_ticket_num": self.config["elder_ticket_num"],
-            "college_ticket_num": self.config["college_ticket_num"],
-            "youth_ticket_num": self.config["youth_ticket_num"],
-            "seat_prefer": _parse_seat_prefer_value(page),
-            "types_of_trip": _parse_types_of_trip_value(page),
-            "search_by": _parse_search_by(page),
-        }
-
-        # 驗證碼重試邏輯
-        retry_count = 0
-        while True:
-            use_manual = retry_count >= MAX_CAPTCHA_RETRY
-            security_code = input_captcha(img_resp, force_manual=use_manual)
-
-            book_model = BookingModel(
-                **form_data,
-                security_code=security_code,
-            )
-            json_params = book_model.json(by_alias=True)
-            dict_params = json.loads(json_params)
-            print("正在提交訂票表單...")
-            time.sleep(STEP_DELAY)
-            resp = self.client.submit_booking_form(dict_params)
-
-            # 檢查是否成功進入第二頁
-            if has_train_data(resp.content):
-                return resp, book_model
-
-            # 檢查錯誤訊息
-            errors = parse_error_feedback(resp.content)
-            if not is_captcha_error(errors):
-                # 不是驗證碼錯誤，返回讓上層處理
-                return resp, book_model
-
-            retry_count += 1
-            if use_manual:
-                return resp, book_model
-
-            print(f"驗證碼錯誤，正在重試... ({retry_count}/{MAX_CAPTCHA_RETRY})")
-            time.sleep(CAPTCHA_RETRY_INTERVAL)
-
-            book_page = self.client.request_booking_page().content
-            img_resp = self.client.request_security_code_img(book_page).content
-            page = BeautifulSoup(book_page, features="html.parser")
-            form_data["seat_prefer"] = _parse_seat_prefer_value(page)
-            form_data["types_of_trip"] = _parse_types_of_trip_value(page)
-            form_data["search_by"] = _parse_search_by(page)
-
-    def _confirm_train_flow(self, book_resp: Response) -> Tuple[Response, ConfirmTrainModel]:
-        """第二頁：班次確認（自動選擇乘車時間最短）"""
-        avail_trains = AvailTrains()
-        trains = avail_trains.parse(book_resp.content)
-
-        if not trains:
-            # 檢查是否有錯誤訊息
-            errors = parse_error_feedback(book_resp.content)
-            if is_no_train_error(errors):
-                raise ValueError("查無可售車次或車票已售完，請重新選擇日期或時間。")
-            if errors:
-                raise ValueError(f"訂票失敗：{'; '.join(errors)}")
-            raise ValueError("沒有可用的班次！請確認日期和時間是否正確。")
-
-        # 顯示所有可用班次（不需要使用者選擇）
-        print("\n可用班次：")
-        self.show_trains.show(trains, select=False)
-
-        # 自動選擇乘車時間最短的班次
-        selected_train = avail_trains.select_shortest_travel_time()
-        print(f"\n自動選擇乘車時間最短的班次：{selected_train.id} ({selected_train.travel_time})")
-
-        confirm_model = ConfirmTrainModel(selected_train=selected_train.form_value)
-        json_params = confirm_model.json(by_alias=True)
-        dict_params = json.loads(json_params)
-        print("正在提交班次選擇...")
-        time.sleep(STEP_DELAY)
-        resp = self.client.submit_train(dict_params)
-        return resp, confirm_model
-
-    def _confirm_ticket_flow(self, train_resp: Response) -> Tuple[Response, ConfirmTicketModel]:
-        """第三頁：乘客資訊（自動填入）"""
-        page = BeautifulSoup(train_resp.content, features="html.parser")
-
-        ticket_model = ConfirmTicketModel(
-            personal_id=self.config["personal_id"],
-            phone_num=self.config.get("phone", ""),
-            member_radio=_parse_member_radio(page),
-            email=self.config.get("email", ""),
-        )
-
-        json_params = ticket_model.json(by_alias=True)
-        dict_params = json.loads(json_params)
-
-        # 解析並填入乘客身分證欄位（愛心票、敬老票等優惠票種）
-        passenger_info_list = _parse_passenger_id_fields(page)
-        if passenger_info_list:
-            # 從 config 中取得預設的乘客身分證列表
-            from thsr_ticket.controller.confirm_ticket_flow import _prompt_passenger_ids, _check_duplicate_ids
-            
-            predefined_ids = self.config.get("passenger_ids", [])
-            
-            # 詢問用戶輸入每位乘客的身分證（支援預設值）
-            passenger_id_map = _prompt_passenger_ids(passenger_info_list, predefined_ids)
-            
-            # 檢查身分證重複
-            _check_duplicate_ids(passenger_id_map, passenger_info_list)
-            
-            # 填入參數
-            for field_name, id_number in passenger_id_map.items():
-                dict_params[field_name] = id_number
-
-        print("正在提交乘客資訊...")
-        time.sleep(STEP_DELAY)
-        resp = self.client.submit_ticket(dict_params)
-        return resp, ticket_model
-
-    def _show_error(self, html: bytes) -> bool:
-        """顯示錯誤訊息"""
-        errors = self.error_feedback.parse(html)
-        if len(errors) == 0:
-            return False
-        self.show_error_msg.show(errors)
-        return True
-
-
-def _parse_seat_prefer_value(page: BeautifulSoup) -> str:
-    options = page.find(**BOOKING_PAGE["seat_prefer_radio"])
-    preferred_seat = options.find_next(selected="selected")
-    return preferred_seat.attrs["value"]
-
-
-def _parse_types_of_trip_value(page: BeautifulSoup) -> int:
-    options = page.find(**BOOKING_PAGE["types_of_trip"])
-    tag = options.find_next(selected="selected")
-    return int(tag.attrs["value"])
-
-
-def _parse_search_by(page: BeautifulSoup) -> str:
-    candidates = page.find_all("input", {"name": "bookingMethod"})
-    tag = next((cand for cand in candidates if "checked" in cand.attrs))
-    return tag.attrs["value"]
-
-
-def _parse_member_radio(page: BeautifulSoup) -> str:
-    candidates = page.find_all(
-        "input",
-        attrs={
-            "name": "TicketMemberSystemInputPanel:TakerMemberSystemDataView:memberSystemRadioGroup"
-        },
-    )
-    tag = next((cand for cand in candidates if "checked" in cand.attrs))
-    return tag.attrs["value"]
-
-
-def _parse_passenger_id_fields(page: BeautifulSoup) -> list:
-    """解析需要填寫身分證的乘客欄位
-
-    愛心票、敬老票等優惠票種需要填寫乘客身分證。
-    這些欄位在 HTML 中會顯示（沒有 display:none），
-    欄位名稱格式為：TicketPassengerInfoInputPanel:passengerDataView:{index}:passengerDataView2:passengerDataIdNumber
-
-    Returns:
-        包含乘客資訊的字典列表，每個字典包含：
-        - field_name: 欄位名稱
-        - passenger_number: 乘客編號（1-based）
-        - ticket_type: 票種（如「愛心票」、「敬老票」）
-    """
-    passenger_info_list = []
-
-    # 找出所有乘客身分證輸入欄位
-    id_inputs = page.find_all(
-        "input",
-        attrs={"class": "uk-input passengerDataIdNumber"},
-    )
-
-    for input_tag in id_inputs:
-        # 檢查父元素是否有 display:none（隱藏的欄位不需要填寫）
-        parent_div = input_tag.find_parent("div", class_="uk-form-controls")
-        if parent_div:
-            parent_style = parent_div.get("style", "")
-            if "display:none" in parent_style or "display: none" in parent_style:
-                continue
-
-        # 取得欄位名稱
-        field_name = input_tag.get("name")
-        if not field_name:
-            continue
-
-        # 從欄位名稱解析乘客索引
-        # 格式：TicketPassengerInfoInputPanel:passengerDataView:{index}:passengerDataView2:passengerDataIdNumber
-        import re
-        match = re.search(r':passengerDataView:(\d+):', field_name)
-        passenger_index = int(match.group(1)) if match else 0
-        passenger_number = passenger_index + 1  # 轉為 1-based
-
-        # 找出對應的票種欄位
-        # 格式：TicketPassengerInfoInputPanel:passengerDataView:{index}:passengerDataView2:passengerDataTypeName
-        ticket_type_name = field_name.replace('passengerDataIdNumber', 'passengerDataTypeName')
-        ticket_type_input = page.find('input', attrs={'name': ticket_type_name})
-        ticket_type = ticket_type_input.get('value', '未知票種') if ticket_type_input else '未知票種'
-
-        passenger_info_list.append({
-            'field_name': field_name,
-            'passenger_number': passenger_number,
-            'ticket_type': ticket_type
-        })
-
-    return passenger_info_list
+        return plan
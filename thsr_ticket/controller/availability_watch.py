@@ -0,0 +1,230 @@
+"""監看模式：查無符合條件的班次時定期重新查詢
+
+查詢結果為「查無可售車次」或沒有符合 `train_policy` 的班次時，不結束流程，而是在同一個 session
+中等待後重新取得驗證碼並再送出一次第一頁，直到出現符合條件的班次才繼續選車與訂票：
+
+- 兩次查詢之間至少間隔 `MIN_WATCH_INTERVAL` 秒（設定較短的間隔時一律提高到此值）
+- 查詢失敗（連線錯誤、伺服器忙碌、session 過期）時以指數退避延長間隔，並遵守伺服器的 `Retry-After`，
+  之後以新的 session 重新開始；連續失敗 `max_failures` 次後停止
+- 每次的班次清單以 `TrainKey` 組成快照，與上一次比較後回報新增與減少的班次
+- 清單與上一次相同時只以 `train_list_digest` 快速比對，不建立 DOM、不解析班次
+"""
+import time
+from typing import Callable, FrozenSet, Iterable, NamedTuple, Optional, Sequence
+
+from requests.exceptions import RequestException
+from requests.models import Response
+
+from thsr_ticket.configs.web.param_schema import Train
+from thsr_ticket.controller.booking_engine import BookingEngine, BookingState, EngineHook, EventKind, Step
+from thsr_ticket.controller.captcha_helper import is_no_train_error, parse_error_feedback
+from thsr_ticket.controller.errors import ConnectionFailed, NoTrainAvailable
+from thsr_ticket.controller.input_provider import ConfigInputProvider
+from thsr_ticket.remote.http_request import HTTPRequest
+from thsr_ticket.remote.retry_policy import retry_after_seconds
+from thsr_ticket.view_model.avail_trains import AvailTrains
+from thsr_ticket.view_model.page_scanner import PageKind, train_list_digest
+from thsr_ticket.view_model.parsed_page import ParsedPage
+from thsr_ticket.view_model.train_ranking import TrainKey
+
+MIN_WATCH_INTERVAL = 30.0  # 兩次查詢的最小間隔（秒），不可調低
+WATCH_INTERVAL = 60.0  # 預設的查詢間隔（秒）
+WATCH_BACKOFF_MAX = 900.0  # 連續失敗時退避的上限（秒），伺服器要求更久時以伺服器為準
+MAX_WATCH_FAILURES = 5  # 連續失敗幾次後停止
+
+
+class WatchPolicy(NamedTuple):
+    interval: float = WATCH_INTERVAL  # 查詢間隔（秒），小於 MIN_WATCH_INTERVAL 時以其為準
+    backoff_max: float = WATCH_BACKOFF_MAX
+    max_failures: int = MAX_WATCH_FAILURES
+    max_polls: Optional[int] = None  # 最多查詢幾次，None 表示直到出現符合條件的班次
+
+
+Snapshot = FrozenSet[TrainKey]
+
+
+class SnapshotDiff(NamedTuple):
+    added: Snapshot
+    removed: Snapshot
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.removed)
+
+
+def take_snapshot(trains: Iterable[Train]) -> Snapshot:
+    return frozenset(TrainKey.of(train) for train in trains)
+
+
+def diff_snapshots(previous: Snapshot, current: Snapshot) -> SnapshotDiff:
+    return SnapshotDiff(added=current - previous, removed=previous - current)
+
+
+class WatchingEngine(BookingEngine):
+    """查無符合條件的班次時定期重新查詢的 `BookingEngine`"""
+
+    def __init__(
+        self,
+        client: HTTPRequest,
+        inputs: ConfigInputProvider,
+        hooks: Sequence[EngineHook] = (),
+        policy: WatchPolicy = WatchPolicy(),
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            client: 送出請求的 HTTPRequest
+            inputs: 設定檔輸入，以其中的選車條件判斷班次是否符合
+            hooks: 每個步驟前後呼叫的掛勾（依序）
+            policy: 查詢間隔、退避與停止條件
+        """
+        super(WatchingEngine, self).__init__(client, inputs, hooks)
+        self.inputs: ConfigInputProvider = inputs  # 以其中的 ranker 判斷班次是否符合
+        self.policy = policy
+        self.interval = max(policy.interval, MIN_WATCH_INTERVAL)
+        self.sleep = sleep
+        self.clock = clock
+        self.polls = 0
+        self.failures = 0  # 連續失敗的次數
+        self.snapshot: Snapshot = frozenset()
+        self._digest: Optional[bytes] = None
+        self._polled_at = 0.0  # 最近一次送出查詢的時刻
+        self._resume_at: Optional[float] = None  # 下一次查詢最早的時刻
+        self._selecting = False  # 已出現符合條件的班次，之後的步驟不再重新查詢
+
+    def run(self, state: Optional[BookingState] = None, start: Step = Step.FORM) -> BookingState:
+        while True:
+            try:
+                return super(WatchingEngine, self).run(state, start)
+            except RequestException as e:
+                if self._selecting:
+                    raise
+                if not self._back_off(retry_after_seconds(e.response), str(e)):
+                    raise ConnectionFailed(f"連續 {self.failures} 次查詢失敗：{e}") from e
+                # 以新的 session 重新開始
+                self.client.sess.cookies.clear()
+                state, start = None, Step.FORM
+
+    # 步驟 ---------------------------------------------------------------
+
+    def _landing(self, state: BookingState) -> Step:
+        self._pace()
+        return super(WatchingEngine, self)._landing(state)
+
+    def _captcha(self, state: BookingState) -> Step:
+        self._pace()
+        return super(WatchingEngine, self)._captcha(state)
+
+    def _s1_submit(self, state: BookingState) -> Optional[Step]:
+        self.polls += 1
+        self._polled_at = self.clock()
+        # 每次查詢重新計算整體時間預算，長時間監看不會耗盡
+        self.client.start_run()
+        return super(WatchingEngine, self)._s1_submit(state)
+
+    def after_booking(self, state: BookingState) -> Optional[Step]:
+        resp = state.book_resp
+        if isinstance(resp, Response) and resp.status_code >= 400:
+            # 重試用盡仍是錯誤狀態碼（如 503），依伺服器要求退避後以新的 session 重新查詢
+            if not self._back_off(retry_after_seconds(resp), f"伺服器回應 {resp.status_code}"):
+                raise ConnectionFailed(f"連續 {self.failures} 次查詢失敗（伺服器回應 {resp.status_code}）")
+            return self._restart(state)
+
+        page = ParsedPage.of(resp)
+        scan = page.scan
+        if scan.kind is PageKind.TRAIN_LIST:
+            state.captcha_errors = 0
+            return self._inspect_trains(state, page)
+        if scan.kind is PageKind.PASSENGER_FORM:
+            self._selecting = True
+            return super(WatchingEngine, self).after_booking(state)
+
+        errors = parse_error_feedback(page)
+        if is_no_train_error(errors):
+            state.captcha_errors = 0
+            diff = self._observe(frozenset())
+            return self._wait_next(state, "查無可售車次", diff)
+        next_step = super(WatchingEngine, self).after_booking(state)
+        if next_step is not None:  # 驗證碼錯誤時重試
+            return next_step
+        # 其他錯誤（如 session 過期）：退避後以新的 session 重試，連續失敗太多次才結束
+        if not self._back_off(None, "；".join(errors) or "無法辨識的回應"):
+            return None
+        return self._restart(state)
+
+    # 監看 ---------------------------------------------------------------
+
+    def _inspect_trains(self, state: BookingState, page: ParsedPage) -> Optional[Step]:
+        digest = train_list_digest(page.html)
+        if digest is not None and digest == self._digest:
+            return self._wait_next(state, "班次與上一次相同", SnapshotDiff(frozenset(), frozenset()))
+        self._digest = digest
+
+        avail = AvailTrains()
+        trains = avail.parse(page)
+        diff = self._observe(take_snapshot(trains) | take_snapshot(avail.inbound_trains))
+        summary = f"新增 {len(diff.added)} 班、減少 {len(diff.removed)} 班"
+        matched = self.inputs.ranker.best(trains) is not None and (
+            not avail.inbound_trains or self.inputs.inbound_ranker.best(avail.inbound_trains) is not None
+        )
+        if not matched:
+            return self._wait_next(state, f"{summary}，沒有符合條件的班次", diff)
+        self._selecting = True
+        self.emit(EventKind.WATCHING, Step.S1_SUBMIT, f"第 {self.polls} 次查詢：{summary}，出現符合條件的班次", diff)
+        return Step.S2_SELECT
+
+    def _observe(self, snapshot: Snapshot) -> SnapshotDiff:
+        self.failures = 0
+        diff = diff_snapshots(self.snapshot, snapshot)
+        self.snapshot = snapshot
+        if not snapshot:
+            self._digest = None
+        return diff
+
+    def _wait_next(self, state: BookingState, summary: str, diff: SnapshotDiff) -> Step:
+        if self.policy.max_polls is not None and self.polls >= self.policy.max_polls:
+            self.emit(EventKind.WATCHING, Step.S1_SUBMIT, f"第 {self.polls} 次查詢：{summary}", diff)
+            raise NoTrainAvailable(f"查詢 {self.polls} 次仍沒有符合條件的班次")
+        self._resume_at = self._polled_at + self.interval
+        self.emit(
+            EventKind.WATCHING,
+            Step.S1_SUBMIT,
+            f"第 {self.polls} 次查詢：{summary}，{self.interval:g} 秒後再查詢",
+            diff,
+        )
+        # 同一個 session 中重新取得驗證碼後再查詢
+        state.captcha_image = None
+        return Step.CAPTCHA
+
+    def _back_off(self, retry_after: Optional[float], reason: str) -> bool:
+        """排定失敗後的下一次查詢，連續失敗太多次時回傳 False"""
+        self.failures += 1
+        if self.failures > self.policy.max_failures:
+            return False
+        delay = min(self.policy.backoff_max, self.interval * 2 ** self.failures)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        self._resume_at = self.clock() + delay
+        self.emit(
+            EventKind.WATCHING,
+            Step.S1_SUBMIT,
+            f"第 {self.polls} 次查詢失敗（{reason}），{delay:g} 秒後重試（{self.failures}/{self.policy.max_failures}）",
+        )
+        return True
+
+    def _restart(self, state: BookingState) -> Step:
+        self.client.sess.cookies.clear()
+        state.landing = None
+        state.captcha_image = None
+        state.book_model = None
+        state.errors = []
+        return Step.LANDING
+
+    def _pace(self) -> None:
+        if self._resume_at is None:
+            return
+        wait = self._resume_at - self.clock()
+        self._resume_at = None
+        if wait > 0:
+            self.sleep(wait)
@@ -0,0 +1,136 @@
+"""多行程批次訂票
+
+`config.json` 以 `itineraries` 列出多個行程（見 `user_config.load_itineraries`）時，在同一個程序中依序訂票，
+不必每個行程都重新啟動程式：
+
+- 所有行程共用同一個 `HTTPRequest`，行程之間只清除 Cookie 以開始新的 session，連線池中的連線（含 TLS）沿用
+- OCR 引擎在第一個行程前載入一次，頁面解析器在模組中編譯一次後共用
+- 所有行程在送出第一個請求前就編譯成 `BookingPlan`，設定錯誤的行程直接略過
+- 相鄰兩個行程的開始時間至少間隔 `gap` 秒
+
+結束時列出每個行程的結果與耗時。
+"""
+import time
+from typing import Callable, List, NamedTuple, Tuple
+
+from requests.exceptions import RequestException
+
+from thsr_ticket.configs.user_config import load_config, load_itineraries, parse_config
+from thsr_ticket.controller.auto_booking_flow import AutoBookingFlow
+from thsr_ticket.controller.captcha_helper import input_captcha
+from thsr_ticket.controller.errors import BookingError
+from thsr_ticket.ml.ocr import warm_up_ocr
+from thsr_ticket.model.booking_plan import BookingPlan, compile_plan, config_digest
+
+BATCH_GAP = 3.0  # 相鄰兩個行程開始時間的最小間隔（秒）
+
+
+class ItineraryOutcome(NamedTuple):
+    index: int  # 在設定中的順序（從 1 開始）
+    label: str  # 如 "台北→左營 2030-01-25 06:00"
+    ok: bool
+    elapsed: float  # 訂票耗時（秒），設定錯誤時為 0
+    detail: str  # 成功時為訂位代號，失敗時為錯誤訊息
+
+
+def itinerary_label(raw_config: dict) -> str:
+    return "{}→{} {} {}".format(
+        raw_config.get("start_station", "?"),
+        raw_config.get("dest_station", "?"),
+        raw_config.get("outbound_date", "?"),
+        raw_config.get("outbound_time", "?"),
+    )
+
+
+class BatchRunner:
+    """以同一個 `AutoBookingFlow` 依序訂購多個行程"""
+
+    def __init__(
+        self,
+        flow: AutoBookingFlow,
+        gap: float = BATCH_GAP,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        Args:
+            flow: 共用的訂票流程（與其中的 HTTPRequest、驗證碼輸入方式）
+            gap: 相鄰兩個行程開始時間的最小間隔（秒）
+        """
+        self.flow = flow
+        self.gap = gap
+        self.clock = clock
+        self.sleep = sleep
+
+    def run(self, itineraries: List[dict]) -> List[ItineraryOutcome]:
+        """依序訂購 `itineraries`（各行程的原始設定），回傳依設定順序排列的結果"""
+        outcomes: List[ItineraryOutcome] = []
+        plans: List[Tuple[int, str, BookingPlan]] = []
+        for index, raw_config in enumerate(itineraries, 1):
+            label = itinerary_label(raw_config)
+            try:
+                plans.append((index, label, compile_plan(parse_config(raw_config), config_digest(raw_config))))
+            except (KeyError, ValueError) as e:
+                outcomes.append(ItineraryOutcome(index, label, False, 0.0, f"設定錯誤：{e}"))
+
+        if plans:
+            self.warm_up()
+        last_start = None
+        for index, label, plan in plans:
+            if last_start is not None:
+                wait = last_start + self.gap - self.clock()
+                if wait > 0:
+                    self.sleep(wait)
+            last_start = self.clock()
+            print(f"\n=== 行程 {index}/{len(itineraries)}：{label} ===")
+            outcomes.append(self.book(index, label, plan))
+        return sorted(outcomes, key=lambda outcome: outcome.index)
+
+    def warm_up(self) -> None:
+        """在第一個行程前載入 OCR 並建立連線，之後的行程直接沿用"""
+        if self.flow.captcha_solver is input_captcha:
+            warm_up_ocr()
+        self.flow.client.warm_up()
+
+    def book(self, index: int, label: str, plan: BookingPlan) -> ItineraryOutcome:
+        # 每個行程使用新的 session，連線池保留
+        self.flow.client.sess.cookies.clear()
+        started = time.perf_counter()
+        try:
+            state = self.flow.run_plan(plan)
+        except (ValueError, BookingError, RequestException) as e:
+            return ItineraryOutcome(index, label, False, time.perf_counter() - started, str(e))
+        elapsed = time.perf_counter() - started
+
+        if state.completed:
+            return ItineraryOutcome(index, label, True, elapsed, state.tickets[0].id)
+        return ItineraryOutcome(index, label, False, elapsed, "；".join(e.msg for e in state.errors) or "訂票未完成")
+
+
+def format_report(outcomes: List[ItineraryOutcome]) -> str:
+    lines = ["=== 批次訂票結果 ==="]
+    for outcome in outcomes:
+        status = "成功" if outcome.ok else "失敗"
+        lines.append(f"{outcome.index:>3}. {outcome.label}  {status}  {outcome.elapsed:6.2f} 秒  {outcome.detail}")
+    succeeded = sum(outcome.ok for outcome in outcomes)
+    lines.append(f"共 {len(outcomes)} 個行程，成功 {succeeded} 個")
+    return "\n".join(lines)
+
+
+def run_batch(flow: AutoBookingFlow, gap: float = BATCH_GAP) -> List[ItineraryOutcome]:
+    """讀取 config.json 的所有行程並批次訂票，結束時顯示結果"""
+    raw_config = load_config()
+    if not raw_config:
+        print("錯誤：找不到 config.json 設定檔")
+        return []
+    try:
+        itineraries = load_itineraries(raw_config)
+    except ValueError as e:
+        print(f"設定檔錯誤：{e}")
+        return []
+
+    print(f"=== 批次訂票模式：{len(itineraries)} 個行程 ===")
+    outcomes = BatchRunner(flow, gap).run(itineraries)
+    print()
+    print(format_report(outcomes))
+    return outcomes
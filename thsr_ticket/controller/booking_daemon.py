@@ -0,0 +1,329 @@
+"""常駐的本機訂票服務
+
+每次訂票都啟動一個程序時，載入 OCR 模型、匯入解析器與建立連線的時間都會重複付出。
+常駐服務啟動時做一次，之後的工作直接沿用：
+
+- OCR 模型與頁面解析器在啟動時載入，每個工作執行緒有自己的 `HTTPRequest`，連線池在工作之間保留
+- 工作放入有上限的佇列，佇列已滿時立即拒絕，不會無限制地堆積
+- 每個工作有期限：排隊時已超過期限的工作不執行，執行中的工作由 `headless.book` 的 deadline 中止
+- 已結束的工作只保留最近 `MAX_FINISHED_JOBS` 筆供查詢，長時間執行時記憶體用量不會持續增加
+
+本機 HTTP 介面（預設只綁定 127.0.0.1）：
+
+    POST /jobs       {"config": {config.json 格式的設定}, "deadline": 秒數（選填）}
+                     -> 202 {"id": ..., "status": "queued"}；設定錯誤 400；佇列已滿 503
+    GET  /jobs/<id>  -> 工作狀態、最新進度與結果（訂位代號與車票）
+    GET  /health     -> 佇列中、執行中與已保留的工作數
+"""
+import json
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from enum import Enum
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+
+from thsr_ticket.controller.auto_booking_flow import STEP_DELAY
+from thsr_ticket.controller.booking_engine import BookingEvent
+from thsr_ticket.controller.captcha_helper import ocr_captcha
+from thsr_ticket.controller.errors import BookingError, DeadlineExceeded, InvalidConfig
+from thsr_ticket.controller.headless import BookingOutcome, book, compile_config
+from thsr_ticket.ml.ocr import warm_up_ocr
+from thsr_ticket.model.booking_plan import BookingPlan
+from thsr_ticket.remote.http_request import HTTPRequest
+
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8787
+MAX_QUEUED_JOBS = 16  # 佇列中（尚未開始）的工作上限
+MAX_FINISHED_JOBS = 1000  # 保留供查詢的已結束工作數
+JOB_DEADLINE = 180.0  # 未指定時，工作從送出到完成的期限（秒）
+
+
+class JobStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    EXPIRED = "expired"  # 超過期限
+
+
+class DaemonBusy(Exception):
+    """佇列已滿"""
+
+
+class BookingJob:
+    """一筆訂票工作，狀態由工作執行緒更新，查詢時以 `to_dict` 取得快照"""
+
+    def __init__(self, job_id: str, plan: BookingPlan, deadline: float) -> None:
+        self.id = job_id
+        self.plan: Optional[BookingPlan] = plan  # 結束後釋放
+        self.deadline = deadline  # time.monotonic() 的時刻
+        self.status = JobStatus.QUEUED
+        self.progress = ""  # 最新一個事件的說明
+        self.outcome: Optional[BookingOutcome] = None
+        self.error: Optional[BookingError] = None
+        self.elapsed = 0.0  # 執行的秒數（不含排隊）
+
+    def on_event(self, event: BookingEvent) -> None:
+        self.progress = event.message
+
+    def to_dict(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"id": self.id, "status": self.status.value, "progress": self.progress}
+        if self.status in (JobStatus.QUEUED, JobStatus.RUNNING):
+            result["remaining"] = round(max(self.deadline - time.monotonic(), 0.0), 3)
+        else:
+            result["elapsed"] = round(self.elapsed, 3)
+        if self.outcome is not None:
+            result["pnr"] = self.outcome.pnr
+            result["tickets"] = [ticket._asdict() for ticket in self.outcome.tickets]
+        if self.error is not None:
+            result["error"] = str(self.error)
+            result["error_type"] = type(self.error).__name__
+        return result
+
+
+class BookingDaemon:
+    """以固定數量的工作執行緒依序處理佇列中的訂票工作"""
+
+    def __init__(
+        self,
+        workers: int = 1,
+        max_queued: int = MAX_QUEUED_JOBS,
+        client_factory: Callable[[], HTTPRequest] = HTTPRequest,
+        captcha_solver: Callable[[bytes, bool], str] = ocr_captcha,
+        step_delay: float = STEP_DELAY,
+        max_finished: int = MAX_FINISHED_JOBS,
+    ) -> None:
+        """
+        Args:
+            workers: 同時執行的工作數，每個工作執行緒使用自己的 HTTPRequest
+            max_queued: 佇列中（尚未開始）的工作上限
+            client_factory: 建立工作執行緒的 HTTPRequest（如指向替身伺服器）
+            captcha_solver: 驗證碼輸入方式，預設只使用 OCR
+            step_delay: 送出各頁表單前等待的秒數
+            max_finished: 保留供查詢的已結束工作數
+        """
+        self.workers = workers
+        self.client_factory = client_factory
+        self.captcha_solver = captcha_solver
+        self.step_delay = step_delay
+        self.max_finished = max_finished
+        self._queue: "queue.Queue[Optional[BookingJob]]" = queue.Queue(max_queued)
+        self._jobs: Dict[str, BookingJob] = {}
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> "BookingDaemon":
+        """載入 OCR、建立各工作執行緒的連線後開始處理工作"""
+        if self.captcha_solver is ocr_captcha:
+            warm_up_ocr()
+        for idx in range(self.workers):
+            client = self.client_factory()
+            client.warm_up()
+            thread = threading.Thread(target=self._work, args=(client,), name=f"booking-worker-{idx}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self) -> None:
+        """處理完已在佇列中的工作後結束工作執行緒"""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def __enter__(self) -> "BookingDaemon":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def submit(self, raw_config: dict, deadline: float = JOB_DEADLINE) -> BookingJob:
+        """把 config.json 格式的設定編譯後放入佇列
+
+        Args:
+            raw_config: 與 config.json 相同格式的設定
+            deadline: 從現在起算的期限（秒）
+
+        Raises:
+            InvalidConfig: 設定錯誤
+            DaemonBusy: 佇列已滿
+        """
+        if deadline <= 0:
+            raise InvalidConfig("deadline 必須大於 0")
+        job = BookingJob(uuid.uuid4().hex, compile_config(raw_config), time.monotonic() + deadline)
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+            raise DaemonBusy(f"佇列已滿（{self._queue.maxsize} 筆）")
+        return job
+
+    def job(self, job_id: str) -> Optional[BookingJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return {
+            "queued": sum(job.status is JobStatus.QUEUED for job in jobs),
+            "running": sum(job.status is JobStatus.RUNNING for job in jobs),
+            "finished": len(self._finished),
+        }
+
+    def _work(self, client: HTTPRequest) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            self._run(client, job)
+
+    def _run(self, client: HTTPRequest, job: BookingJob) -> None:
+        started = time.monotonic()
+        if started >= job.deadline:
+            job.error = DeadlineExceeded("排隊時已超過期限")
+            job.status = JobStatus.EXPIRED
+            self._retire(job)
+            return
+
+        job.status = JobStatus.RUNNING
+        # 每筆工作使用新的 session，連線池保留
+        client.sess.cookies.clear()
+        status = JobStatus.FAILED
+        try:
+            job.outcome = book(job.plan, client, self.captcha_solver, job.on_event, self.step_delay, job.deadline)
+            status = JobStatus.SUCCEEDED
+        except DeadlineExceeded as e:
+            job.error = e
+            status = JobStatus.EXPIRED
+        except BookingError as e:
+            job.error = e
+        except Exception as e:
+            # 非預期的錯誤只讓這筆工作失敗，工作執行緒繼續處理下一筆
+            job.error = BookingError(f"{type(e).__name__}: {e}")
+        job.elapsed = time.monotonic() - started
+        job.status = status
+        self._retire(job)
+
+    def _retire(self, job: BookingJob) -> None:
+        # 已結束的工作不再需要計畫，只保留最近 max_finished 筆
+        job.plan = None
+        with self._lock:
+            self._finished[job.id] = None
+            while len(self._finished) > self.max_finished:
+                oldest, _ = self._finished.popitem(last=False)
+                del self._jobs[oldest]
+
+
+class DaemonServer:
+    """`BookingDaemon` 的本機 HTTP 介面"""
+
+    def __init__(self, daemon: BookingDaemon, host: str = DAEMON_HOST, port: int = DAEMON_PORT) -> None:
+        self.daemon = daemon
+        self._httpd = ThreadingHTTPServer((host, port), _DaemonHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.booking_daemon = daemon  # type: ignore
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return "http://{}:{}".format(host, port)
+
+    def start(self) -> "DaemonServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """在目前的執行緒處理請求，結束（如 KeyboardInterrupt）時關閉 socket"""
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "DaemonServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+
+class _DaemonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def daemon(self) -> BookingDaemon:
+        return self.server.booking_daemon  # type: ignore
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._send_json(200, self.daemon.stats())
+            return
+        if self.path.startswith("/jobs/"):
+            job = self.daemon.job(self.path[len("/jobs/"):])
+            if job is not None:
+                self._send_json(200, job.to_dict())
+                return
+        self._send_json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if self.path != "/jobs":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            request = json.loads(body or b"{}")
+            if not isinstance(request, dict) or not isinstance(request.get("config"), dict):
+                raise InvalidConfig("請求內容必須是含 config 物件的 JSON")
+            job = self.daemon.submit(request["config"], float(request.get("deadline", JOB_DEADLINE)))
+        except (ValueError, TypeError) as e:
+            # InvalidConfig 與 JSON 格式錯誤都是 ValueError
+            self._send_json(400, {"error": str(e)})
+            return
+        except DaemonBusy as e:
+            self._send_json(503, {"error": str(e)}, {"Retry-After": "5"})
+            return
+        self._send_json(202, job.to_dict())
+
+    def _send_json(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def run_daemon(host: str = DAEMON_HOST, port: int = DAEMON_PORT, workers: int = 1) -> None:
+    """啟動常駐服務，直到按下 Ctrl+C"""
+    print("正在載入 OCR 並建立連線...")
+    with BookingDaemon(workers) as daemon:
+        server = DaemonServer(daemon, host, port)
+        print(f"訂票服務已啟動：{server.base_url}（{workers} 個工作執行緒，按 Ctrl+C 結束）")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("正在等待佇列中的工作完成...")
+    print("訂票服務已結束")
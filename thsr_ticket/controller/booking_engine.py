@@ -0,0 +1,397 @@
+"""訂票流程的狀態機
+
+手動與自動訂票的步驟完全相同，差別只在輸入從哪裡來（見 `input_provider`）：
+
+    FORM → LANDING → CAPTCHA → S1_SUBMIT → S2_SELECT → S3_SUBMIT → RESULT
+                        ↑           │    │                ↑
+                        │           │    └────────────────┘ 依車次訂票時伺服器直接回傳第三頁
+                        └───────────┘ 驗證碼錯誤時只重新取得驗證碼圖片
+
+每個步驟前後都會呼叫 `EngineHook`，計時、步驟間隔、檢查點與預先載入都以 hook 實作（見 `engine_hooks`），
+不必在各個流程中重複。引擎本身不輸出任何訊息，進度、錯誤與訂位結果都以 `BookingEvent` 交給 hook，
+由 `ConsoleHook` 顯示在終端機上，或由 `headless.book` 轉交給呼叫端。
+"""
+import re
+import time
+from enum import Enum
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from thsr_ticket.configs.web.param_schema import BookingModel, ConfirmTicketModel, ConfirmTrainModel, Train
+from thsr_ticket.configs.web.parse_html_element import TICKET_CONFIRMATION
+from thsr_ticket.controller.captcha_helper import (
+    MAX_CAPTCHA_RETRY,
+    CAPTCHA_RETRY_INTERVAL,
+    parse_error_feedback,
+    is_captcha_error,
+    is_no_train_error,
+    has_passenger_form,
+    has_train_data,
+)
+from thsr_ticket.controller.errors import BookingRejected, NoTrainAvailable
+from thsr_ticket.controller.input_provider import InputProvider
+from thsr_ticket.model.booking_plan import model_from_params
+from thsr_ticket.remote.http_request import HTTPRequest
+from thsr_ticket.view_model.avail_trains import AvailTrains
+from thsr_ticket.view_model.booking_page import StreamedBookingPage
+from thsr_ticket.view_model.booking_result import BookingResult, Ticket
+from thsr_ticket.view_model.error_feedback import Error, ErrorFeedback
+from thsr_ticket.view_model.parsed_page import ParsedPage, PageSource
+
+
+class Step(Enum):
+    FORM = "form"  # 收集訂票表單的輸入（驗證碼除外）
+    LANDING = "landing"  # 載入首頁與驗證碼圖片
+    CAPTCHA = "captcha"  # 辨識驗證碼，重試時先重新取得圖片
+    S1_SUBMIT = "s1_submit"  # 送出訂票表單
+    S2_SELECT = "s2_select"  # 選擇並送出班次
+    S3_SUBMIT = "s3_submit"  # 填寫並送出乘客資訊
+    RESULT = "result"  # 解析訂位結果
+
+
+class EventKind(Enum):
+    PROGRESS = "progress"  # 載入或送出頁面
+    CAPTCHA_RETRY = "captcha_retry"  # data：已錯誤的次數
+    TRAIN_SELECTED = "train_selected"  # data：選擇的 `Train`
+    REJECTED = "rejected"  # data：伺服器回傳的 `Error` 列表，流程在此結束
+    COMPLETED = "completed"  # data：訂位結果的 `Ticket` 列表（去回程時依序為去程、回程）
+    WATCHING = "watching"  # 監看模式的一次查詢結果，data：`SnapshotDiff`（查詢失敗時為 None）
+
+
+class BookingEvent(NamedTuple):
+    kind: EventKind
+    step: Step  # 發出事件的步驟
+    message: str  # 給使用者看的說明
+    data: Any = None
+
+
+class BookingState:
+    """一次訂票在各步驟之間傳遞的資料"""
+
+    def __init__(self) -> None:
+        self.form_data: dict = {}
+        self.landing: Optional[StreamedBookingPage] = None
+        self.captcha_image: Optional[bytes] = None  # None 表示需要重新取得
+        self.security_code = ""
+        self.captcha_errors = 0  # 驗證碼錯誤的次數
+        self.book_model: Optional[BookingModel] = None
+        self.train_model: Optional[ConfirmTrainModel] = None
+        self.ticket_model: Optional[ConfirmTicketModel] = None
+        self.book_resp: Optional[PageSource] = None
+        self.train_resp: Optional[PageSource] = None  # 第三頁（依車次訂票時即第一頁的回應）
+        self.ticket_action: Optional[str] = None  # 第三頁表單的 action
+        self.ticket_resp: Optional[PageSource] = None
+        self.response: Optional[PageSource] = None  # 最後一個回應
+        self.errors: List[Error] = []  # 使流程結束的錯誤訊息
+        self.tickets: List[Ticket] = []  # 訂位結果
+        self.completed = False
+
+
+class EngineHook:
+    """步驟轉換時呼叫的掛勾，子類別只需覆寫需要的方法"""
+
+    def before_step(self, step: Step, state: BookingState) -> None:
+        pass
+
+    def prepare(self, step: Step, state: BookingState) -> None:
+        """`step` 即將開始（例如使用者快回答完提示），可先在背景準備"""
+
+    def after_step(self, step: Step, state: BookingState, next_step: Optional[Step]) -> None:
+        """`next_step` 為 None 表示流程在此結束（完成或顯示錯誤）"""
+
+    def on_event(self, event: BookingEvent) -> None:
+        """引擎回報進度、錯誤或結果（非同步引擎可能在執行緒池中呼叫）"""
+
+
+class BookingEngine:
+    """依序執行訂票步驟的狀態機"""
+
+    def __init__(self, client: HTTPRequest, inputs: InputProvider, hooks: Sequence[EngineHook] = ()) -> None:
+        """
+        Args:
+            client: 送出請求的 HTTPRequest
+            inputs: 表單、驗證碼、班次與乘客資料的來源
+            hooks: 每個步驟前後呼叫的掛勾（依序）
+        """
+        self.client = client
+        self.inputs = inputs
+        self.hooks = list(hooks)
+        self.error_feedback = ErrorFeedback()
+        self.handlers: Dict[Step, Callable[[BookingState], Optional[Step]]] = {
+            Step.FORM: self._form,
+            Step.LANDING: self._landing,
+            Step.CAPTCHA: self._captcha,
+            Step.S1_SUBMIT: self._s1_submit,
+            Step.S2_SELECT: self._s2_select,
+            Step.S3_SUBMIT: self._s3_submit,
+            Step.RESULT: self._result,
+        }
+
+    def run(self, state: Optional[BookingState] = None, start: Step = Step.FORM) -> BookingState:
+        """從 `start` 開始執行到流程結束
+
+        Args:
+            state: 已完成步驟的資料（從檢查點繼續時使用）
+            start: 第一個執行的步驟
+        """
+        state = state or BookingState()
+        step: Optional[Step] = start
+        while step is not None:
+            for hook in self.hooks:
+                hook.before_step(step, state)
+            next_step = self.handlers[step](state)
+            for hook in self.hooks:
+                hook.after_step(step, state, next_step)
+            step = next_step
+        return state
+
+    def prepare(self, step: Step, state: BookingState) -> None:
+        for hook in self.hooks:
+            hook.prepare(step, state)
+
+    def emit(self, kind: EventKind, step: Step, message: str, data: Any = None) -> None:
+        event = BookingEvent(kind, step, message, data)
+        for hook in self.hooks:
+            hook.on_event(event)
+
+    # 步驟 ---------------------------------------------------------------
+
+    def _form(self, state: BookingState) -> Step:
+        state.form_data = self.inputs.booking_form(lambda: self.prepare(Step.LANDING, state))
+        return Step.LANDING
+
+    def _landing(self, state: BookingState) -> Step:
+        if state.landing is None:  # 可能已由 hook 預先取得
+            self.emit(EventKind.PROGRESS, Step.LANDING, "正在載入訂票頁面...")
+            landing = self.client.open_booking_page()
+            state.captcha_image = self.client.request_security_code_img(landing).content
+            landing.release()
+            state.landing = landing
+        return Step.CAPTCHA
+
+    def _captcha(self, state: BookingState) -> Step:
+        if state.captcha_image is None:
+            # 沿用同一個 session 與已解析的表單預設值，只重新取得驗證碼
+            state.captcha_image = self.client.refresh_security_code_img(
+                state.landing.defaults.security_img_src, state.book_resp
+            ).content
+        state.security_code = self.inputs.captcha(state.captcha_image, self.use_manual_captcha(state))
+        return Step.S1_SUBMIT
+
+    def _s1_submit(self, state: BookingState) -> Optional[Step]:
+        params = self.booking_params(state)
+        self.emit(EventKind.PROGRESS, Step.S1_SUBMIT, "正在提交訂票表單...")
+        state.book_resp = state.response = self.client.submit_booking_form(params)
+        next_step = self.after_booking(state)
+        if next_step is Step.CAPTCHA:
+            time.sleep(CAPTCHA_RETRY_INTERVAL)
+        return next_step
+
+    def _s2_select(self, state: BookingState) -> Optional[Step]:
+        params = self.train_params(state)
+        self.emit(EventKind.PROGRESS, Step.S2_SELECT, "正在提交班次選擇...")
+        state.train_resp = state.response = self.client.submit_train(params)
+        return None if self.reject(state, Step.S2_SELECT, state.train_resp) else Step.S3_SUBMIT
+
+    def _s3_submit(self, state: BookingState) -> Optional[Step]:
+        params = self.ticket_params(state)
+        self.emit(EventKind.PROGRESS, Step.S3_SUBMIT, "正在提交乘客資訊...")
+        state.ticket_resp = state.response = self.client.submit_ticket(params, state.ticket_action)
+        return None if self.reject(state, Step.S3_SUBMIT, state.ticket_resp) else Step.RESULT
+
+    def _result(self, state: BookingState) -> None:
+        state.tickets = BookingResult().parse(state.ticket_resp)
+        state.completed = True
+        self.emit(EventKind.COMPLETED, Step.RESULT, f"訂位完成，訂位代號：{state.tickets[0].id}", state.tickets)
+
+    # 不涉及網路的部分，供非同步版本共用 -----------------------------------
+
+    def use_manual_captcha(self, state: BookingState) -> bool:
+        """OCR 重試次數用盡後改為手動輸入"""
+        return state.captcha_errors >= MAX_CAPTCHA_RETRY
+
+    def booking_params(self, state: BookingState) -> dict:
+        """以輸入的表單、首頁預設值與驗證碼組成第一頁的送出參數"""
+        defaults = state.landing.defaults
+        if self.inputs.plan is not None:
+            params = self.inputs.plan.booking_params(state.security_code, defaults)
+            state.book_model = model_from_params(BookingModel, params)
+            return params
+        if state.book_model is not None:
+            # 驗證碼重試：表單其他欄位不變，不必重新驗證
+            state.book_model = state.book_model.with_security_code(state.security_code)
+            return state.book_model.params()
+        form_data = {
+            "seat_prefer": defaults.seat_prefer,
+            "types_of_trip": defaults.types_of_trip,
+            "search_by": defaults.search_by,
+            **state.form_data,
+        }
+        state.book_model = BookingModel(**form_data, security_code=state.security_code)
+        return state.book_model.params()
+
+    def after_booking(self, state: BookingState) -> Optional[Step]:
+        """依第一頁的回應決定下一步：進入班次清單（依車次訂票時直接進入第三頁）、驗證碼錯誤時重試，或顯示錯誤後結束"""
+        resp = state.book_resp
+        if has_train_data(resp):
+            return Step.S2_SELECT
+        if has_passenger_form(resp):
+            self.emit(EventKind.PROGRESS, Step.S1_SUBMIT, "已依車次直接進入乘客資訊頁")
+            state.train_resp = resp
+            return Step.S3_SUBMIT
+
+        errors = parse_error_feedback(resp)
+        if is_captcha_error(errors) and not self.use_manual_captcha(state):
+            state.captcha_errors += 1
+            state.captcha_image = None
+            self.emit(
+                EventKind.CAPTCHA_RETRY,
+                Step.S1_SUBMIT,
+                f"驗證碼錯誤，正在重試... ({state.captcha_errors}/{MAX_CAPTCHA_RETRY})",
+                state.captcha_errors,
+            )
+            return Step.CAPTCHA
+        if self.reject(state, Step.S1_SUBMIT, resp):
+            return None
+        # 沒有錯誤訊息也沒有班次，交由班次選擇回報
+        return Step.S2_SELECT
+
+    def train_params(self, state: BookingState) -> dict:
+        """解析班次清單並由輸入來源選擇班次（去回程時兩個方向各選一班），組成第二頁的送出參數"""
+        avail = AvailTrains()
+        trains = avail.parse(state.book_resp)
+        if not trains:
+            # 檢查是否有錯誤訊息
+            errors = parse_error_feedback(state.book_resp)
+            if is_no_train_error(errors):
+                raise NoTrainAvailable("查無可售車次或車票已售完，請重新選擇日期或時間。")
+            if errors:
+                raise BookingRejected(errors)
+            raise NoTrainAvailable("沒有可用的班次！請確認日期和時間是否正確。")
+
+        selected_train = self.select_train(trains, inbound=False).form_value
+        inbound_train = None
+        if avail.inbound_trains:
+            inbound_train = self.select_train(avail.inbound_trains, inbound=True).form_value
+        if self.inputs.plan is not None:
+            params = self.inputs.plan.train_params(selected_train, inbound_train)
+            state.train_model = model_from_params(ConfirmTrainModel, params)
+            return params
+        if inbound_train is None:
+            state.train_model = ConfirmTrainModel(selected_train=selected_train)
+        else:
+            state.train_model = ConfirmTrainModel(selected_train=selected_train, selected_inbound_train=inbound_train)
+        return state.train_model.params()
+
+    def select_train(self, trains: List[Train], inbound: bool) -> Train:
+        train = self.inputs.select_train(trains, inbound=inbound)
+        self.emit(
+            EventKind.TRAIN_SELECTED,
+            Step.S2_SELECT,
+            f"{'回程' if inbound else '去程'} {len(trains)} 個可用班次，選擇：{train.id} "
+            f"{train.depart}~{train.arrive} ({train.travel_time}) {train.discount_str}",
+            train,
+        )
+        return train
+
+    def ticket_params(self, state: BookingState) -> dict:
+        """組成第三頁的送出參數，包含需要填寫身分證的乘客欄位"""
+        page = ParsedPage.of(state.train_resp)
+        state.ticket_action = _parse_ticket_action(page)
+        info = self.inputs.ticket_info()
+        if self.inputs.plan is not None:
+            params = self.inputs.plan.ticket_params(_parse_member_radio(page))
+            state.ticket_model = model_from_params(ConfirmTicketModel, params)
+        else:
+            state.ticket_model = ConfirmTicketModel(
+                personal_id=info.personal_id,
+                phone_num=info.phone,
+                member_radio=_parse_member_radio(page),
+                email=info.email,
+            )
+            params = state.ticket_model.params()
+
+        # 愛心票、敬老票等優惠票種需要填寫乘客身分證
+        passenger_fields = _parse_passenger_id_fields(page)
+        if passenger_fields:
+            params.update(self.inputs.passenger_ids(passenger_fields, info.passenger_ids))
+        return params
+
+    def reject(self, state: BookingState, step: Step, page: PageSource) -> bool:
+        """頁面中有錯誤訊息時記錄在 `state.errors` 並回報，回傳是否有錯誤"""
+        errors = self.error_feedback.parse(page)
+        if len(errors) == 0:
+            return False
+        state.errors = list(errors)
+        self.emit(EventKind.REJECTED, step, "；".join(error.msg for error in errors), state.errors)
+        return True
+
+
+def _parse_ticket_action(page: ParsedPage) -> Optional[str]:
+    form = page.find_fields(TICKET_CONFIRMATION)["ticket_form"]
+    return form.get("action") if form is not None else None
+
+
+def _parse_member_radio(page: ParsedPage) -> str:
+    candidates = page.soup.find_all(
+        "input",
+        attrs={
+            "name": "TicketMemberSystemInputPanel:TakerMemberSystemDataView:memberSystemRadioGroup"
+        },
+    )
+    tag = next((cand for cand in candidates if "checked" in cand.attrs))
+    return tag.attrs["value"]
+
+
+def _parse_passenger_id_fields(page: ParsedPage) -> List[dict]:
+    """解析需要填寫身分證的乘客欄位
+
+    愛心票、敬老票等優惠票種需要填寫乘客身分證。
+    這些欄位在 HTML 中會顯示（沒有 display:none），
+    欄位名稱格式為：TicketPassengerInfoInputPanel:passengerDataView:{index}:passengerDataView2:passengerDataIdNumber
+
+    Returns:
+        包含乘客資訊的字典列表，每個字典包含：
+        - field_name: 欄位名稱
+        - passenger_number: 乘客編號（1-based）
+        - ticket_type: 票種（如「愛心票」、「敬老票」）
+    """
+    passenger_info_list = []
+
+    # 找出所有乘客身分證輸入欄位
+    id_inputs = page.soup.find_all(
+        "input",
+        attrs={"class": "uk-input passengerDataIdNumber"},
+    )
+
+    for input_tag in id_inputs:
+        # 檢查父元素是否有 display:none（隱藏的欄位不需要填寫）
+        parent_div = input_tag.find_parent("div", class_="uk-form-controls")
+        if parent_div:
+            parent_style = parent_div.get("style", "")
+            if "display:none" in parent_style or "display: none" in parent_style:
+                continue
+
+        # 取得欄位名稱
+        field_name = input_tag.get("name")
+        if not field_name:
+            continue
+
+        # 從欄位名稱解析乘客索引
+        # 格式：TicketPassengerInfoInputPanel:passengerDataView:{index}:passengerDataView2:passengerDataIdNumber
+        match = re.search(r':passengerDataView:(\d+):', field_name)
+        passenger_index = int(match.group(1)) if match else 0
+        passenger_number = passenger_index + 1  # 轉為 1-based
+
+        # 找出對應的票種欄位
+        # 格式：TicketPassengerInfoInputPanel:passengerDataView:{index}:passengerDataView2:passengerDataTypeName
+        ticket_type_name = field_name.replace('passengerDataIdNumber', 'passengerDataTypeName')
+        ticket_type_input = page.soup.find('input', attrs={'name': ticket_type_name})
+        ticket_type = ticket_type_input.get('value', '未知票種') if ticket_type_input else '未知票種'
+
+        passenger_info_list.append({
+            'field_name': field_name,
+            'passenger_number': passenger_number,
+            'ticket_type': ticket_type
+        })
+
+    return passenger_info_list
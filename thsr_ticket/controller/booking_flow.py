@@ -1,52 +1,53 @@
+from typing import List, Optional
+
 from requests.models import Response
 
-from thsr_ticket.controller.confirm_train_flow import ConfirmTrainFlow
-from thsr_ticket.controller.confirm_ticket_flow import ConfirmTicketFlow
-from thsr_ticket.controller.first_page_flow import FirstPageFlow
-from thsr_ticket.view_model.error_feedback import ErrorFeedback
-from thsr_ticket.view_model.booking_result import BookingResult
-from thsr_ticket.view.web.show_error_msg import ShowErrorMsg
-from thsr_ticket.view.web.show_booking_result import ShowBookingResult
+from thsr_ticket.controller.booking_engine import BookingEngine, BookingState, EngineHook
+from thsr_ticket.controller.engine_hooks import CheckpointHook, ConsoleHook, PrefetchHook, resume_state
+from thsr_ticket.controller.input_provider import InteractiveInputProvider
 from thsr_ticket.view.common import history_info
 from thsr_ticket.model.db import ParamDB, Record
+from thsr_ticket.model.checkpoint import FLOW_MANUAL, Checkpoint, CheckpointStore
 from thsr_ticket.remote.http_request import HTTPRequest
 
 
 class BookingFlow:
-    def __init__(self) -> None:
-        self.client = HTTPRequest()
+    def __init__(
+        self,
+        client: Optional[HTTPRequest] = None,
+        checkpoints: Optional[CheckpointStore] = None,
+    ) -> None:
+        self.client = client or HTTPRequest()
         self.db = ParamDB()
         self.record = Record()
-
-        self.error_feedback = ErrorFeedback()
-        self.show_error_msg = ShowErrorMsg()
+        self.checkpoints = checkpoints
 
     def run(self) -> Response:
         self.show_history()
-
-        # First page. Booking options
-        book_resp, book_model = FirstPageFlow(client=self.client, record=self.record).run()
-        if self.show_error(book_resp.content):
-            return book_resp
-
-        # Second page. Train confirmation
-        train_resp, train_model = ConfirmTrainFlow(self.client, book_resp).run()
-        if self.show_error(train_resp.content):
-            return train_resp
-
-        # Final page. Ticket confirmation
-        ticket_resp, ticket_model = ConfirmTicketFlow(self.client, train_resp, self.record).run()
-        if self.show_error(ticket_resp.content):
-            return ticket_resp
-
-        # Result page.
-        result_model = BookingResult().parse(ticket_resp.content)
-        book = ShowBookingResult()
-        book.show(result_model)
-        print("\n請使用官方提供的管道完成後續付款以及取票!!")
-
-        self.db.save(book_model, ticket_model)
-        return ticket_resp
+        self.client.start_run()
+        return self.finish(self.engine().run())
+
+    def resume(self, checkpoint: Checkpoint) -> Response:
+        """從檢查點最後完成的步驟繼續訂票"""
+        print(f"從上次中斷處繼續訂票（{int(checkpoint.age())} 秒前）...")
+        self.record = Record(**checkpoint.context)
+        self.client.start_run()
+        checkpoint.restore_cookies(self.client.sess)
+        start, state = resume_state(checkpoint)
+        return self.finish(self.engine().run(state, start))
+
+    def engine(self) -> BookingEngine:
+        # 使用者填寫表單時在背景準備首頁與驗證碼
+        hooks: List[EngineHook] = [ConsoleHook(), PrefetchHook(self.client)]
+        if self.checkpoints is not None:
+            hooks.append(CheckpointHook(self.checkpoints, self.client, FLOW_MANUAL, self.record._asdict()))
+        return BookingEngine(self.client, InteractiveInputProvider(self.record), hooks)
+
+    def finish(self, state: BookingState) -> Response:
+        # 儲存成功的訂單至歷史紀錄
+        if state.completed:
+            self.db.save(state.book_model, state.ticket_model)
+        return state.response
 
     def show_history(self) -> None:
         hist = self.db.get_history()
@@ -55,11 +56,3 @@ class BookingFlow:
         h_idx = history_info(hist)
         if h_idx is not None:
             self.record = hist[h_idx]
-
-    def show_error(self, html: bytes) -> bool:
-        errors = self.error_feedback.parse(html)
-        if len(errors) == 0:
-            return False
-
-        self.show_error_msg.show(errors)
-        return True
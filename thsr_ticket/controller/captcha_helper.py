@@ -4,19 +4,23 @@ import time
 from typing import Callable, List
 
 from PIL import Image
-from bs4 import BeautifulSoup
 
+from thsr_ticket.controller.errors import CaptchaUnsolved
 from thsr_ticket.ml.ocr import recognize_captcha
 from thsr_ticket.configs.web.parse_html_element import ERROR_FEEDBACK
+from thsr_ticket.view_model.parsed_page import ParsedPage, PageSource
+from thsr_ticket.view_model.page_scanner import PageKind
 
 MAX_CAPTCHA_RETRY = 3
 CAPTCHA_RETRY_INTERVAL = 1  # 秒
 
 
-def parse_error_feedback(html: bytes) -> List[str]:
+def parse_error_feedback(page: PageSource) -> List[str]:
     """解析頁面中的錯誤訊息"""
-    page = BeautifulSoup(html, features='html.parser')
-    error_elements = page.find_all(**ERROR_FEEDBACK)
+    page = ParsedPage.of(page)
+    if page.scan.errors is not None:
+        return [err.strip() for err in page.scan.errors]
+    error_elements = page.soup.find_all(**ERROR_FEEDBACK)
     return [elem.get_text(strip=True) for elem in error_elements]
 
 
@@ -30,9 +34,14 @@ def is_no_train_error(errors: List[str]) -> bool:
     return any('查無可售車次' in err or '車票已售完' in err for err in errors)
 
 
-def has_train_data(html: bytes) -> bool:
+def has_train_data(page: PageSource) -> bool:
     """檢查是否有班次資料（表示成功進入第二頁）"""
-    return b'TrainQueryDataViewPanel' in html
+    return ParsedPage.of(page).scan.kind is PageKind.TRAIN_LIST
+
+
+def has_passenger_form(page: PageSource) -> bool:
+    """檢查是否直接進入乘客資訊頁（依車次訂票時略過第二頁）"""
+    return ParsedPage.of(page).scan.kind is PageKind.PASSENGER_FORM
 
 
 def input_captcha(img_resp: bytes, force_manual: bool = False) -> str:
@@ -63,3 +72,17 @@ def input_captcha(img_resp: bytes, force_manual: bool = False) -> str:
     else:
         print('OCR 識別失敗，請手動輸入驗證碼：')
         return input()
+
+
+def ocr_captcha(img_resp: bytes, force_manual: bool = False) -> str:
+    """只以 OCR 辨識驗證碼，不顯示圖片也不詢問使用者
+
+    Raises:
+        CaptchaUnsolved: OCR 無法辨識，或重試次數用盡（`force_manual`）
+    """
+    if force_manual:
+        raise CaptchaUnsolved(f"驗證碼連續 {MAX_CAPTCHA_RETRY} 次辨識錯誤")
+    ocr_result = recognize_captcha(img_resp)
+    if not ocr_result:
+        raise CaptchaUnsolved("OCR 無法辨識驗證碼")
+    return ocr_result
@@ -0,0 +1,226 @@
+"""`BookingEngine` 的掛勾
+
+- `StepDelayHook`：送出表單前等待固定間隔，避免請求過於密集
+- `TimingHook`：記錄每個步驟的耗時
+- `CheckpointHook`：每完成一頁就儲存檢查點，可用 `resume_state` 從中斷處繼續
+- `PrefetchHook`：使用者填寫表單時在背景預熱連線與 OCR，並在輸入快結束時先取得首頁與驗證碼
+- `DeadlineHook`：超過期限時不再開始下一個步驟
+- `ConsoleHook`：把引擎的事件顯示在終端機上
+- `CallbackHook`：把引擎的事件轉交給呼叫端
+"""
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from thsr_ticket.configs.web.param_schema import BookingModel, ConfirmTrainModel
+from thsr_ticket.controller.booking_engine import BookingEvent, BookingState, EngineHook, EventKind, Step
+from thsr_ticket.controller.errors import DeadlineExceeded
+from thsr_ticket.ml.ocr import warm_up_ocr
+from thsr_ticket.model.checkpoint import (
+    STEP_BOOKING_FORM,
+    STEP_TRAIN,
+    Checkpoint,
+    CheckpointStore,
+    make_checkpoint,
+)
+from thsr_ticket.remote.http_request import HTTPRequest
+from thsr_ticket.view.web.show_booking_result import ShowBookingResult
+from thsr_ticket.view.web.show_error_msg import ShowErrorMsg
+from thsr_ticket.view_model.booking_page import StreamedBookingPage
+from thsr_ticket.view_model.parsed_page import PageSource
+
+
+class StepDelayHook(EngineHook):
+    """在送出各頁表單前等待 `delay` 秒"""
+
+    SUBMIT_STEPS = (Step.S1_SUBMIT, Step.S2_SELECT, Step.S3_SUBMIT)
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+
+    def before_step(self, step: Step, state: BookingState) -> None:
+        if step in self.SUBMIT_STEPS and self.delay > 0:
+            time.sleep(self.delay)
+
+
+class DeadlineHook(EngineHook):
+    """每個步驟開始前檢查期限，`deadline` 為 `clock()`（預設 `time.monotonic`）的時刻"""
+
+    def __init__(self, deadline: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.deadline = deadline
+        self.clock = clock
+
+    def before_step(self, step: Step, state: BookingState) -> None:
+        if self.clock() >= self.deadline:
+            raise DeadlineExceeded(f"步驟 {step.value} 開始前已超過期限")
+
+
+class TimingHook(EngineHook):
+    """記錄每個步驟的耗時（秒），同一步驟執行多次（如驗證碼重試）時累加"""
+
+    def __init__(self) -> None:
+        self.durations: Dict[Step, float] = {}
+        self._started = 0.0
+
+    def before_step(self, step: Step, state: BookingState) -> None:
+        self._started = time.perf_counter()
+
+    def after_step(self, step: Step, state: BookingState, next_step: Optional[Step]) -> None:
+        elapsed = time.perf_counter() - self._started
+        self.durations[step] = self.durations.get(step, 0.0) + elapsed
+
+    def report(self) -> str:
+        return "、".join(f"{step.value} {sec * 1000:.0f} ms" for step, sec in self.durations.items())
+
+
+class CheckpointHook(EngineHook):
+    """第一、二頁送出成功後儲存檢查點，第三頁送出成功後清除
+
+    依車次訂票時第一頁的回應就是第三頁，直接存為選完班次的檢查點。
+    """
+
+    def __init__(self, store: CheckpointStore, client: HTTPRequest, flow: str, context: dict) -> None:
+        """
+        Args:
+            store: 檢查點檔案
+            client: 取得 Cookie 的 HTTPRequest
+            flow: "auto" 或 "manual"，繼續時用來選擇流程
+            context: 繼續時重建輸入來源所需的設定
+        """
+        self.store = store
+        self.client = client
+        self.flow = flow
+        self.context = context
+
+    def after_step(self, step: Step, state: BookingState, next_step: Optional[Step]) -> None:
+        if step is Step.S1_SUBMIT and next_step is Step.S2_SELECT:
+            self._save(STEP_BOOKING_FORM, state.book_resp, state)
+        elif next_step is Step.S3_SUBMIT and step in (Step.S1_SUBMIT, Step.S2_SELECT):
+            self._save(STEP_TRAIN, state.train_resp, state)
+        elif step is Step.S3_SUBMIT and next_step is Step.RESULT:
+            self.store.clear()
+
+    def _save(self, step: str, resp: PageSource, state: BookingState) -> None:
+        models = {}
+        if state.book_model is not None:
+            models["booking"] = state.book_model.dict(exclude_unset=True)
+        if state.train_model is not None:
+            models["train"] = state.train_model.dict(exclude_unset=True)
+        self.store.save(make_checkpoint(
+            self.flow, step, self.client.sess, self.client.base_url, resp, models, self.context
+        ))
+
+
+def resume_state(checkpoint: Checkpoint) -> Tuple[Step, BookingState]:
+    """由檢查點重建引擎的狀態
+
+    Returns:
+        (下一個要執行的步驟, 已完成步驟的資料)
+    """
+    state = BookingState()
+    if "booking" in checkpoint.models:
+        state.book_model = BookingModel(**checkpoint.models["booking"])
+    if "train" in checkpoint.models:
+        state.train_model = ConfirmTrainModel(**checkpoint.models["train"])
+    state.response = checkpoint.page
+    if checkpoint.step == STEP_BOOKING_FORM:
+        state.book_resp = state.response
+        return Step.S2_SELECT, state
+    state.train_resp = state.response
+    return Step.S3_SUBMIT, state
+
+
+class LandingPrefetcher:
+    """在使用者回答提示時，於背景執行緒準備第一頁
+
+    啟動後立即預熱連線與 OCR 引擎，收到 `prefetch()` 後才取得首頁與驗證碼，
+    `result()` 等待並回傳結果（背景發生的例外會在此重新拋出）。
+    """
+
+    def __init__(self, client: HTTPRequest) -> None:
+        self.client = client
+        self._fetch = threading.Event()
+        self._thread = threading.Thread(target=self._work, name='landing-prefetch', daemon=True)
+        self._landing: Optional[StreamedBookingPage] = None
+        self._img: bytes = b''
+        self._error: Optional[BaseException] = None
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def prefetch(self) -> None:
+        """開始取得首頁與驗證碼（重複呼叫無作用）"""
+        self._fetch.set()
+
+    def result(self) -> Tuple[StreamedBookingPage, bytes]:
+        """等待首頁與驗證碼圖片下載完成
+
+        Returns:
+            已讀完的首頁與驗證碼圖片內容
+        """
+        self.prefetch()
+        if self._thread.is_alive():
+            print('請稍等...')
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        assert self._landing is not None
+        return self._landing, self._img
+
+    def _work(self) -> None:
+        # 預熱失敗不影響訂票，真正的請求會再回報錯誤
+        self.client.warm_up()
+        warm_up_ocr()
+        self._fetch.wait()
+        try:
+            landing = self.client.open_booking_page()
+            self._img = self.client.request_security_code_img(landing).content
+            landing.release()
+            self._landing = landing
+        except BaseException as e:
+            self._error = e
+
+
+class PrefetchHook(EngineHook):
+    """收集表單輸入時以 `LandingPrefetcher` 在背景準備第一頁"""
+
+    def __init__(self, client: HTTPRequest) -> None:
+        self.client = client
+        self._prefetcher: Optional[LandingPrefetcher] = None
+
+    def before_step(self, step: Step, state: BookingState) -> None:
+        if step is Step.FORM:
+            self._prefetcher = LandingPrefetcher(self.client)
+            self._prefetcher.start()
+        elif step is Step.LANDING and self._prefetcher is not None:
+            prefetcher, self._prefetcher = self._prefetcher, None
+            state.landing, state.captcha_image = prefetcher.result()
+
+    def prepare(self, step: Step, state: BookingState) -> None:
+        if step is Step.LANDING and self._prefetcher is not None:
+            self._prefetcher.prefetch()
+
+
+class ConsoleHook(EngineHook):
+    """在終端機上顯示進度、錯誤訊息與訂位結果"""
+
+    def on_event(self, event: BookingEvent) -> None:
+        if event.kind is EventKind.REJECTED:
+            ShowErrorMsg().show(event.data)
+        elif event.kind is EventKind.COMPLETED:
+            ShowBookingResult().show(event.data)
+            print("\n請使用官方提供的管道完成後續付款以及取票!!")
+        elif event.kind is EventKind.TRAIN_SELECTED:
+            print(f"\n{event.message}")
+        else:
+            print(event.message)
+
+
+class CallbackHook(EngineHook):
+    """把每個事件交給 `callback`"""
+
+    def __init__(self, callback: Callable[[BookingEvent], None]) -> None:
+        self.callback = callback
+
+    def on_event(self, event: BookingEvent) -> None:
+        self.callback(event)
@@ -0,0 +1,49 @@
+"""訂票失敗時拋出的例外
+
+都繼承 `BookingError`，呼叫端可一次捕捉；設定或輸入資料造成的錯誤同時繼承 `ValueError`。
+"""
+from typing import Sequence
+
+
+class BookingError(Exception):
+    """訂票失敗"""
+
+
+class InvalidConfig(BookingError, ValueError):
+    """設定無法解析或編譯成 `BookingPlan`"""
+
+
+class NoTrainAvailable(BookingError, ValueError):
+    """查無可售車次或車票已售完"""
+
+
+class NoMatchingTrain(BookingError, ValueError):
+    """有可售車次，但沒有符合選車條件的班次"""
+
+
+class InvalidPassengerIds(BookingError, ValueError):
+    """需要身分證的乘客缺少身分證字號，或身分證字號格式錯誤、重複"""
+
+
+class CaptchaUnsolved(BookingError):
+    """無法在不詢問使用者的情況下取得驗證碼"""
+
+
+class BookingCancelled(BookingError):
+    """使用者取消訂票"""
+
+
+class BookingRejected(BookingError):
+    """伺服器回傳錯誤訊息"""
+
+    def __init__(self, errors: Sequence[str]) -> None:
+        self.errors = list(errors)
+        super(BookingRejected, self).__init__("；".join(self.errors) or "訂票未完成")
+
+
+class ConnectionFailed(BookingError):
+    """連線失敗或時間預算用盡，原始的 `RequestException` 見 `__cause__`"""
+
+
+class DeadlineExceeded(BookingError):
+    """超過呼叫端指定的期限"""
@@ -0,0 +1,119 @@
+"""無互動的訂票介面
+
+供其他程式（服務、排程、同時執行多筆訂票）直接呼叫，整個過程不使用 `print`、`input` 或開啟圖片：
+
+    plan = compile_config(raw_config)
+    outcome = book(plan, on_event=lambda event: log.info(event.message))
+    print(outcome.pnr)
+
+- 進度以 `BookingEvent` 交給 `on_event`
+- 成功時回傳 `BookingOutcome`，訂位結果為 `Ticket` 資料
+- 失敗時拋出 `errors.BookingError` 的子類別（伺服器錯誤訊息、無車次、驗證碼、連線逾時等）
+
+每次呼叫預設使用新的 `HTTPRequest`，不同執行緒可各自呼叫 `book`。
+"""
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from requests.exceptions import RequestException
+
+from thsr_ticket.configs.user_config import parse_config
+from thsr_ticket.controller.auto_booking_flow import STEP_DELAY
+from thsr_ticket.controller.booking_engine import BookingEngine, BookingEvent, EngineHook, Step
+from thsr_ticket.controller.captcha_helper import is_no_train_error, ocr_captcha
+from thsr_ticket.controller.engine_hooks import CallbackHook, DeadlineHook, StepDelayHook, TimingHook
+from thsr_ticket.controller.errors import (
+    BookingRejected,
+    ConnectionFailed,
+    DeadlineExceeded,
+    InvalidConfig,
+    NoTrainAvailable,
+)
+from thsr_ticket.controller.input_provider import HeadlessInputProvider
+from thsr_ticket.model.booking_plan import BookingPlan, compile_plan, config_digest
+from thsr_ticket.remote.http_request import HTTPRequest
+from thsr_ticket.remote.retry_policy import BudgetExceeded
+from thsr_ticket.view_model.booking_result import Ticket
+
+
+class BookingOutcome(NamedTuple):
+    tickets: List[Ticket]  # 去回程時依序為去程、回程
+    durations: Dict[Step, float]  # 各步驟耗時（秒）
+    captcha_errors: int  # 驗證碼辨識錯誤的次數
+
+    @property
+    def pnr(self) -> str:
+        """訂位代號"""
+        return self.tickets[0].id
+
+
+def compile_config(raw_config: dict) -> BookingPlan:
+    """把 config.json 格式的設定編譯成 `BookingPlan`
+
+    Raises:
+        InvalidConfig: 設定缺少欄位或內容錯誤
+    """
+    try:
+        return compile_plan(parse_config(raw_config), config_digest(raw_config))
+    except KeyError as e:
+        raise InvalidConfig(f"缺少設定欄位：{e}") from e
+    except ValueError as e:
+        raise InvalidConfig(str(e)) from e
+
+
+def book(
+    plan: BookingPlan,
+    client: Optional[HTTPRequest] = None,
+    captcha_solver: Callable[[bytes, bool], str] = ocr_captcha,
+    on_event: Optional[Callable[[BookingEvent], None]] = None,
+    step_delay: float = STEP_DELAY,
+    deadline: Optional[float] = None,
+) -> BookingOutcome:
+    """以預先編譯的計畫訂票
+
+    Args:
+        plan: `compile_config` 或 `compile_plan` 的結果
+        client: 指定的 HTTPRequest（如共用連線池或指向替身伺服器），未指定時建立新的連線
+        captcha_solver: 驗證碼輸入方式，參數為 (圖片 bytes, 是否已用盡 OCR 重試次數)
+        on_event: 接收進度、錯誤與結果事件
+        step_delay: 送出各頁表單前等待的秒數
+        deadline: 最晚完成的時刻（`time.monotonic()`），同時限制整體時間預算，未指定時不限制
+
+    Raises:
+        BookingRejected: 伺服器回傳錯誤訊息
+        NoTrainAvailable / NoMatchingTrain: 沒有可售或符合條件的班次
+        InvalidPassengerIds: 需要身分證的乘客未在設定中提供正確的身分證字號
+        CaptchaUnsolved: 無法取得驗證碼
+        ConnectionFailed: 連線失敗或時間預算用盡
+        DeadlineExceeded: 超過 `deadline`
+    """
+    client = client or HTTPRequest()
+    timing = TimingHook()
+    hooks: List[EngineHook] = [StepDelayHook(step_delay), timing]
+    if on_event is not None:
+        hooks.append(CallbackHook(on_event))
+    total = client.budget.total
+    if deadline is not None:
+        hooks.append(DeadlineHook(deadline))
+    engine = BookingEngine(client, HeadlessInputProvider(plan.config, captcha_solver, plan), hooks)
+
+    client.start_run()
+    if deadline is not None:
+        # 只在這一次訂票縮短整體時間預算，結束後還原呼叫端 client 原本的設定
+        client.budget.total = min(total, max(deadline - time.monotonic(), 0.0))
+    try:
+        state = engine.run()
+    except BudgetExceeded as e:
+        if deadline is not None and e.scope == "run":
+            raise DeadlineExceeded(str(e)) from e
+        raise ConnectionFailed(str(e)) from e
+    except RequestException as e:
+        raise ConnectionFailed(str(e)) from e
+    finally:
+        client.budget.total = total
+    if not state.completed:
+        errors = [error.msg for error in state.errors]
+        if is_no_train_error(errors):
+            raise NoTrainAvailable("；".join(errors))
+        raise BookingRejected(errors)
+    return BookingOutcome(state.tickets, timing.durations, state.captcha_errors)
@@ -0,0 +1,418 @@
+"""訂票流程的輸入來源
+
+`BookingEngine` 的每個步驟都向 `InputProvider` 取得需要的資料，手動與自動模式只差在 provider：
+
+- `InteractiveInputProvider`：逐項詢問使用者（可帶入歷史紀錄）
+- `ConfigInputProvider`：使用 `parse_config` 解析後的設定，程式呼叫時也可直接傳入同格式的 dict；
+  帶有預先編譯的 `BookingPlan` 時，引擎直接套用其中的表單
+- `HeadlessInputProvider`：與 `ConfigInputProvider` 相同但完全不詢問使用者，資料不足時拋出例外
+"""
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from thsr_ticket.configs.common import DAYS_BEFORE_BOOKING_AVAILABLE, MAX_TICKET_NUM
+from thsr_ticket.configs.registry import STATIONS, TIME_BY_SLOT, TIME_SLOTS
+from thsr_ticket.configs.user_config import TICKET_TYPE_NAME_MAP
+from thsr_ticket.configs.web.enums import StationMapping, TicketType, TripType
+from thsr_ticket.configs.web.param_schema import Train
+from thsr_ticket.controller.captcha_helper import input_captcha, ocr_captcha
+from thsr_ticket.controller.errors import BookingCancelled, InvalidPassengerIds, NoMatchingTrain
+from thsr_ticket.model.booking_plan import BookingPlan
+from thsr_ticket.model.db import Record
+from thsr_ticket.view.web.show_avail_trains import ShowAvailTrains
+from thsr_ticket.view_model.train_ranking import RankingPolicy, TrainRanker
+
+# 剩下幾題時通知引擎準備首頁：太早驗證碼可能在使用者輸入時過期，太晚則要等待下載
+PREFETCH_LEAD_PROMPTS = 2
+
+BOOKING_FORM_FIELDS = (
+    "start_station",
+    "dest_station",
+    "outbound_date",
+    "outbound_time",
+    "adult_ticket_num",
+    "child_ticket_num",
+    "disabled_ticket_num",
+    "elder_ticket_num",
+    "college_ticket_num",
+    "youth_ticket_num",
+)
+# 依車次訂票或去回程時才有的欄位
+OPTIONAL_FORM_FIELDS = (
+    "search_by",
+    "to_train_id",
+    "back_train_id",
+    "types_of_trip",
+    "inbound_date",
+    "inbound_time",
+)
+
+
+class TicketInfo(NamedTuple):
+    personal_id: str
+    phone: str = ""
+    email: str = ""
+    passenger_ids: Sequence[str] = ()  # 依序填入需要身分證的乘客
+
+
+def _validate_id_format(id_number: str) -> bool:
+    """驗證身分證字號格式
+
+    Args:
+        id_number: 身分證字號
+
+    Returns:
+        是否為有效格式
+    """
+    if not id_number:
+        return False
+    if len(id_number) != 10:
+        return False
+    return True
+
+
+def _prompt_passenger_ids(passenger_info_list: list, predefined_ids: Sequence[str] = ()) -> dict:
+    """詢問每位乘客的身分證字號
+
+    Args:
+        passenger_info_list: 乘客資訊列表，每個元素包含 field_name, passenger_number, ticket_type
+        predefined_ids: 預先設定的身分證字號列表（可選）
+
+    Returns:
+        {欄位名稱: 身分證字號} 的字典
+    """
+    if not passenger_info_list:
+        return {}
+
+    print(f"\n偵測到 {len(passenger_info_list)} 位乘客需要填寫身分證")
+    print("=" * 50)
+
+    passenger_id_map = {}
+
+    for idx, passenger_info in enumerate(passenger_info_list):
+        passenger_num = passenger_info['passenger_number']
+        ticket_type = passenger_info['ticket_type']
+        field_name = passenger_info['field_name']
+
+        # 優先使用預先設定的身分證（如果有）
+        if idx < len(predefined_ids) and predefined_ids[idx]:
+            id_number = predefined_ids[idx]
+            print(f"乘客 {passenger_num} ({ticket_type}) 身分證字號：{id_number} [使用預設值]")
+        else:
+            # 詢問用戶輸入
+            while True:
+                id_number = input(f"乘客 {passenger_num} ({ticket_type}) 身分證字號：").strip()
+
+                if _validate_id_format(id_number):
+                    break
+                else:
+                    print("  ⚠️  身分證格式錯誤（應為 10 碼），請重新輸入")
+
+        passenger_id_map[field_name] = id_number
+
+    print("=" * 50)
+    return passenger_id_map
+
+
+def _find_duplicate_ids(passenger_id_map: dict, passenger_info_list: list) -> Dict[str, List[dict]]:
+    """找出被多位乘客使用的身分證字號
+
+    Args:
+        passenger_id_map: {欄位名稱: 身分證字號} 的字典
+        passenger_info_list: 乘客資訊列表
+
+    Returns:
+        {身分證字號: [{passenger_number, ticket_type}, ...]}，只包含重複的身分證
+    """
+    # 建立 {身分證: [(乘客編號, 票種)]} 的映射
+    id_usage: Dict[str, List[dict]] = {}
+    field_to_info = {info['field_name']: info for info in passenger_info_list}
+
+    for field_name, id_number in passenger_id_map.items():
+        passenger_info = field_to_info.get(field_name, {})
+        id_usage.setdefault(id_number, []).append({
+            'passenger_number': passenger_info.get('passenger_number', '?'),
+            'ticket_type': passenger_info.get('ticket_type', '未知')
+        })
+    return {id_number: usages for id_number, usages in id_usage.items() if len(usages) > 1}
+
+
+def _check_duplicate_ids(passenger_id_map: dict, passenger_info_list: list) -> None:
+    """檢查身分證字號是否重複（警告後由使用者決定是否繼續）
+
+    Args:
+        passenger_id_map: {欄位名稱: 身分證字號} 的字典
+        passenger_info_list: 乘客資訊列表
+
+    Raises:
+        BookingCancelled: 使用者選擇不繼續
+    """
+    duplicates = _find_duplicate_ids(passenger_id_map, passenger_info_list)
+    for id_number, usages in duplicates.items():
+        print(f"\n⚠️  警告：身分證字號 {id_number} 被多位乘客使用：")
+        for usage in usages:
+            print(f"   - 乘客 {usage['passenger_number']} ({usage['ticket_type']})")
+
+        # 檢查是否違反規則
+        ticket_types = [u['ticket_type'] for u in usages]
+        if '敬老票' in ticket_types:
+            elder_count = ticket_types.count('敬老票')
+            if elder_count > 1:
+                print("   ❌ 錯誤：同一身分證號僅能用於 1 位乘客之敬老票")
+            if any(t in ['愛心票'] for t in ticket_types):
+                print("   ❌ 錯誤：同一身分證號不能同時用於購買敬老票及愛心票")
+
+    if duplicates:
+        print("\n注意：以上警告可能導致訂票失敗，請確認是否繼續")
+        confirm = input("是否繼續提交？(y/n)：").strip().lower()
+        if confirm != 'y':
+            raise BookingCancelled("已取消訂票")
+
+
+class InputProvider:
+    """訂票流程的輸入來源
+
+    Args:
+        captcha_solver: 驗證碼輸入方式，參數為 (圖片 bytes, 是否強制手動輸入)
+    """
+
+    plan: Optional[BookingPlan] = None  # 預先編譯的表單，有的話引擎不再驗證與序列化
+
+    def __init__(self, captcha_solver: Callable[[bytes, bool], str] = input_captcha) -> None:
+        self.captcha_solver = captcha_solver
+
+    def booking_form(self, ready: Callable[[], None]) -> dict:
+        """第一頁的表單資料（`BOOKING_FORM_FIELDS`，不含驗證碼與首頁預設值）
+
+        Args:
+            ready: 輸入即將完成時呼叫，讓引擎提前取得首頁與驗證碼
+        """
+        raise NotImplementedError
+
+    def captcha(self, image: bytes, force_manual: bool) -> str:
+        return self.captcha_solver(image, force_manual)
+
+    def select_train(self, trains: List[Train], inbound: bool = False) -> Train:
+        """選擇班次，`inbound` 為 True 時是去回程的回程班次"""
+        raise NotImplementedError
+
+    def ticket_info(self) -> TicketInfo:
+        raise NotImplementedError
+
+    def passenger_ids(self, passenger_fields: List[dict], predefined_ids: Sequence[str]) -> Dict[str, str]:
+        """需要身分證的乘客欄位 -> 身分證字號，未預先設定的會詢問使用者"""
+        passenger_id_map = _prompt_passenger_ids(passenger_fields, predefined_ids)
+        _check_duplicate_ids(passenger_id_map, passenger_fields)
+        return passenger_id_map
+
+
+class ConfigInputProvider(InputProvider):
+    """使用設定檔（`parse_config` 的結果）的輸入，依 `train_policy` 自動選擇班次
+
+    未設定選車條件時選擇乘車時間最短的班次，去回程的回程班次依 `return_train_policy` 選擇。
+    """
+
+    def __init__(
+        self,
+        config: dict,
+        captcha_solver: Callable[[bytes, bool], str] = input_captcha,
+        plan: Optional[BookingPlan] = None,
+    ) -> None:
+        super(ConfigInputProvider, self).__init__(captcha_solver)
+        self.config = config
+        self.plan = plan
+        self.ranker = _ranker(config.get("train_policy", {}), config.get("to_train_id"))
+        self.inbound_ranker = _ranker(config.get("return_train_policy", {}), config.get("back_train_id"))
+
+    def booking_form(self, ready: Callable[[], None]) -> dict:
+        ready()
+        form = {name: self.config[name] for name in BOOKING_FORM_FIELDS}
+        form.update((name, self.config[name]) for name in OPTIONAL_FORM_FIELDS if name in self.config)
+        return form
+
+    def select_train(self, trains: List[Train], inbound: bool = False) -> Train:
+        leg = "回程" if inbound else "去程"
+        selected_train = (self.inbound_ranker if inbound else self.ranker).best(trains)
+        if selected_train is None:
+            raise NoMatchingTrain(f"{leg} {len(trains)} 個可用班次中沒有符合選車條件的班次")
+        return selected_train
+
+    def ticket_info(self) -> TicketInfo:
+        return TicketInfo(
+            personal_id=self.config["personal_id"],
+            phone=self.config.get("phone", ""),
+            email=self.config.get("email", ""),
+            passenger_ids=self.config.get("passenger_ids", ()),
+        )
+
+
+class HeadlessInputProvider(ConfigInputProvider):
+    """不詢問使用者的設定檔輸入，預設只以 OCR 辨識驗證碼
+
+    需要身分證的乘客只使用設定中的 `passenger_ids`，缺少、格式錯誤或重複時拋出 `InvalidPassengerIds`。
+    """
+
+    def __init__(
+        self,
+        config: dict,
+        captcha_solver: Callable[[bytes, bool], str] = ocr_captcha,
+        plan: Optional[BookingPlan] = None,
+    ) -> None:
+        super(HeadlessInputProvider, self).__init__(config, captcha_solver, plan)
+
+    def passenger_ids(self, passenger_fields: List[dict], predefined_ids: Sequence[str]) -> Dict[str, str]:
+        passenger_id_map = {}
+        for idx, passenger_info in enumerate(passenger_fields):
+            id_number = predefined_ids[idx] if idx < len(predefined_ids) else ""
+            if not _validate_id_format(id_number):
+                raise InvalidPassengerIds(
+                    f"乘客 {passenger_info['passenger_number']} ({passenger_info['ticket_type']}) "
+                    "需要 10 碼的身分證字號，請在 passenger_ids 中設定"
+                )
+            passenger_id_map[passenger_info['field_name']] = id_number
+        duplicates = _find_duplicate_ids(passenger_id_map, passenger_fields)
+        if duplicates:
+            raise InvalidPassengerIds(f"身分證字號被多位乘客使用：{'、'.join(duplicates)}")
+        return passenger_id_map
+
+
+def _ranker(policy: dict, train_id: Optional[int]) -> TrainRanker:
+    if train_id:
+        # 依車次訂票卻仍收到班次清單時，只接受指定的車次
+        policy = dict(policy, train_ids=[train_id])
+    return TrainRanker(RankingPolicy(**policy))
+
+
+class InteractiveInputProvider(InputProvider):
+    """逐項詢問使用者，有歷史紀錄時直接帶入"""
+
+    def __init__(self, record: Record = None, captcha_solver: Callable[[bytes, bool], str] = input_captcha) -> None:
+        super(InteractiveInputProvider, self).__init__(captcha_solver)
+        self.record = record
+        self.show_trains = ShowAvailTrains()
+
+    def booking_form(self, ready: Callable[[], None]) -> dict:
+        form_data: dict = {}
+
+        def if_round_trip(prompt: Callable[[], Any]) -> Callable[[], Any]:
+            return lambda: prompt() if form_data['types_of_trip'] == TripType.ROUND_TRIP.value else None
+
+        prompts: List[Tuple[str, Callable[[], Any]]] = [
+            ('start_station', lambda: self.select_station('啟程')),
+            ('dest_station', lambda: self.select_station('到達', default_value=StationMapping.Zuouing.value)),
+            ('outbound_date', lambda: self.select_date('出發')),
+            ('outbound_time', lambda: self.select_time('啟程')),
+            ('types_of_trip', self.select_types_of_trip),
+            ('inbound_date', if_round_trip(lambda: self.select_date('回程'))),
+            ('inbound_time', if_round_trip(lambda: self.select_time('回程'))),
+            ('adult_ticket_num', lambda: self.select_ticket_num(TicketType.ADULT, default_ticket_num=0)),
+            ('child_ticket_num', lambda: self.select_ticket_num(TicketType.CHILD, default_ticket_num=0)),
+            ('disabled_ticket_num', lambda: self.select_ticket_num(TicketType.DISABLED, default_ticket_num=2)),
+            ('elder_ticket_num', lambda: self.select_ticket_num(TicketType.ELDER, default_ticket_num=0)),
+            ('college_ticket_num', lambda: self.select_ticket_num(TicketType.COLLEGE, default_ticket_num=0)),
+            ('youth_ticket_num', lambda: self.select_ticket_num(TicketType.YOUTH, default_ticket_num=1)),
+        ]
+        for idx, (name, prompt) in enumerate(prompts):
+            if len(prompts) - idx == PREFETCH_LEAD_PROMPTS:
+                ready()
+            form_data[name] = prompt()
+        # 單程時不送出回程欄位
+        return {name: value for name, value in form_data.items() if value is not None}
+
+    def select_train(self, trains: List[Train], inbound: bool = False) -> Train:
+        print('\n回程班次：' if inbound else '\n去程班次：')
+        selection = self.show_trains.show(trains, select=True, default_value=1)
+        return trains[selection - 1]
+
+    def ticket_info(self) -> TicketInfo:
+        passenger_ids: Sequence[str] = ()
+        if self.record and self.record.passenger_ids:
+            passenger_ids = self.record.passenger_ids
+        return TicketInfo(
+            personal_id=self.set_personal_id(),
+            phone=self.set_phone_num(),
+            passenger_ids=passenger_ids,
+        )
+
+    def select_station(self, travel_type: str, default_value: int = StationMapping.Taipei.value) -> int:
+        if (
+            self.record
+            and (
+                station := {
+                    '啟程': self.record.start_station,
+                    '到達': self.record.dest_station,
+                }.get(travel_type)
+            )
+        ):
+            return station
+
+        print(f'選擇{travel_type}站：')
+        for station in STATIONS:
+            print(f'{station.web_id}. {station.zh}')
+
+        return int(
+            input(f'輸入選擇(預設: {default_value})：')
+            or default_value
+        )
+
+    def select_types_of_trip(self) -> int:
+        if self.record:
+            # 歷史紀錄沒有回程資料，沿用紀錄時一律訂單程
+            return TripType.ONE_WAY.value
+        answer = input('是否購買去回程？(y/N)：').strip().lower()
+        return TripType.ROUND_TRIP.value if answer == 'y' else TripType.ONE_WAY.value
+
+    def select_date(self, date_type: str) -> str:
+        today = date.today()
+        last_avail_date = today + timedelta(days=DAYS_BEFORE_BOOKING_AVAILABLE)
+        print(f'選擇{date_type}日期（{today}~{last_avail_date}）（預設為今日）：')
+        return input() or str(today)
+
+    def select_time(self, time_type: str, default_value: int = 10) -> str:
+        if self.record and (
+            time_str := {
+                '啟程': self.record.outbound_time,
+                '回程': None,
+            }.get(time_type)
+        ):
+            return time_str
+
+        print('選擇出發時間：')
+        for idx, slot in enumerate(TIME_SLOTS, 1):
+            print(f'{idx}. {TIME_BY_SLOT[slot]}')
+
+        selected_opt = int(input(f'輸入選擇（預設：{default_value}）：') or default_value)
+        return TIME_SLOTS[selected_opt-1]
+
+    def select_ticket_num(self, ticket_type: TicketType, default_ticket_num: int = 1) -> str:
+        if self.record and (
+            ticket_num_str := {
+                TicketType.ADULT: self.record.adult_num,
+                TicketType.CHILD: self.record.child_num,
+                TicketType.DISABLED: self.record.disabled_num,
+                TicketType.ELDER: self.record.elder_num,
+                TicketType.COLLEGE: self.record.college_num,
+                TicketType.YOUTH: self.record.youth_num,
+            }.get(ticket_type)
+        ):
+            return ticket_num_str
+
+        ticket_type_name = TICKET_TYPE_NAME_MAP.get(ticket_type, ticket_type.name)
+
+        print(f'選擇{ticket_type_name}票數（0~{MAX_TICKET_NUM}）（預設：{default_ticket_num}）')
+        ticket_num = int(input() or default_ticket_num)
+        return f'{ticket_num}{ticket_type.value}'
+
+    def set_personal_id(self) -> str:
+        if self.record and (personal_id := self.record.personal_id):
+            return personal_id
+
+        return input('輸入身分證字號：\n')
+
+    def set_phone_num(self) -> str:
+        if self.record and (phone_num := self.record.phone):
+            return phone_num
+
+        if phone_num := input('輸入手機號碼（預設：""）：\n'):
+            return phone_num
+        return ''
@@ -0,0 +1,137 @@
+"""定時啟動自動訂票
+
+熱門班次在開放訂票（`DAYS_BEFORE_BOOKING_AVAILABLE` 天前）的固定時刻開賣。定時模式在目標時刻前：
+
+- 預先載入 OCR 模型（訂票流程的模組在啟動時已全部匯入），表單在等待前就已編譯（見 `BookingPlan`）
+- 建立連線，並以 `Date` 標頭估計伺服器時鐘的偏移
+- 在目標時刻前再預熱一次連線（避免 keep-alive 逾時），最後以忙等待對準毫秒
+
+目標時刻以伺服器時間計算，並回報量得的時鐘偏移與實際啟動的誤差。
+"""
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+
+from requests.models import Response
+
+from thsr_ticket.controller.auto_booking_flow import AutoBookingFlow
+from thsr_ticket.controller.captcha_helper import input_captcha
+from thsr_ticket.ml.ocr import warm_up_ocr
+from thsr_ticket.remote.clock_sync import DEFAULT_SAMPLES, ClockOffset, estimate_clock_offset, sleep_until
+
+# 高鐵網站使用台灣時間（UTC+8，無日光節約時間）
+TAIPEI_TZ = timezone(timedelta(hours=8))
+
+PREPARE_LEAD = 30.0  # 目標時刻前多少秒開始預熱與對時（秒）
+REWARM_LEAD = 1.0  # 目標時刻前多少秒再預熱一次連線（秒）
+SPIN_LEAD = 0.02  # 最後改以忙等待的時間（秒），time.sleep 的精度不足以對準毫秒
+
+_TIME_ONLY = re.compile(r"^\d{1,2}:\d{2}(:\d{2}(\.\d+)?)?$")
+
+
+class LaunchReport(NamedTuple):
+    clock: ClockOffset
+    target: float  # 目標時刻（伺服器時間，epoch 秒）
+    launched: float  # 實際啟動時刻（以量得的偏移換算成伺服器時間）
+
+    @property
+    def skew(self) -> float:
+        """實際啟動比目標晚的秒數"""
+        return self.launched - self.target
+
+
+def parse_launch_time(text: str, now: Optional[datetime] = None) -> float:
+    """解析啟動時刻（台灣時間）
+
+    Args:
+        text: "YYYY-MM-DD HH:MM[:SS[.ffffff]]"（也接受 ISO 格式的 "T"），
+            或只有 "HH:MM[:SS]" 表示下一次到達的該時刻
+        now: 計算「下一次」的基準時間，預設為現在
+
+    Returns:
+        epoch 秒
+
+    Raises:
+        ValueError: 格式錯誤
+    """
+    text = text.strip()
+    now = (now or datetime.now(TAIPEI_TZ)).astimezone(TAIPEI_TZ)
+    if _TIME_ONLY.match(text):
+        hour, minute, *rest = text.split(":")
+        second = float(rest[0]) if rest else 0.0
+        target = now.replace(hour=int(hour), minute=int(minute), second=0, microsecond=0)
+        target += timedelta(seconds=second)
+        if target <= now:
+            target += timedelta(days=1)
+        return target.timestamp()
+    try:
+        target = datetime.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"無法解析啟動時間: {text}。格式為 YYYY-MM-DD HH:MM[:SS] 或 HH:MM[:SS]")
+    if target.tzinfo is None:
+        target = target.replace(tzinfo=TAIPEI_TZ)
+    return target.timestamp()
+
+
+class ScheduledLaunch:
+    """在指定的伺服器時刻啟動 `AutoBookingFlow`"""
+
+    def __init__(
+        self,
+        flow: AutoBookingFlow,
+        target: float,
+        samples: int = DEFAULT_SAMPLES,
+        prepare_lead: float = PREPARE_LEAD,
+    ) -> None:
+        """
+        Args:
+            flow: 要啟動的訂票流程
+            target: 目標時刻（伺服器時間，epoch 秒），見 `parse_launch_time`
+            samples: 對時使用的探測請求數
+            prepare_lead: 目標時刻前多少秒開始預熱與對時
+        """
+        self.flow = flow
+        self.target = target
+        self.samples = samples
+        self.prepare_lead = prepare_lead
+
+    def run(self) -> Optional[Response]:
+        plan = self.flow.load_plan()
+        if plan is None:
+            return None
+        print(f"預定啟動時間：{_format(self.target)}（台灣時間）")
+        # 對時之前本機時鐘是唯一的依據，提早一些開始
+        sleep_until(self.target - self.prepare_lead)
+
+        clock = self.prepare()
+        report = self.wait(clock)
+        print(f"開始訂票，實際啟動誤差 {report.skew * 1000:+.1f} ms")
+        return self.flow.book_plan(plan)
+
+    def prepare(self) -> ClockOffset:
+        """載入 OCR、建立連線並估計時鐘偏移"""
+        print("正在預熱並與伺服器對時...")
+        if self.flow.captcha_solver is input_captcha:
+            warm_up_ocr()
+        self.flow.client.warm_up()
+        clock = estimate_clock_offset(self.flow.client, self.samples)
+        print(
+            f"伺服器時鐘偏移 {clock.offset * 1000:+.1f} ms"
+            f"（±{clock.error * 1000:.1f} ms，RTT {clock.rtt * 1000:.1f} ms，{clock.samples} 個樣本）"
+        )
+        return clock
+
+    def wait(self, clock: ClockOffset) -> LaunchReport:
+        """等待到目標時刻，期間再預熱一次連線"""
+        launch_local = clock.local_time(self.target)
+        sleep_until(launch_local - REWARM_LEAD)
+        self.flow.client.warm_up()
+        sleep_until(launch_local - SPIN_LEAD)
+        while time.time() < launch_local:
+            pass
+        return LaunchReport(clock, self.target, clock.server_time())
+
+
+def _format(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, TAIPEI_TZ).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
@@ -1,12 +1,93 @@
+import argparse
 import sys
 sys.path.append("./")
 
 from thsr_ticket.controller.booking_flow import BookingFlow
 from thsr_ticket.controller.auto_booking_flow import AutoBookingFlow
+from thsr_ticket.controller.availability_watch import MIN_WATCH_INTERVAL, WATCH_INTERVAL, WatchPolicy
+from thsr_ticket.controller.batch_runner import BATCH_GAP, run_batch
+from thsr_ticket.controller.booking_daemon import DAEMON_PORT, run_daemon
+from thsr_ticket.controller.errors import BookingCancelled, ConnectionFailed, NoTrainAvailable
+from thsr_ticket.controller.scheduled_launch import ScheduledLaunch, parse_launch_time
+from thsr_ticket.model.checkpoint import FLOW_AUTO, CheckpointStore
+from thsr_ticket.remote.http_request import HTTPRequest
+from thsr_ticket.remote.retry_policy import BudgetExceeded
 
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="高鐵訂票小幫手")
+    parser.add_argument("--resume", action="store_true", help="從上次中斷的步驟繼續訂票")
+    parser.add_argument(
+        "--at",
+        metavar="TIME",
+        help="在指定的台灣時間自動訂票，格式為 YYYY-MM-DD HH:MM[:SS] 或 HH:MM[:SS]（下一次到達的該時刻）",
+    )
+    parser.add_argument("--batch", action="store_true", help="依序訂購 config.json 中 itineraries 列出的所有行程")
+    parser.add_argument(
+        "--gap",
+        type=float,
+        default=BATCH_GAP,
+        metavar="SECONDS",
+        help=f"批次訂票時相鄰行程開始時間的最小間隔（預設 {BATCH_GAP:g} 秒）",
+    )
+    parser.add_argument("--daemon", action="store_true", help="以常駐服務模式執行，透過本機 HTTP 介面接受訂票工作")
+    parser.add_argument(
+        "--port", type=int, default=DAEMON_PORT, help=f"常駐服務的本機連接埠（預設 {DAEMON_PORT}）"
+    )
+    parser.add_argument("--workers", type=int, default=1, help="常駐服務同時執行的工作數（預設 1）")
+    parser.add_argument(
+        "--watch", action="store_true", help="自動訂票查無符合條件的班次時，定期重新查詢直到出現後繼續訂票"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=WATCH_INTERVAL,
+        metavar="SECONDS",
+        help=f"監看模式的查詢間隔（預設 {WATCH_INTERVAL:g} 秒，最少 {MIN_WATCH_INTERVAL:g} 秒）",
+    )
+    args = parser.parse_args(argv)
+    launch_at = None
+    if args.at:
+        try:
+            launch_at = parse_launch_time(args.at)
+        except ValueError as e:
+            parser.error(str(e))
+
+    watch = WatchPolicy(interval=args.interval) if args.watch else None
+
     print("=== 高鐵訂票小幫手 ===")
+    if args.daemon:
+        run_daemon(port=args.port, workers=args.workers)
+        return
+    checkpoints = CheckpointStore()
+    if args.resume:
+        resume(checkpoints)
+        return
+    if args.batch:
+        # 批次中的每個行程各自使用新的 session，不儲存檢查點
+        run_batch(AutoBookingFlow(), args.gap)
+        return
+    if launch_at is not None:
+        launch = ScheduledLaunch(AutoBookingFlow(checkpoints=checkpoints, watch=watch), launch_at)
+        try:
+            launch.run()
+        except BookingCancelled as e:
+            print(e)
+        except BudgetExceeded as e:
+            print(f"訂票逾時：{e}")
+        except (NoTrainAvailable, ConnectionFailed) as e:
+            print(f"監看結束：{e}")
+        return
+    if watch is not None:
+        # 監看模式只適用於自動訂票
+        try:
+            AutoBookingFlow(checkpoints=checkpoints, watch=watch).run()
+        except BookingCancelled as e:
+            print(e)
+        except (NoTrainAvailable, ConnectionFailed) as e:
+            print(f"監看結束：{e}")
+        return
+
     print("1. 自動訂票（使用 config.json 設定）")
     print("2. 手動訂票")
     print()
@@ -14,11 +95,37 @@ def main():
     choice = input("請選擇模式 (預設: 1): ") or "1"
 
     if choice == "1":
-        flow = AutoBookingFlow()
+        flow = AutoBookingFlow(checkpoints=checkpoints)
+    else:
+        flow = BookingFlow(checkpoints=checkpoints)
+
+    try:
+        flow.run()
+    except BookingCancelled as e:
+        print(e)
+    except BudgetExceeded as e:
+        print(f"訂票逾時：{e}")
+        print("可使用 --resume 從最後完成的步驟繼續")
+
+
+def resume(checkpoints: CheckpointStore) -> None:
+    checkpoint = checkpoints.load()
+    if checkpoint is None:
+        print("沒有可繼續的訂票（檢查點不存在或伺服器 session 已過期）")
+        return
+
+    client = HTTPRequest(base_url=checkpoint.base_url)
+    if checkpoint.flow == FLOW_AUTO:
+        flow = AutoBookingFlow(client, checkpoints=checkpoints)
     else:
-        flow = BookingFlow()
+        flow = BookingFlow(client, checkpoints=checkpoints)
 
-    flow.run()
+    try:
+        flow.resume(checkpoint)
+    except BookingCancelled as e:
+        print(e)
+    except BudgetExceeded as e:
+        print(f"訂票逾時：{e}")
 
 
 if __name__ == "__main__":
@@ -63,3 +63,12 @@ def recognize_captcha(image_bytes: bytes) -> str:
         識別結果字串
     """
     return CaptchaOCR().recognize(image_bytes)
+
+
+def warm_up_ocr() -> bool:
+    """預先載入 OCR 引擎，讓第一次識別不必等待模型載入
+
+    Returns:
+        OCR 引擎是否可用
+    """
+    return CaptchaOCR()._get_ocr() is not None
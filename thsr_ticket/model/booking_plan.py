@@ -0,0 +1,169 @@
+"""預先編譯的訂票計畫
+
+`config.json` 的解析、pydantic 驗證與序列化都與伺服器無關，不必在連線開始後才做。
+`compile_plan` 事先把三個頁面的表單組好，只留下送出時才知道的欄位（插槽）：
+
+- 第一頁：驗證碼，以及首頁提供的座位偏好、行程類型與查詢方式預設值（依車次訂票時查詢方式固定）
+- 第二頁：選擇的班次（去回程時含回程班次）
+- 第三頁：頁面中預設勾選的會員身分
+
+編譯結果以設定內容的雜湊為鍵儲存在本機，設定未變更時下次啟動直接讀取，不必再驗證。
+"""
+import hashlib
+import json
+import os
+from datetime import date
+from typing import Any, Dict, NamedTuple, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+
+from thsr_ticket import MODULE_PATH
+from thsr_ticket.configs.user_config import parse_config
+from thsr_ticket.configs.web.param_schema import BookingModel, ConfirmTicketModel, ConfirmTrainModel
+from thsr_ticket.view_model.booking_page import BookingPageDefaults
+
+PLAN_VERSION = 3  # 表單格式改變時遞增，讓舊的快取失效
+
+Model = TypeVar("Model", bound=BaseModel)
+
+
+def _alias(model: Type[BaseModel], name: str) -> str:
+    return model.__fields__[name].alias
+
+
+# 插槽的欄位名稱
+SECURITY_CODE = _alias(BookingModel, "security_code")
+SEAT_PREFER = _alias(BookingModel, "seat_prefer")
+TYPES_OF_TRIP = _alias(BookingModel, "types_of_trip")
+SEARCH_BY = _alias(BookingModel, "search_by")
+SELECTED_TRAIN = _alias(ConfirmTrainModel, "selected_train")
+SELECTED_INBOUND_TRAIN = _alias(ConfirmTrainModel, "selected_inbound_train")
+MEMBER_RADIO = _alias(ConfirmTicketModel, "member_radio")
+
+# 編譯時暫時填入插槽、能通過驗證的值，送出前一定會被取代
+_BOOKING_STUBS = {"security_code": "", "seat_prefer": "", "types_of_trip": 0, "search_by": "radio31"}
+
+
+class BookingPlan(NamedTuple):
+    digest: str  # 設定內容的雜湊
+    compiled_on: str  # 編譯的日期（ISO 格式），日期驗證以當天為準
+    config: Dict[str, Any]  # `parse_config` 的結果
+    booking: Dict[str, Any]  # 第一頁的表單
+    train: Dict[str, Any]  # 第二頁的表單
+    ticket: Dict[str, Any]  # 第三頁的表單（不含乘客身分證欄位）
+
+    def booking_params(self, security_code: str, defaults: BookingPageDefaults) -> Dict[str, Any]:
+        params = dict(self.booking)
+        params[SECURITY_CODE] = security_code
+        params[SEAT_PREFER] = defaults.seat_prefer
+        # 設定中指定了行程類型（去回程）或查詢方式（依車次）時不使用首頁預設值
+        if "types_of_trip" not in self.config:
+            params[TYPES_OF_TRIP] = defaults.types_of_trip
+        if "search_by" not in self.config:
+            params[SEARCH_BY] = defaults.search_by
+        return params
+
+    def train_params(self, selected_train: str, selected_inbound_train: Optional[str] = None) -> Dict[str, Any]:
+        params = dict(self.train)
+        params[SELECTED_TRAIN] = selected_train
+        if selected_inbound_train is not None:
+            params[SELECTED_INBOUND_TRAIN] = selected_inbound_train
+        return params
+
+    def ticket_params(self, member_radio: str) -> Dict[str, Any]:
+        params = dict(self.ticket)
+        params[MEMBER_RADIO] = member_radio
+        return params
+
+
+def config_digest(raw_config: Dict[str, Any]) -> str:
+    """`config.json` 內容的雜湊（與鍵的順序無關）"""
+    text = json.dumps([PLAN_VERSION, raw_config], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def compile_plan(config: Dict[str, Any], digest: str = "") -> BookingPlan:
+    """驗證並序列化三個頁面的表單
+
+    Args:
+        config: `parse_config` 的結果
+        digest: 原始設定的雜湊，用於快取
+
+    Raises:
+        ValueError: 設定無法通過表單驗證（如日期早於今天）
+    """
+    # parse_config 的結果中，與 BookingModel 同名的鍵即為第一頁的輸入
+    form_data = {name: value for name, value in config.items() if name in BookingModel.__fields__}
+    stubs = {name: value for name, value in _BOOKING_STUBS.items() if name not in form_data}
+    booking = BookingModel(**form_data, **stubs)
+    train = ConfirmTrainModel(selected_train="")
+    ticket = ConfirmTicketModel(
+        personal_id=config["personal_id"],
+        phone_num=config.get("phone", ""),
+        member_radio="",
+        email=config.get("email", ""),
+    )
+    return BookingPlan(
+        digest=digest,
+        compiled_on=date.today().isoformat(),
+        config=config,
+        booking=booking.params(),
+        train=train.params(),
+        ticket=ticket.params(),
+    )
+
+
+def model_from_params(model: Type[Model], params: Dict[str, Any]) -> Model:
+    """由已驗證的表單重建 model（不再驗證），供檢查點與歷史紀錄使用
+
+    值為 None 的欄位即未設定的預設值，不列入 `__fields_set__`，與直接建立 model 時一致。
+    """
+    return model.construct(**{
+        field.name: params[field.alias]
+        for field in model.__fields__.values()
+        if params.get(field.alias) is not None
+    })
+
+
+class PlanCache:
+    """以 JSON 檔保存最近一次編譯的訂票計畫"""
+
+    def __init__(self, path: str = None) -> None:
+        if path is None:
+            path = os.path.join(MODULE_PATH, ".db", "plan.json")
+        self.path = path
+        db_dir = os.path.dirname(path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+    def load(self, digest: str) -> Optional[BookingPlan]:
+        """讀取與 `digest` 相符且當天編譯的計畫，否則回傳 None"""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                plan = BookingPlan(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+        if plan.digest != digest or plan.compiled_on != date.today().isoformat():
+            return None
+        return plan
+
+    def save(self, plan: BookingPlan) -> None:
+        # 內容含身分證，與檢查點相同只允許本人讀取
+        tmp_path = self.path + ".tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(plan._asdict(), f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def load_or_compile(self, raw_config: Dict[str, Any]) -> BookingPlan:
+        """取得 `config.json` 內容對應的計畫，快取不存在時解析、編譯並儲存
+
+        Raises:
+            ValueError: 設定錯誤
+        """
+        digest = config_digest(raw_config)
+        plan = self.load(digest)
+        if plan is None:
+            plan = compile_plan(parse_config(raw_config), digest)
+            self.save(plan)
+        return plan
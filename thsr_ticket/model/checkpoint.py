@@ -0,0 +1,129 @@
+"""訂票進度的檢查點
+
+每完成一個步驟就把 session 的 Cookie、目前的步驟、最後一頁的內容與已組好的表單儲存到本機，
+流程當掉或逾時後可用 `--resume` 從最後完成的步驟繼續，不必重新載入首頁、辨識驗證碼與送出第一頁。
+伺服器的 session 只會保留一段時間，超過 `CHECKPOINT_MAX_AGE` 的檢查點視為失效。
+"""
+import json
+import os
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from requests import Session
+from requests.models import Response
+
+from thsr_ticket import MODULE_PATH
+
+# 已完成的步驟
+STEP_BOOKING_FORM = "booking_form"  # 第一頁已送出，最後一頁為班次清單
+STEP_TRAIN = "train"  # 第二頁已送出，最後一頁為乘客資訊表單
+STEPS = (STEP_BOOKING_FORM, STEP_TRAIN)
+
+FLOW_AUTO = "auto"
+FLOW_MANUAL = "manual"
+
+CHECKPOINT_MAX_AGE = 10 * 60  # 伺服器 session 的保守有效時間（秒）
+
+
+class Checkpoint(NamedTuple):
+    flow: str  # "auto" 或 "manual"
+    step: str  # 最後完成的步驟
+    base_url: str
+    cookies: List[Dict[str, Any]]
+    last_page: str  # 最後一個回應的 HTML
+    models: Dict[str, Dict[str, Any]]  # 已組好的表單（以欄位名稱儲存），如 {"booking": {...}}
+    context: Dict[str, Any]  # 繼續時需要的設定：自動模式為解析後的設定，手動模式為歷史紀錄
+    saved_at: float
+
+    @property
+    def page(self) -> bytes:
+        return self.last_page.encode("utf-8")
+
+    def age(self) -> float:
+        return time.time() - self.saved_at
+
+    def restore_cookies(self, sess: Session) -> None:
+        """把儲存的 Cookie 放回 session"""
+        for cookie in self.cookies:
+            sess.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie["domain"],
+                path=cookie["path"],
+                secure=cookie["secure"],
+                expires=cookie["expires"],
+            )
+
+
+def dump_cookies(sess: Session) -> List[Dict[str, Any]]:
+    return [
+        {
+            "name": cookie.name,
+            "value": cookie.value,
+            "domain": cookie.domain,
+            "path": cookie.path,
+            "secure": cookie.secure,
+            "expires": cookie.expires,
+        }
+        for cookie in sess.cookies
+    ]
+
+
+def make_checkpoint(
+    flow: str,
+    step: str,
+    sess: Session,
+    base_url: str,
+    resp: Response,
+    models: Dict[str, Dict[str, Any]],
+    context: Dict[str, Any],
+) -> Checkpoint:
+    """以目前的 session 與剛完成步驟的回應建立檢查點"""
+    return Checkpoint(
+        flow=flow,
+        step=step,
+        base_url=base_url,
+        cookies=dump_cookies(sess),
+        last_page=resp.content.decode("utf-8", errors="replace"),
+        models=dict(models),
+        context=context,
+        saved_at=time.time(),
+    )
+
+
+class CheckpointStore:
+    """以 JSON 檔保存最近一次未完成的訂票"""
+
+    def __init__(self, path: str = None) -> None:
+        if path is None:
+            path = os.path.join(MODULE_PATH, ".db", "checkpoint.json")
+        self.path = path
+        db_dir = os.path.dirname(path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+    def save(self, checkpoint: Checkpoint) -> None:
+        # 先寫入暫存檔再取代，避免中途結束留下不完整的檔案；內容含 Cookie 與身分證，只允許本人讀取
+        tmp_path = self.path + ".tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(checkpoint._asdict(), f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def load(self, max_age: float = CHECKPOINT_MAX_AGE) -> Optional[Checkpoint]:
+        """讀取檢查點，不存在、損毀或已過期時回傳 None（過期的檔案會一併刪除）"""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                checkpoint = Checkpoint(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+        if checkpoint.step not in STEPS or checkpoint.age() > max_age:
+            self.clear()
+            return None
+        return checkpoint
+
+    def clear(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
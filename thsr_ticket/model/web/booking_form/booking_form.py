@@ -1,10 +1,8 @@
 from datetime import datetime, timedelta
 from typing import Mapping, Any
 
-from jsonschema import validate
-
 from thsr_ticket.model.web.abstract_params import AbstractParams
-from thsr_ticket.configs.web.param_schema import BOOKING_SCHEMA
+from thsr_ticket.configs.web.param_schema import BOOKING_VALIDATOR
 
 
 class BookingForm(AbstractParams):
@@ -72,7 +70,7 @@ class BookingForm(AbstractParams):
         }
 
         if val:
-            validate(params, schema=BOOKING_SCHEMA)
+            BOOKING_VALIDATOR.validate(params)
         return params
 
     @property
@@ -112,11 +110,11 @@ class BookingForm(AbstractParams):
         self._class_type = value
 
     @property
-    def search_by(self) -> int:
+    def search_by(self) -> str:
         return self._search_by
 
     @search_by.setter
-    def search_by(self, value: int) -> None:
+    def search_by(self, value: str) -> None:
         self._validate_value("bookingMethod", value)
         self._search_by = value
 
@@ -221,8 +219,5 @@ class BookingForm(AbstractParams):
         return datetime.strptime(value, '%Y/%m/%d')
 
     def _validate_value(self, proper: str, value: Any) -> None:
-        if (
-            (enums := BOOKING_SCHEMA["properties"][proper].get('enum'))
-            and value not in enums
-        ):
+        if not BOOKING_VALIDATOR.allows(proper, value):
             raise ValueError("Value '{}' is not allowed for this attribute '{}'".format(value, proper))
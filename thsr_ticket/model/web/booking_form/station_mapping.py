@@ -1,16 +0,0 @@
-from enum import Enum
-
-
-class StationMapping(Enum):
-    Nangang = 1
-    Taipei = 2
-    Banqiao = 3
-    Taoyuan = 4
-    Hsinchu = 5
-    Miaoli = 6
-    Taichung = 7
-    Changhua = 8
-    Yunlin = 9
-    Chiayi = 10
-    Tainan = 11
-    Zuouing = 12
@@ -1,12 +1,16 @@
 from collections import namedtuple
 from typing import Iterable
 
+from thsr_ticket.configs.registry import TICKET_CODE, TICKET_COUNTS
+from thsr_ticket.configs.web.enums import TicketType
+
 Code = namedtuple('Code', ['value', 'code'])
 
 
 class BaseTicket:
     def __init__(self, keyword: str = "") -> None:
-        self.combs = [Code(i, "{}{}".format(i, keyword)) for i in range(11)]
+        self.ticket_type = TicketType(keyword) if keyword else None
+        self.combs = [Code(i, "{}{}".format(i, keyword)) for i in TICKET_COUNTS]
 
     def __iter__(self) -> Iterable[Code]:
         return iter(self.combs)
@@ -15,10 +19,10 @@ class BaseTicket:
         return len(self.combs)
 
     def get_code(self, val: int) -> str:
-        for c in self.combs:
-            if c.value == val:
-                return c.code
-        raise ValueError("Can't find corresponding code")
+        code = TICKET_CODE.get((self.ticket_type, val))
+        if code is None:
+            raise ValueError("Can't find corresponding code")
+        return code
 
 
 class AdultTicket(BaseTicket):
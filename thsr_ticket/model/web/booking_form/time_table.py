@@ -1,16 +1,14 @@
 from collections import namedtuple
 from typing import Iterable
 
-from thsr_ticket.configs.web.param_schema import BOOKING_SCHEMA
+from thsr_ticket.configs.registry import TIME_SLOTS
 
 Table = namedtuple('Table', ['value', 'time'])
 
 
 class TimeTable:
     def __init__(self) -> None:
-        self.table = []
-        for idx, t in enumerate(BOOKING_SCHEMA["properties"]["toTimeTable"]["enum"], 1):
-            self.table.append(Table(idx, t))
+        self.table = [Table(idx, t) for idx, t in enumerate(TIME_SLOTS, 1)]
 
     def __iter__(self) -> Iterable[Table]:
         return iter(self.table)
@@ -19,7 +17,6 @@ class TimeTable:
         return len(self.table)
 
     def get_time(self, val: int) -> str:
-        for t in self.table:
-            if t.value == val:
-                return t.time
+        if val in range(1, len(TIME_SLOTS) + 1):
+            return TIME_SLOTS[int(val) - 1]
         raise ValueError("Can't find corresponding time")
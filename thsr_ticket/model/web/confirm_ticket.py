@@ -1,8 +1,7 @@
 from typing import Mapping, Any
-from jsonschema import validate
 
 from thsr_ticket.model.web.abstract_params import AbstractParams
-from thsr_ticket.configs.web.param_schema import CONFIRM_TICKET_SHEMA
+from thsr_ticket.configs.web.param_schema import CONFIRM_TICKET_VALIDATOR
 
 
 class ConfirmTicket(AbstractParams):
@@ -30,7 +29,7 @@ class ConfirmTicket(AbstractParams):
         }
 
         if val:
-            validate(params, schema=CONFIRM_TICKET_SHEMA)
+            CONFIRM_TICKET_VALIDATOR.validate(params)
         return params
 
     @property
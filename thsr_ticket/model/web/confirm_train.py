@@ -1,8 +1,7 @@
 from typing import Mapping, Any
-from jsonschema import validate
 
 from thsr_ticket.model.web.abstract_params import AbstractParams
-from thsr_ticket.configs.web.param_schema import CONFIRM_TRAIN_SCHEMA
+from thsr_ticket.configs.web.param_schema import CONFIRM_TRAIN_VALIDATOR
 
 
 class ConfirmTrain(AbstractParams):
@@ -17,7 +16,7 @@ class ConfirmTrain(AbstractParams):
         }
 
         if val:
-            validate(params, schema=CONFIRM_TRAIN_SCHEMA)
+            CONFIRM_TRAIN_VALIDATOR.validate(params)
         return params
 
     @property
@@ -0,0 +1,70 @@
+"""HTTPRequest 的 asyncio 版本
+
+專案沒有引入非同步 HTTP 函式庫，這裡把 `HTTPRequest` 的每個阻塞呼叫交給執行緒池執行，
+讓流程可以用 `asyncio.gather` / `create_task` 同時等待多個請求（例如驗證碼圖片與首頁
+剩餘內容），並與 OCR、頁面解析等工作重疊。所有請求共用同一個 `requests.Session`，
+因此 Cookie 與連線池和同步版本一致。
+"""
+import asyncio
+import functools
+from concurrent.futures import Executor
+from typing import Any, Callable, Mapping, Optional, TypeVar, Union
+
+from requests import Session
+from requests.models import Response
+
+from thsr_ticket.remote.http_request import HTTPRequest
+from thsr_ticket.view_model.booking_page import StreamedBookingPage
+from thsr_ticket.view_model.parsed_page import PageSource
+
+T = TypeVar("T")
+
+
+class AsyncHTTPRequest:
+    def __init__(
+        self,
+        client: Optional[HTTPRequest] = None,
+        executor: Optional[Executor] = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Args:
+            client: 包裝的 HTTPRequest，未指定時以 kwargs 建立
+            executor: 執行阻塞呼叫的執行緒池，未指定時使用 event loop 的預設執行緒池
+        """
+        self.client = client or HTTPRequest(**kwargs)
+        self.executor = executor
+
+    @property
+    def sess(self) -> Session:
+        return self.client.sess
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """在執行緒池中執行阻塞函式（請求、解析、OCR 等）"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def request_booking_page(self) -> Response:
+        return await self.run(self.client.request_booking_page)
+
+    async def open_booking_page(self) -> StreamedBookingPage:
+        return await self.run(self.client.open_booking_page)
+
+    async def release(self, landing: StreamedBookingPage) -> None:
+        """在背景讀完首頁剩餘內容"""
+        await self.run(landing.release)
+
+    async def request_security_code_img(self, book_page: Union[PageSource, StreamedBookingPage]) -> Response:
+        return await self.run(self.client.request_security_code_img, book_page)
+
+    async def refresh_security_code_img(self, img_src: str, error_page: Optional[PageSource] = None) -> Response:
+        return await self.run(self.client.refresh_security_code_img, img_src, error_page)
+
+    async def submit_booking_form(self, params: Mapping[str, Any]) -> Response:
+        return await self.run(self.client.submit_booking_form, params)
+
+    async def submit_train(self, params: Mapping[str, Any]) -> Response:
+        return await self.run(self.client.submit_train, params)
+
+    async def submit_ticket(self, params: Mapping[str, Any], action: Optional[str] = None) -> Response:
+        return await self.run(self.client.submit_ticket, params, action)
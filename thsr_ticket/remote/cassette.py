@@ -0,0 +1,331 @@
+"""HTTP 請求的錄製與重播
+
+錄製模式把每個請求與回應（標頭、Cookie、內容、耗時）依序寫入 gzip 壓縮的 JSON Lines 卡帶檔；
+重播模式則依相同順序讀回這些回應，不需連網即可重現整個訂票流程，方便剖析解析、驗證與
+OCR 的效能，或以真實擷取的頁面二分搜尋解析器的退化。
+
+透過 `HTTPRequest(cassette=..., cassette_mode=...)`，或環境變數 `THSR_CASSETTE`、
+`THSR_CASSETTE_MODE` 啟用（後者可在不修改 `BookingFlow` / `AutoBookingFlow` 的情況下錄製）。
+
+卡帶只允許本人讀取（0o600），寫入前把 JSESSIONID 與第三頁的身分證字號（含同行乘客）、電話、電子郵件換成 `REDACTED`
+（網址、標頭、表單與回應內容中出現的都會替換），重播時整個流程使用同一個替代值，仍可完整重現。
+"""
+import atexit
+import base64
+import gzip
+import http.client
+import io
+import json
+import os
+import re
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import quote, quote_plus, unquote_plus
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+from requests.models import PreparedRequest, Response
+from urllib3 import HTTPResponse
+
+CASSETTE_ENV_VAR = "THSR_CASSETTE"
+CASSETTE_MODE_ENV_VAR = "THSR_CASSETTE_MODE"
+RECORD = "record"
+REPLAY = "replay"
+CASSETTE_MODES = (RECORD, REPLAY)
+
+# 內容以解壓後的形式保存，重播時不再帶這些標頭
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+# 每次執行都會不同的參數值，比對請求時忽略：驗證碼網址的 antiCache 時間戳記與輸入的驗證碼
+_VOLATILE_PARAMS = re.compile(r"(wicket:antiCache|homeCaptcha%3AsecurityCode)=[^&]*")
+REDACTED = "REDACTED"
+_SESSION_ID = re.compile(r"(?i)(JSESSIONID=|;jsessionid=)([^;&?\s\"']+)")
+# 第三頁表單（網址參數或表單內容）中的個人資料：訂位人身分證字號、電話、電子郵件，以及同行乘客的身分證字號
+# （TicketPassengerInfoInputPanel:passengerDataView:N:passengerDataView2:passengerDataIdNumber，冒號可能編碼為 %3A）
+_PERSONAL_FIELDS = re.compile(
+    r"(?:(?<=[?&])|^)(dummyId|dummyPhone|email|(?:\w|%3A|:)*passengerDataIdNumber)=([^&#]+)"
+)
+
+
+class CassetteError(RequestException):
+    """重播時卡帶已用完，或請求與卡帶中的紀錄不符"""
+
+
+class Interaction(NamedTuple):
+    method: str
+    url: str
+    request_headers: List[Tuple[str, str]]
+    request_body: Optional[str]
+    status: int
+    reason: str
+    headers: List[Tuple[str, str]]
+    body: str
+    body_encoding: str  # "utf-8" 或 "base64"（圖片等二進位內容）
+    elapsed: float  # 回應耗時（秒），包含讀取內容
+    offset: float  # 距離錄製開始的秒數
+
+    @property
+    def content(self) -> bytes:
+        if self.body_encoding == "base64":
+            return base64.b64decode(self.body)
+        return self.body.encode("utf-8")
+
+
+def _encode_body(content: bytes) -> Tuple[str, str]:
+    try:
+        return content.decode("utf-8"), "utf-8"
+    except UnicodeDecodeError:
+        return base64.b64encode(content).decode("ascii"), "base64"
+
+
+def _request_body(request: PreparedRequest) -> Optional[str]:
+    body = request.body
+    if isinstance(body, bytes):
+        return body.decode("utf-8", errors="replace")
+    return body
+
+
+def _request_headers(request: PreparedRequest) -> List[Tuple[str, str]]:
+    return [
+        (name, value.decode("latin-1") if isinstance(value, bytes) else value)
+        for name, value in request.headers.items()
+    ]
+
+
+def _response_headers(resp: Response) -> List[Tuple[str, str]]:
+    raw_headers = getattr(resp.raw, "headers", None)
+    # 使用 urllib3 的原始標頭，保留重複的 Set-Cookie
+    items = raw_headers.iteritems() if hasattr(raw_headers, "iteritems") else resp.headers.items()
+    return [(name, value) for name, value in items if name.lower() not in _DROPPED_HEADERS]
+
+
+def _comparable_url(url: str) -> str:
+    """比對用的網址：忽略每次不同的參數與錄製時遮蔽的值"""
+    url = _VOLATILE_PARAMS.sub(r"\1=", url)
+    url = _PERSONAL_FIELDS.sub(r"\1=", url)
+    return _SESSION_ID.sub(r"\1", url)
+
+
+def _same_request(interaction: Interaction, request: PreparedRequest) -> bool:
+    return (
+        interaction.method == request.method
+        and _comparable_url(interaction.url) == _comparable_url(request.url or "")
+    )
+
+
+class Redactor:
+    """把 JSESSIONID 與第三頁送出的個人資料換成 `REDACTED`
+
+    個人資料在送出第三頁時才得知，之後的回應（如訂位結果頁的電話）中出現的同一個值也會替換。
+    """
+
+    def __init__(self) -> None:
+        self.secrets: Set[str] = set()
+
+    def learn_cookies(self, headers: List[Tuple[str, str]]) -> None:
+        for name, value in headers:
+            if name.lower() in ("cookie", "set-cookie"):
+                self.secrets.update(m.group(2) for m in _SESSION_ID.finditer(value) if m.group(2) != REDACTED)
+
+    def form(self, text: Optional[str]) -> Optional[str]:
+        """遮蔽網址參數或表單內容中的個人資料欄位（並記住其值），再替換其他已知的值"""
+        if not text:
+            return text
+
+        def redact(match: "re.Match[str]") -> str:
+            self.secrets.add(unquote_plus(match.group(2)))
+            return f"{match.group(1)}={REDACTED}"
+
+        return self.text(_PERSONAL_FIELDS.sub(redact, text))
+
+    def text(self, text: str) -> str:
+        text = _SESSION_ID.sub(lambda m: m.group(1) + REDACTED, text)
+        # 較長的值先替換，避免其中包含的較短值先被換掉
+        for secret in sorted(self.secrets, key=len, reverse=True):
+            for form in {secret, quote(secret, safe=""), quote_plus(secret, safe="")}:
+                text = text.replace(form, REDACTED)
+        return text
+
+    def headers(self, headers: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        return [(name, self.text(value)) for name, value in headers]
+
+
+class CassetteWriter:
+    """依序寫入卡帶，每筆紀錄寫入後立即 flush，程式中途結束時仍可讀取"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        # 卡帶含頁面與訂位結果，只允許本人讀取
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.chmod(path, 0o600)
+        self._raw = os.fdopen(fd, "wb")
+        self._file = gzip.open(self._raw, "wt", encoding="utf-8")
+        self._redactor = Redactor()
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        atexit.register(self.close)
+
+    def write(self, request: PreparedRequest, resp: Response, elapsed: float) -> None:
+        request_headers = _request_headers(request)
+        headers = _response_headers(resp)
+        with self._lock:
+            redactor = self._redactor
+            # 先處理請求，學到的個人資料才能從同一個回應中遮蔽
+            redactor.learn_cookies(request_headers + headers)
+            url = redactor.form(request.url)
+            request_body = redactor.form(_request_body(request))
+            body, body_encoding = _encode_body(resp.content)
+            if body_encoding == "utf-8":
+                body = redactor.text(body)
+            interaction = Interaction(
+                method=request.method,
+                url=url,
+                request_headers=redactor.headers(request_headers),
+                request_body=request_body,
+                status=resp.status_code,
+                reason=resp.reason,
+                headers=redactor.headers(headers),
+                body=body,
+                body_encoding=body_encoding,
+                elapsed=round(elapsed, 6),
+                offset=round(time.perf_counter() - self._start - elapsed, 6),
+            )
+            if self._file.closed:
+                return
+            line = json.dumps(interaction._asdict(), ensure_ascii=False, separators=(",", ":"))
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+                self._raw.close()
+
+
+def load_cassette(path: str) -> List[Interaction]:
+    """讀取卡帶中的所有紀錄（容許未正常關閉的檔案）"""
+    interactions = []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                if line.strip():
+                    record: Dict[str, Any] = json.loads(line)
+                    record["request_headers"] = [tuple(h) for h in record["request_headers"]]
+                    record["headers"] = [tuple(h) for h in record["headers"]]
+                    interactions.append(Interaction(**record))
+        except EOFError:
+            # 錄製中途結束，gzip 缺少結尾，已 flush 的紀錄仍然完整
+            pass
+    return interactions
+
+
+class RecordingAdapter(HTTPAdapter):
+    """照常連網，並把每個請求與回應寫入卡帶"""
+
+    def __init__(self, writer: CassetteWriter, **kwargs: Any) -> None:
+        super(RecordingAdapter, self).__init__(**kwargs)
+        self.writer = writer
+
+    def send(self, request: PreparedRequest, **kwargs: Any) -> Response:  # type: ignore[override]
+        start = time.perf_counter()
+        resp = super(RecordingAdapter, self).send(request, **kwargs)
+        # 串流請求也在此讀完內容，之後的 iter_content 會直接取用已讀取的內容
+        resp.content
+        self.writer.write(request, resp, time.perf_counter() - start)
+        return resp
+
+
+class _OriginalResponse:
+    """讓 requests 能從重播的標頭中取出 Set-Cookie"""
+
+    def __init__(self, msg: http.client.HTTPMessage) -> None:
+        self.msg = msg
+
+    def isclosed(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+class ReplayAdapter(HTTPAdapter):
+    """不連網，依序回傳卡帶中的回應
+
+    Args:
+        interactions: 卡帶紀錄
+        strict: 請求的方法與網址必須與紀錄相符（忽略 antiCache 與驗證碼）
+        realtime: 依錄製時的耗時延遲回應
+    """
+
+    def __init__(self, interactions: List[Interaction], strict: bool = True, realtime: bool = False) -> None:
+        super(ReplayAdapter, self).__init__()
+        self.interactions = interactions
+        self.strict = strict
+        self.realtime = realtime
+        self.position = 0
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self) -> int:
+        return len(self.interactions) - self.position
+
+    def send(self, request: PreparedRequest, **kwargs: Any) -> Response:  # type: ignore[override]
+        with self._lock:
+            if self.position >= len(self.interactions):
+                raise CassetteError(f"卡帶已無回應可重播: {request.method} {request.url}", request=request)
+            interaction = self.interactions[self.position]
+            if self.strict and not _same_request(interaction, request):
+                raise CassetteError(
+                    f"請求與卡帶第 {self.position + 1} 筆紀錄不符: "
+                    f"預期 {interaction.method} {interaction.url}，實際 {request.method} {request.url}",
+                    request=request,
+                )
+            self.position += 1
+
+        if self.realtime:
+            time.sleep(interaction.elapsed)
+        return self._build(request, interaction)
+
+    def _build(self, request: PreparedRequest, interaction: Interaction) -> Response:
+        content = interaction.content
+        msg = http.client.HTTPMessage()
+        for name, value in interaction.headers:
+            msg[name] = value
+        msg["Content-Length"] = str(len(content))
+        raw = HTTPResponse(
+            body=io.BytesIO(content),
+            headers=list(msg.items()),
+            status=interaction.status,
+            reason=interaction.reason,
+            preload_content=False,
+            decode_content=False,
+            original_response=_OriginalResponse(msg),
+        )
+        resp = self.build_response(request, raw)
+        resp.elapsed = timedelta(seconds=interaction.elapsed)
+        return resp
+
+
+def mount_cassette(
+    sess: requests.Session,
+    path: str,
+    mode: str = RECORD,
+    max_retries: int = 0,
+) -> HTTPAdapter:
+    """在 session 上掛載錄製或重播用的 adapter
+
+    Raises:
+        ValueError: 若 mode 不是 "record" 或 "replay"
+    """
+    if mode == RECORD:
+        adapter: HTTPAdapter = RecordingAdapter(CassetteWriter(path), max_retries=max_retries)
+    elif mode == REPLAY:
+        adapter = ReplayAdapter(load_cassette(path))
+    else:
+        raise ValueError(f"未知的卡帶模式: {mode}。可用選項: {', '.join(CASSETTE_MODES)}")
+    sess.mount("https://", adapter)
+    sess.mount("http://", adapter)
+    return adapter
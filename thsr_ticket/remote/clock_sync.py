@@ -0,0 +1,101 @@
+"""以 HTTP `Date` 標頭估計伺服器時鐘與本機時鐘的偏移
+
+`Date` 只精確到秒。每個樣本以送出與收到回應的中點（RTT/2 修正）當作伺服器蓋時間的時刻，
+得到「偏移落在某個一秒區間內」的限制；之後的樣本都安排在「若偏移等於目前區間中點，
+伺服器時間恰好跨秒」的時刻送出，依回應的秒數把區間減半。數個樣本後即可達到毫秒等級，
+實際精度仍受 RTT 抖動與去回程不對稱的限制。
+"""
+import math
+import time
+from email.utils import parsedate_to_datetime
+from typing import List, NamedTuple, Optional, Tuple
+
+from requests.exceptions import RequestException
+
+from thsr_ticket.remote.http_request import HTTPRequest
+
+DEFAULT_SAMPLES = 8
+# 每個樣本至少間隔的秒數，避免連續請求
+MIN_SAMPLE_GAP = 0.05
+
+
+class ClockSyncError(RequestException):
+    """伺服器回應沒有可用的 Date 標頭"""
+
+
+class ClockOffset(NamedTuple):
+    offset: float  # 伺服器時間減本機時間（秒）
+    error: float  # 偏移區間的半寬（秒），不含去回程不對稱
+    rtt: float  # 樣本中最短的往返時間（秒）
+    samples: int
+
+    def server_time(self, local: Optional[float] = None) -> float:
+        """本機時間 `local`（預設為現在）對應的伺服器時間（epoch 秒）"""
+        return (time.time() if local is None else local) + self.offset
+
+    def local_time(self, server: float) -> float:
+        """伺服器時間 `server` 對應的本機時間（epoch 秒）"""
+        return server - self.offset
+
+
+def _sample(client: HTTPRequest) -> Tuple[float, float, float]:
+    """送出一次探測請求
+
+    Returns:
+        (送出時的本機時間, 收到回應時的本機時間, 伺服器 Date 標頭的秒數)
+    """
+    sent = time.time()
+    resp = client.probe()
+    received = time.time()
+    resp.close()
+    date = resp.headers.get("Date")
+    if not date:
+        raise ClockSyncError("伺服器回應沒有 Date 標頭，無法對時", response=resp)
+    try:
+        server = parsedate_to_datetime(date).timestamp()
+    except (TypeError, ValueError):
+        raise ClockSyncError(f"無法解析伺服器的 Date 標頭: {date}", response=resp)
+    return sent, received, server
+
+
+def sleep_until(local: float) -> None:
+    """等待到本機時間 `local`"""
+    delay = local - time.time()
+    if delay > 0:
+        time.sleep(delay)
+
+
+def estimate_clock_offset(client: HTTPRequest, samples: int = DEFAULT_SAMPLES) -> ClockOffset:
+    """以 `samples` 個探測請求估計伺服器時鐘的偏移
+
+    Raises:
+        ClockSyncError: 伺服器沒有回傳可解析的 Date 標頭
+        RequestException: 探測請求失敗
+    """
+    low, high = -math.inf, math.inf
+    rtts: List[float] = []
+    for idx in range(samples):
+        if idx > 0:
+            # 安排請求中點落在「以區間中點為偏移時，伺服器恰好跨秒」的時刻
+            guess = (low + high) / 2
+            half_rtt = min(rtts) / 2
+            boundary = math.ceil(time.time() + MIN_SAMPLE_GAP + half_rtt + guess)
+            sleep_until(boundary - guess - half_rtt)
+
+        sent, received, server = _sample(client)
+        rtts.append(received - sent)
+        mid = (sent + received) / 2
+        # 伺服器在 mid 時的時間落在 [server, server + 1)
+        sample_low, sample_high = server - mid, server + 1 - mid
+        if sample_low >= high or sample_high <= low:
+            # RTT 抖動造成矛盾，以最新的樣本重新開始
+            low, high = sample_low, sample_high
+        else:
+            low, high = max(low, sample_low), min(high, sample_high)
+
+    return ClockOffset(
+        offset=(low + high) / 2,
+        error=(high - low) / 2,
+        rtt=min(rtts),
+        samples=samples,
+    )
@@ -1,73 +1,230 @@
-from typing import Mapping, Any
+import os
+import re
+import time
+from typing import Any, Dict, Mapping, Optional, Tuple, Union
+from urllib.parse import urljoin, urlsplit
 
 import requests
+from requests.exceptions import RequestException
 from requests.adapters import HTTPAdapter
 from requests.models import Response
-from bs4 import BeautifulSoup
-
 from thsr_ticket.configs.web.http_config import HTTPConfig
 from thsr_ticket.configs.web.parse_html_element import BOOKING_PAGE
+from thsr_ticket.remote.cassette import CASSETTE_ENV_VAR, CASSETTE_MODE_ENV_VAR, RECORD, mount_cassette
+from thsr_ticket.remote.retry_policy import BudgetExceeded, RetryPolicy, RunBudget, backoff_delay, is_retryable
+from thsr_ticket.view_model.parsed_page import ParsedPage, PageSource
+from thsr_ticket.view_model.booking_page import StreamedBookingPage
+
 
+STREAM_CHUNK_SIZE = 4096
 
-DEFAULT_TIMEOUT = 30  # 預設 30 秒 timeout
+_ANTI_CACHE = re.compile(r"wicket:antiCache=\d+")
 
 
 class HTTPRequest:
-    def __init__(self, max_retries: int = 3, timeout: int = DEFAULT_TIMEOUT) -> None:
+    def __init__(
+        self,
+        max_retries: Optional[int] = None,
+        timeout: Optional[float] = None,
+        base_url: str = HTTPConfig.BASE_URL,
+        cassette: Optional[str] = None,
+        cassette_mode: Optional[str] = None,
+        policy: RetryPolicy = RetryPolicy(),
+    ) -> None:
+        """
+        Args:
+            max_retries: 失敗後最多重試的次數，指定時覆寫 policy.max_attempts
+            timeout: 讀取逾時（秒），指定時覆寫 policy.read_timeout
+            base_url: 訂票網站的位址，可指向替身伺服器（如 `StandinServer.base_url`）做離線測試
+            cassette: 卡帶檔路徑，未指定時讀取環境變數 THSR_CASSETTE
+            cassette_mode: "record" 錄製或 "replay" 重播，未指定時讀取環境變數 THSR_CASSETTE_MODE（預設錄製）
+            policy: 重試、逾時與時間預算的設定
+        """
+        if max_retries is not None:
+            policy = policy._replace(max_attempts=max_retries + 1)
+        if timeout is not None:
+            policy = policy._replace(read_timeout=timeout)
+        self.policy = policy
+        self.budget = RunBudget(policy.run_budget)
+
+        # 重試由 _send 依 policy 處理，adapter 本身不重試
         self.sess = requests.Session()
-        self.sess.mount("https://", HTTPAdapter(max_retries=max_retries))
-        self.timeout = timeout
+        self.sess.mount("https://", HTTPAdapter(max_retries=0))
+        self.sess.mount("http://", HTTPAdapter(max_retries=0))
+        cassette = cassette or os.environ.get(CASSETTE_ENV_VAR)
+        if cassette:
+            mode = cassette_mode or os.environ.get(CASSETTE_MODE_ENV_VAR) or RECORD
+            mount_cassette(self.sess, cassette, mode)
+        self.base_url = base_url.rstrip("/")
 
         self.common_head_html: dict = {
-            "Host": HTTPConfig.HTTPHeader.BOOKING_PAGE_HOST,
+            "Host": urlsplit(self.base_url).netloc,
             "User-Agent": HTTPConfig.HTTPHeader.USER_AGENT,
             "Accept": HTTPConfig.HTTPHeader.ACCEPT_HTML,
             "Accept-Language": HTTPConfig.HTTPHeader.ACCEPT_LANGUAGE,
             "Accept-Encoding": HTTPConfig.HTTPHeader.ACCEPT_ENCODING
         }
 
+    def start_run(self) -> None:
+        """開始新的一次訂票，重設整體時間預算"""
+        self.budget.start()
+
+    def warm_up(self) -> bool:
+        """預先建立連線（DNS、TCP 與 TLS 握手），之後的請求直接沿用連線池中的連線
+
+        只送出不帶 Cookie 的 HEAD 請求，不會建立訂票 session，也不計入時間預算。
+
+        Returns:
+            是否成功建立連線
+        """
+        try:
+            self.probe().close()
+        except RequestException:
+            return False
+        return True
+
+    def probe(self) -> Response:
+        """對網站根目錄送出不帶 Cookie 的 HEAD 請求（預熱連線、讀取伺服器的 Date 標頭對時）"""
+        timeout = (self.policy.connect_timeout, self.policy.read_timeout)
+        return self.sess.head(self.base_url + "/", headers=self.common_head_html, timeout=timeout)
+
     def request_booking_page(self) -> Response:
-        return self.sess.get(
-            HTTPConfig.BOOKING_PAGE_URL,
-            headers=self.common_head_html,
+        return self._send(
+            "booking_page",
+            "GET",
+            self._url(HTTPConfig.BOOKING_PAGE_URL),
             allow_redirects=True,
-            timeout=self.timeout
         )
 
-    def request_security_code_img(self, book_page: bytes) -> Response:
-        img_url = parse_security_img_url(book_page)
-        return self.sess.get(img_url, headers=self.common_head_html, timeout=self.timeout)
+    def open_booking_page(self) -> StreamedBookingPage:
+        """以串流方式請求訂票頁面，取得表單預設值與驗證碼網址後即返回
 
-    def submit_booking_form(self, params: Mapping[str, Any]) -> Response:
-        url = HTTPConfig.SUBMIT_FORM_URL.format(self.sess.cookies["JSESSIONID"])
-        return self.sess.post(
-            url,
-            headers=self.common_head_html,
-            params=params,
+        頁面剩餘內容仍在傳輸中，可先呼叫 `request_security_code_img()`，
+        再以 `StreamedBookingPage.release()` 讀完剩餘內容。
+        """
+        resp = self._send(
+            "booking_page",
+            "GET",
+            self._url(HTTPConfig.BOOKING_PAGE_URL),
             allow_redirects=True,
-            timeout=self.timeout
+            stream=True,
         )
+        return StreamedBookingPage(resp.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+
+    def request_security_code_img(self, book_page: Union[PageSource, StreamedBookingPage]) -> Response:
+        if isinstance(book_page, StreamedBookingPage):
+            img_url = self.base_url + book_page.defaults.security_img_src
+        else:
+            img_url = self._url(parse_security_img_url(book_page))
+        return self._send("security_code_img", "GET", img_url)
+
+    def refresh_security_code_img(self, img_src: str, error_page: Optional[PageSource] = None) -> Response:
+        """沿用同一個 JSESSIONID 與 Wicket 頁面狀態，只重新取得驗證碼圖片
+
+        Args:
+            img_src: 目前驗證碼圖片的 src（相對路徑）
+            error_page: 驗證碼錯誤時的回應頁面；若其中已帶有新的驗證碼網址則直接使用
+        """
+        if error_page is not None and (new_src := ParsedPage.of(error_page).scan.captcha_src):
+            img_url = self.base_url + new_src
+        else:
+            img_url = self.base_url + refresh_captcha_src(img_src)
+        return self._send("security_code_img", "GET", img_url)
+
+    def submit_booking_form(self, params: Mapping[str, Any]) -> Response:
+        url = self._url(HTTPConfig.SUBMIT_FORM_URL.format(self.sess.cookies["JSESSIONID"]))
+        return self._send("submit_booking_form", "POST", url, params=params, allow_redirects=True)
 
     def submit_train(self, params: Mapping[str, Any]) -> Response:
-        return self.sess.post(
-            HTTPConfig.CONFIRM_TRAIN_URL,
-            headers=self.common_head_html,
+        return self._send(
+            "submit_train",
+            "POST",
+            self._url(HTTPConfig.CONFIRM_TRAIN_URL),
             params=params,
             allow_redirects=True,
-            timeout=self.timeout
         )
 
-    def submit_ticket(self, params: Mapping[str, Any]) -> Response:
-        return self.sess.post(
-            HTTPConfig.CONFIRM_TICKET_URL,
-            headers=self.common_head_html,
-            params=params,
-            allow_redirects=True,
-            timeout=self.timeout
-        )
+    def submit_ticket(self, params: Mapping[str, Any], action: Optional[str] = None) -> Response:
+        """送出第三頁
+
+        Args:
+            params: 乘客資訊
+            action: 第三頁表單的 action；依車次訂票時略過第二頁，Wicket 的頁面版本與
+                `HTTPConfig.CONFIRM_TICKET_URL` 不同，必須使用頁面上的網址
+        """
+        if action:
+            url = urljoin(self._url(HTTPConfig.BOOKING_PAGE_URL), action)
+        else:
+            url = self._url(HTTPConfig.CONFIRM_TICKET_URL)
+        return self._send("submit_ticket", "POST", url, params=params, allow_redirects=True)
+
+    def _send(self, step: str, method: str, url: str, **kwargs: Any) -> Response:
+        """依 policy 送出請求：分開的連線／讀取逾時、步驟期限、整體預算與退避重試
+
+        Raises:
+            BudgetExceeded: 步驟期限或整體時間預算在取得可用回應前用盡
+        """
+        policy = self.policy
+        started = time.monotonic()
+        step_end = started + policy.step_deadline
+        run_end = started + self.budget.remaining()
+
+        def remaining() -> Tuple[float, str, float]:
+            now = time.monotonic()
+            if run_end <= step_end:
+                return run_end - now, "run", self.budget.total
+            return step_end - now, "step", policy.step_deadline
+
+        attempt = 0
+        try:
+            while True:
+                left, scope, limit = remaining()
+                if left <= 0:
+                    raise BudgetExceeded(step, scope, limit, self._spent(step, started))
+                timeout = (min(policy.connect_timeout, left), min(policy.read_timeout, left))
+                resp, error = None, None
+                try:
+                    resp = self.sess.request(method, url, headers=self.common_head_html, timeout=timeout, **kwargs)
+                except RequestException as e:
+                    error = e
+
+                attempt += 1
+                if not is_retryable(policy, method, resp, error) or attempt >= policy.max_attempts:
+                    if error is not None:
+                        raise error
+                    return resp
+
+                delay = backoff_delay(policy, attempt, resp)
+                left, scope, limit = remaining()
+                if delay >= left:
+                    # 等待後也來不及重試，直接回報
+                    raise BudgetExceeded(step, scope, limit, self._spent(step, started)) from error
+                if resp is not None:
+                    resp.close()
+                time.sleep(delay)
+        finally:
+            self.budget.charge(step, time.monotonic() - started)
+
+    def _spent(self, step: str, started: float) -> Dict[str, float]:
+        spent = dict(self.budget.spent)
+        spent[step] = spent.get(step, 0.0) + time.monotonic() - started
+        return spent
+
+    def _url(self, url: str) -> str:
+        """將 HTTPConfig 中的網址換成目前的 base_url"""
+        return self.base_url + url[len(HTTPConfig.BASE_URL):]
+
+
+def parse_security_img_url(book_page: PageSource) -> str:
+    page = ParsedPage.of(book_page)
+    if (src := page.scan.captcha_src) is None:
+        src = page.find_fields(BOOKING_PAGE)["security_code_img"]["src"]
+    return HTTPConfig.BASE_URL + src
 
 
-def parse_security_img_url(html: bytes) -> str:
-    page = BeautifulSoup(html, features="html.parser")
-    element = page.find(**BOOKING_PAGE["security_code_img"])
-    return HTTPConfig.BASE_URL + element["src"]
+def refresh_captcha_src(img_src: str) -> str:
+    """更新驗證碼網址的 antiCache 參數，讓伺服器重新產生圖片"""
+    anti_cache = "wicket:antiCache={}".format(int(time.time() * 1000))
+    if _ANTI_CACHE.search(img_src):
+        return _ANTI_CACHE.sub(anti_cache, img_src)
+    return img_src + ("&" if "?" in img_src else "?") + anti_cache
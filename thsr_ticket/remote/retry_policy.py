@@ -0,0 +1,109 @@
+"""請求的重試與逾時策略
+
+- 連線逾時與讀取逾時分開設定
+- 每個步驟（載入首頁、下載驗證碼、送出各頁表單）有各自的期限
+- 同一次訂票的所有步驟共用一個整體時間預算（只計算請求本身的耗時）
+- 以加入隨機抖動的指數退避重試，並遵守伺服器的 `Retry-After`
+- 超過期限或預算時拋出 `BudgetExceeded`，指出是哪個步驟用盡時間
+
+送出表單的 POST 不是冪等的，只在確定伺服器沒有處理時重試（連線逾時、429、503）。
+"""
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, FrozenSet, NamedTuple, Optional
+
+from requests.exceptions import ConnectTimeout, ConnectionError, RequestException, Timeout
+from requests.models import Response
+
+# 伺服器明確表示未處理請求的狀態碼，POST 也可以安全重試
+NOT_PROCESSED_STATUSES = frozenset({429, 503})
+
+
+class RetryPolicy(NamedTuple):
+    connect_timeout: float = 5.0  # 建立連線的逾時（秒）
+    read_timeout: float = 15.0  # 等待回應的逾時（秒）
+    max_attempts: int = 4  # 含第一次請求的最多嘗試次數
+    backoff_base: float = 0.5  # 第一次重試的退避上限（秒），之後每次加倍
+    backoff_max: float = 8.0  # 單次退避的上限（秒）
+    retry_statuses: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
+    step_deadline: float = 40.0  # 單一步驟（含重試）的期限（秒）
+    run_budget: float = 150.0  # 整次訂票所有步驟共用的時間預算（秒）
+
+
+class BudgetExceeded(RequestException):
+    """步驟期限或整體時間預算用盡"""
+
+    def __init__(self, step: str, scope: str, limit: float, spent: Dict[str, float]) -> None:
+        self.step = step
+        self.scope = scope  # "step" 或 "run"
+        self.limit = limit
+        self.spent = dict(spent)
+        breakdown = "、".join(f"{name} {sec:.1f} 秒" for name, sec in self.spent.items())
+        target = "步驟期限" if scope == "step" else "整體時間預算"
+        super(BudgetExceeded, self).__init__(
+            f"步驟 {step} 用盡了{target}（{limit:.1f} 秒）。各步驟耗時：{breakdown or '無'}"
+        )
+
+
+class RunBudget:
+    """整次訂票共用的時間預算
+
+    只累計各步驟實際花在網路請求上的時間，等待使用者輸入驗證碼或身分證的時間不計入。
+    """
+
+    def __init__(self, total: float) -> None:
+        self.total = total
+        self.spent: Dict[str, float] = {}
+
+    def start(self) -> None:
+        """重新開始計算（同一個 client 進行下一次訂票時呼叫）"""
+        self.spent = {}
+
+    def remaining(self) -> float:
+        return self.total - sum(self.spent.values())
+
+    def charge(self, step: str, seconds: float) -> None:
+        self.spent[step] = self.spent.get(step, 0.0) + seconds
+
+
+def retry_after_seconds(resp: Optional[Response]) -> Optional[float]:
+    """解析 `Retry-After` 標頭（秒數或 HTTP 日期）"""
+    if resp is None:
+        return None
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(
+    policy: RetryPolicy,
+    attempt: int,
+    resp: Optional[Response] = None,
+    rng: Optional[random.Random] = None,
+) -> float:
+    """第 `attempt` 次重試前的等待秒數（full jitter），不少於 `Retry-After`"""
+    cap = min(policy.backoff_max, policy.backoff_base * (2 ** (attempt - 1)))
+    delay = (rng or random).uniform(0, cap)
+    retry_after = retry_after_seconds(resp)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+def is_retryable(policy: RetryPolicy, method: str, resp: Optional[Response], error: Optional[Exception]) -> bool:
+    idempotent = method.upper() in ("GET", "HEAD", "OPTIONS")
+    if resp is not None:
+        statuses = policy.retry_statuses if idempotent else policy.retry_statuses & NOT_PROCESSED_STATUSES
+        return resp.status_code in statuses
+    if idempotent:
+        return isinstance(error, (ConnectionError, Timeout))
+    return isinstance(error, ConnectTimeout)
@@ -0,0 +1,4 @@
+"""離線的高鐵訂票替身伺服器，用於端對端測試與效能量測"""
+from thsr_ticket.standin.server import StandinConfig, StandinServer
+
+__all__ = ["StandinConfig", "StandinServer"]
@@ -0,0 +1,50 @@
+"""啟動替身伺服器
+
+    python -m thsr_ticket.standin [--port 8080] [--latency 0.1] [--jitter 0.05] ...
+"""
+import argparse
+import time
+
+from thsr_ticket.standin.captcha import generated_captcha, plain_captcha
+from thsr_ticket.standin.server import StandinConfig, StandinServer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="離線的高鐵訂票替身伺服器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="每個回應的基本延遲（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="額外隨機延遲的上限（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="回應 503 的機率")
+    parser.add_argument("--retry-after", type=int, default=None, help="503 回應附帶的 Retry-After 秒數")
+    parser.add_argument("--sold-out-rate", type=float, default=0.0, help="回報查無可售車次的機率")
+    parser.add_argument("--page-padding", type=int, default=0, help="每個頁面附加的填充大小（bytes）")
+    parser.add_argument("--train-count", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--clock-offset", type=float, default=0.0, help="伺服器時鐘比本機快的秒數")
+    parser.add_argument("--plain-captcha", action="store_true", help="使用不需 numpy 的簡易驗證碼")
+    args = parser.parse_args()
+
+    config = StandinConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        sold_out_rate=args.sold_out_rate,
+        page_padding=args.page_padding,
+        train_count=args.train_count,
+        seed=args.seed,
+        clock_offset=args.clock_offset,
+    )
+    captcha_factory = plain_captcha if args.plain_captcha else generated_captcha
+    with StandinServer(config, captcha_factory, args.host, args.port) as server:
+        print(f"替身伺服器已啟動: {server.base_url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
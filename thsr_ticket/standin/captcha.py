@@ -0,0 +1,42 @@
+"""替身伺服器的驗證碼來源
+
+驗證碼工廠是一個無參數的函式，回傳 (PNG 圖片 bytes, 答案)。
+預設使用 `ml.generate_captcha.GenerateCaptcha`，其相依套件（numpy、scikit-learn）
+與字型只在第一次產生驗證碼時才載入。
+"""
+import io
+import random
+from typing import Callable, Optional, Tuple
+
+from PIL import Image, ImageDraw
+
+CaptchaFactory = Callable[[], Tuple[bytes, str]]
+
+# 與 ml.generate_captcha.CHARS 相同；該模組載入時就需要 numpy，因此不直接匯入
+CAPTCHA_CHARS = "23456789ABCDEFGHJKLMNPQRSTUVWXYZ"
+
+_generator = None
+
+
+def _to_png(image: Image.Image) -> bytes:
+    buf = io.BytesIO()
+    image.convert("RGB").save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def generated_captcha() -> Tuple[bytes, str]:
+    """以訓練資料用的 GenerateCaptcha 產生與真實網站相近的驗證碼"""
+    global _generator
+    if _generator is None:
+        from thsr_ticket.ml.generate_captcha import GenerateCaptcha
+        _generator = GenerateCaptcha()
+    image, chars = _generator.generate()
+    return _to_png(image), "".join(chars)
+
+
+def plain_captcha(rng: Optional[random.Random] = None) -> Tuple[bytes, str]:
+    """只把答案文字畫在空白圖片上的簡易驗證碼，不需要額外的相依套件"""
+    answer = "".join((rng or random).sample(CAPTCHA_CHARS, 4))
+    image = Image.new("L", (145, 55), color=255)
+    ImageDraw.Draw(image).text((10, 20), answer, fill=0)
+    return _to_png(image), answer
@@ -0,0 +1,288 @@
+"""替身伺服器的頁面樣板
+
+頁面結構與 `unittest/fixtures` 中的樣本相同，只保留 `configs/web` 選擇條件
+與 `page_scanner` 會用到的元素，並可在頁尾附加填充內容模擬真實頁面大小。
+"""
+import html as html_lib
+from typing import Iterable, List, NamedTuple, Sequence
+
+STATION_NAMES = {
+    1: "南港", 2: "台北", 3: "板橋", 4: "桃園", 5: "新竹", 6: "苗栗",
+    7: "台中", 8: "彰化", 9: "雲林", 10: "嘉義", 11: "台南", 12: "左營",
+}
+
+# 票種代碼 -> (名稱, 是否需要填寫乘客身分證)
+TICKET_TYPES = {
+    "F": ("全票", False),
+    "H": ("孩童票", False),
+    "W": ("愛心票", True),
+    "E": ("敬老票", True),
+    "P": ("大學生優惠票", True),
+    "T": ("少年票", False),
+}
+
+CAPTCHA_ERROR = "檢測碼輸入錯誤，請確認後重新輸入，謝謝！"
+SOLD_OUT_ERROR = "去程查無可售車次或選購的車票已售完，請重新輸入訂票條件。"
+SESSION_EXPIRED_ERROR = "連線逾時，請重新操作。"
+NO_TRAIN_SELECTED_ERROR = "請選擇車次。"
+TRAIN_ID_ERROR = "查無此車次，請確認車次號碼。"
+PASSENGER_ID_ERROR = "請輸入正確的身分證字號。"
+AGREE_ERROR = "請勾選同意條款。"
+
+CAPTCHA_SRC = (
+    "/IMINT/?wicket:interface=:0:BookingS1Form:homeCaptcha:passCode::IResourceListener"
+    "&wicket:antiCache={}"
+)
+
+_HEAD = (
+    '<!DOCTYPE html>\n<html lang="zh-TW">\n<head>'
+    '<meta http-equiv="Content-Type" content="text/html; charset=UTF-8">'
+    "<title>台灣高鐵 網路訂票</title></head>\n<body>\n"
+    '<div id="content" class="uk-container">\n'
+)
+_TAIL = "</div>\n{padding}</body>\n</html>\n"
+
+
+class StandinTrain(NamedTuple):
+    code: int
+    depart: str
+    arrival: str
+    duration: str
+    form_value: str
+    early_bird: str  # 空字串表示無早鳥優惠
+    student: str  # 空字串表示無大學生優惠
+
+
+class ResultLeg(NamedTuple):
+    train: StandinTrain
+    date: str  # 表單中的日期（yyyy/mm/dd）
+    start_station: int
+    dest_station: int
+    seat: str
+
+
+class Passenger(NamedTuple):
+    index: int
+    ticket_type: str  # TICKET_TYPES 的代碼
+
+
+def _escape(value: object) -> str:
+    return html_lib.escape(str(value), quote=True)
+
+
+def _page(body: str, padding: str) -> bytes:
+    return (_HEAD + body + _TAIL.format(padding=padding)).encode("utf-8")
+
+
+def _feedback(errors: Iterable[str]) -> str:
+    items = "".join(
+        '<li class="feedbackPanelERROR"><span class="feedbackPanelERROR">{}</span></li>'.format(_escape(err))
+        for err in errors
+    )
+    return '<ul class="feedbackPanel">{}</ul>\n'.format(items) if items else ""
+
+
+def render_booking_page(
+    session_id: str,
+    anti_cache: int,
+    errors: Sequence[str] = (),
+    padding: str = "",
+) -> bytes:
+    """第一頁：訂票條件與驗證碼"""
+    stations = "".join(
+        '<option value="{}">{}</option>'.format(num, name) for num, name in STATION_NAMES.items()
+    )
+    body = (
+        _feedback(errors)
+        + '<form id="BookingS1Form" method="post" '
+        'action="/IMINT/;jsessionid={sid}?wicket:interface=:0:BookingS1Form::IFormSubmitListener">\n'
+        '<div style="display:none"><input type="hidden" name="BookingS1Form:hf:0" id="BookingS1Form_hf_0"></div>\n'
+        '<select class="uk-select" name="selectStartStation">{stations}</select>\n'
+        '<select class="uk-select" name="selectDestinationStation">{stations}</select>\n'
+        '<select name="tripCon:typesoftrip" id="BookingS1Form_tripCon_typesoftrip" class="uk-select">'
+        '<option selected="selected" value="0">單程</option><option value="1">去回程</option></select>\n'
+        '<select name="seatCon:seatRadioGroup" id="BookingS1Form_seatCon_seatRadioGroup" class="uk-select">'
+        '<option selected="selected" value="0">無座位偏好</option><option value="1">靠窗優先</option>'
+        '<option value="2">走道優先</option></select>\n'
+        '<label><input type="radio" name="bookingMethod" value="radio31" checked="checked" class="uk-radio">'
+        "依時間搜尋合適車次</label>\n"
+        '<label><input type="radio" name="bookingMethod" value="radio33" class="uk-radio">'
+        "直接輸入車次號碼</label>\n"
+        '<div class="security-code">'
+        '<img id="BookingS1Form_homeCaptcha_passCode" class="captcha-img" src="{captcha}" alt="驗證碼">'
+        '<input type="text" name="homeCaptcha:securityCode" class="uk-input" maxlength="4"></div>\n'
+        '<input type="submit" name="SubmitButton" id="SubmitButton" value="開始查詢" class="uk-button">\n'
+        "</form>\n"
+    ).format(
+        sid=_escape(session_id),
+        stations=stations,
+        captcha=_escape(CAPTCHA_SRC.format(anti_cache)),
+    )
+    return _page(body, padding)
+
+
+def _train_items(trains: Sequence[StandinTrain], group: str) -> str:
+    items: List[str] = []
+    for train in trains:
+        discounts = ""
+        if train.early_bird:
+            discounts += '<p class="early-bird"><span>{}</span></p>'.format(_escape(train.early_bird))
+        if train.student:
+            discounts += '<p class="student"><span>{}</span></p>'.format(_escape(train.student))
+        items.append(
+            '<label class="uk-radio-label result-item">'
+            '<input type="radio" name="{group}:TrainGroup" class="uk-radio" value="{value}" '
+            'QueryCode="{code}" QueryDeparture="{depart}" QueryArrival="{arrival}">'
+            '<div class="uk-card uk-card-default">'
+            '<div class="train-code"><span id="QueryCode">{code}</span></div>'
+            '<div class="time-course"><span id="QueryDeparture">{depart}</span>'
+            '<div class="duration"><span class="material-icons">schedule</span><span>{duration}</span></div>'
+            '<span id="QueryArrival">{arrival}</span></div>'
+            '<div class="discount">{discounts}</div></div></label>\n'.format(
+                group=group,
+                value=train.form_value,
+                code=train.code,
+                depart=train.depart,
+                arrival=train.arrival,
+                duration=train.duration,
+                discounts=discounts,
+            )
+        )
+    return "".join(items)
+
+
+def render_train_list(
+    trains: Sequence[StandinTrain],
+    errors: Sequence[str] = (),
+    padding: str = "",
+    inbound_trains: Sequence[StandinTrain] = (),
+) -> bytes:
+    """第二頁：可訂班次清單，去回程時另有回程班次清單（TrainQueryDataViewPanel2）"""
+    inbound = ""
+    if inbound_trains:
+        inbound = (
+            '<div id="TrainQueryDataViewPanel2" class="result-listing">\n'
+            + _train_items(inbound_trains, "TrainQueryDataViewPanel2")
+            + "</div>\n"
+        )
+    body = (
+        _feedback(errors)
+        + '<form id="BookingS2Form" method="post" '
+        'action="/IMINT/?wicket:interface=:1:BookingS2Form::IFormSubmitListener">\n'
+        '<div style="display:none"><input type="hidden" name="BookingS2Form:hf:0" id="BookingS2Form_hf_0"></div>\n'
+        '<div id="TrainQueryDataViewPanel" class="result-listing">\n'
+        + _train_items(trains, "TrainQueryDataViewPanel")
+        + "</div>\n"
+        + inbound
+        + '<input type="submit" name="SubmitButton" value="確認車次" class="uk-button">\n'
+        "</form>\n"
+    )
+    return _page(body, padding)
+
+
+def render_passenger_form(
+    passengers: Sequence[Passenger],
+    interface: str,
+    errors: Sequence[str] = (),
+    padding: str = "",
+) -> bytes:
+    """第三頁：取票人與乘客資訊，表單送往 `interface`（依車次訂票時 Wicket 頁面版本不同）"""
+    rows: List[str] = []
+    for passenger in passengers:
+        name, needs_id = TICKET_TYPES[passenger.ticket_type]
+        prefix = "TicketPassengerInfoInputPanel:passengerDataView:{}:passengerDataView2:".format(passenger.index)
+        rows.append(
+            '<div class="uk-form-controls"{style}>'
+            '<input type="hidden" name="{prefix}passengerDataTypeName" value="{name}">'
+            '<input type="text" class="uk-input passengerDataIdNumber" name="{prefix}passengerDataIdNumber">'
+            "</div>\n".format(
+                style="" if needs_id else ' style="display:none"',
+                prefix=prefix,
+                name=name,
+            )
+        )
+    body = (
+        _feedback(errors)
+        + '<form id="BookingS3FormSP" method="post" action="/IMINT/?wicket:interface={}">\n'.format(
+            _escape(interface)
+        )
+        + '<div style="display:none">'
+        '<input type="hidden" name="BookingS3FormSP:hf:0" id="BookingS3FormSP_hf_0"></div>\n'
+        '<input type="radio" id="idInputRadio1" name="idInputRadio" value="0" checked="checked" class="uk-radio">'
+        '身分證字號\n'
+        '<input type="text" name="dummyId" class="uk-input" maxlength="10">\n'
+        '<input type="radio" id="mobileInputRadio" name="eaiPhoneCon:phoneInputRadio" value="radio43" '
+        'checked="checked" class="uk-radio">行動電話\n'
+        '<input type="text" name="dummyPhone" class="uk-input" maxlength="10">\n'
+        '<div class="passenger-list">\n'
+        + "".join(rows)
+        + "</div>\n"
+        '<div class="member">'
+        '<input type="radio" name="TicketMemberSystemInputPanel:TakerMemberSystemDataView:memberSystemRadioGroup" '
+        'value="radio56" checked="checked" class="uk-radio">非高鐵會員'
+        '<input type="radio" name="TicketMemberSystemInputPanel:TakerMemberSystemDataView:memberSystemRadioGroup" '
+        'value="radio58" class="uk-radio">高鐵會員</div>\n'
+        '<input type="checkbox" name="agree" class="uk-checkbox">\n'
+        '<input type="submit" name="SubmitButton" value="完成訂位" class="uk-button">\n'
+        "</form>\n"
+    )
+    return _page(body, padding)
+
+
+def _ticket_card(index: int, leg: ResultLeg) -> str:
+    return (
+        '<div class="ticket-card">'
+        '<div class="card-title"><span>{title}</span><span class="date"><span>{date}</span></span></div>'
+        '<div class="train-info">'
+        '<p class="departure-stn"><span>{start}</span></p>'
+        '<span id="setTrainDeparture{i}">{depart}</span>'
+        '<span id="setTrainCode{i}">{code}</span>'
+        '<span id="setTrainArrival{i}">{arrival}</span>'
+        '<p class="arrival-stn"><span>{dest}</span></p></div>'
+        '<div class="seat-info"><p><span>車廂</span><span>標準車廂</span></p>'
+        '<div class="seat-label"><span>{seat}</span></div></div>'
+        "</div>\n"
+    ).format(
+        i=index,
+        title="去程" if index == 0 else "回程",
+        date=_escape(leg.date[5:]),
+        start=STATION_NAMES[leg.start_station],
+        dest=STATION_NAMES[leg.dest_station],
+        depart=leg.train.depart,
+        code=leg.train.code,
+        arrival=leg.train.arrival,
+        seat=_escape(leg.seat),
+    )
+
+
+def render_result(
+    pnr: str,
+    legs: Sequence[ResultLeg],
+    phone: str,
+    ticket_summary: str,
+    price: int,
+    padding: str = "",
+) -> bytes:
+    """訂位完成頁面，去回程時有兩個車票區塊"""
+    body = (
+        '<div class="ticket-summary">'
+        '<p class="pnr-code">訂位代號<span>{pnr}</span></p>'
+        '<p class="payment-status"><span>未付款</span><span>（付款期限：</span><span>{deadline}</span>）</p>'
+        "</div>\n"
+        '<table class="table_simple"><tr><td><span>行動電話</span></td><td><span>{phone}</span></td></tr></table>\n'
+        "{cards}"
+        '<div class="price-info"><p>票數</p><p>{tickets}</p>'
+        '<span id="setTrainTotalPriceValue">TWD {price}</span></div>\n'
+    ).format(
+        pnr=pnr,
+        deadline=_escape(legs[0].date[5:]),
+        phone=_escape(phone),
+        cards="".join(_ticket_card(index, leg) for index, leg in enumerate(legs)),
+        tickets=_escape(ticket_summary).replace(" ", "&nbsp;"),
+        price=price,
+    )
+    return _page(body, padding)
+
+
+def render_server_error() -> bytes:
+    return _page("<h1>503 Service Unavailable</h1>\n<p>系統忙碌中，請稍後再試。</p>\n", "")
@@ -0,0 +1,417 @@
+"""離線的高鐵訂票替身伺服器
+
+重現 `HTTPConfig` 使用的三步驟 Wicket 流程：
+
+    GET  /IMINT/?locale=tw                                      -> 第一頁，設定 JSESSIONID
+    GET  /IMINT/?wicket:interface=:0:BookingS1Form:homeCaptcha:passCode::IResourceListener
+                                                                -> 驗證碼圖片（每次請求都重新產生）
+    POST /IMINT/;jsessionid=...?wicket:interface=:0:BookingS1Form::IFormSubmitListener
+                                                                -> 第二頁班次清單，或帶錯誤訊息的第一頁
+    POST /IMINT/?wicket:interface=:1:BookingS2Form::IFormSubmitListener -> 第三頁乘客資訊
+    POST /IMINT/?wicket:interface=:2:BookingS3Form::IFormSubmitListener -> 訂位結果
+
+依車次訂票（bookingMethod=radio33）時第一頁直接回傳第三頁，表單改送往 `:1:BookingS3Form`。
+去回程（tripCon:typesoftrip=1）時第二頁另有回程班次清單，兩個方向都要選擇。
+
+延遲、抖動、錯誤率與頁面大小都可透過 `StandinConfig` 調整，用於端對端測試與效能量測。
+"""
+import gzip
+import random
+import threading
+import time
+import uuid
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from thsr_ticket.standin.captcha import CaptchaFactory, generated_captcha
+from thsr_ticket.standin.pages import (
+    AGREE_ERROR,
+    CAPTCHA_ERROR,
+    NO_TRAIN_SELECTED_ERROR,
+    PASSENGER_ID_ERROR,
+    SESSION_EXPIRED_ERROR,
+    SOLD_OUT_ERROR,
+    TICKET_TYPES,
+    TRAIN_ID_ERROR,
+    Passenger,
+    ResultLeg,
+    StandinTrain,
+    render_booking_page,
+    render_passenger_form,
+    render_result,
+    render_server_error,
+    render_train_list,
+)
+
+Form = Dict[str, str]
+
+S1_SUBMIT = ":0:BookingS1Form::IFormSubmitListener"
+S2_SUBMIT = ":1:BookingS2Form::IFormSubmitListener"
+S3_SUBMIT = ":2:BookingS3Form::IFormSubmitListener"
+S3_DIRECT_SUBMIT = ":1:BookingS3Form::IFormSubmitListener"  # 依車次訂票，略過第二頁
+BY_TRAIN_ID = "radio33"
+ROUND_TRIP = "1"
+INBOUND_GROUP = "TrainQueryDataViewPanel2:TrainGroup"
+CAPTCHA_RESOURCE = ":0:BookingS1Form:homeCaptcha:passCode::IResourceListener"
+
+
+class StandinConfig(NamedTuple):
+    latency: float = 0.0  # 每個回應的基本延遲（秒）
+    jitter: float = 0.0  # 額外隨機延遲的上限（秒）
+    error_rate: float = 0.0  # 回應 503 的機率
+    retry_after: Optional[int] = None  # 503 回應附帶的 Retry-After 秒數
+    sold_out_rate: float = 0.0  # 查詢時回報查無可售車次的機率
+    page_padding: int = 0  # 每個頁面附加的填充內容大小（bytes）
+    train_count: int = 10  # 班次清單的筆數
+    compress: bool = True  # 用戶端接受時以 gzip 壓縮頁面
+    seed: Optional[int] = None
+    clock_offset: float = 0.0  # 伺服器時鐘（Date 標頭）比本機快的秒數
+
+
+class StandinSession:
+    """單一 JSESSIONID 的伺服器端狀態"""
+
+    def __init__(self, session_id: str) -> None:
+        self.session_id = session_id
+        self.captcha_answer: Optional[str] = None
+        self.booking: Form = {}
+        self.trains: List[StandinTrain] = []
+        self.train: Optional[StandinTrain] = None
+        self.inbound_trains: List[StandinTrain] = []  # 去回程的回程班次
+        self.inbound_train: Optional[StandinTrain] = None
+        self.passengers: List[Passenger] = []
+        self.ticket_interface: Optional[str] = None  # 第三頁表單送往的 Wicket interface
+
+
+class StandinServer:
+    """在背景執行緒中提供替身頁面的 HTTP 伺服器
+
+    Usage:
+        with StandinServer(StandinConfig(latency=0.05)) as server:
+            client = HTTPRequest(base_url=server.base_url)
+    """
+
+    def __init__(
+        self,
+        config: StandinConfig = StandinConfig(),
+        captcha_factory: CaptchaFactory = generated_captcha,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.config = config
+        self.captcha_factory = captcha_factory
+        self.rng = random.Random(config.seed)
+        self.sessions: Dict[str, StandinSession] = {}
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._padding = self._make_padding(config.page_padding)
+        self._httpd = ThreadingHTTPServer((host, port), _StandinHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.standin = self  # type: ignore
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return "http://{}:{}".format(host, port)
+
+    def start(self) -> "StandinServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "StandinServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def captcha_answer(self, session_id: str) -> Optional[str]:
+        """取得指定 session 目前驗證碼的答案（供測試與量測腳本自動作答）"""
+        session = self.sessions.get(session_id)
+        return session.captcha_answer if session else None
+
+    def _make_padding(self, size: int) -> str:
+        if size <= 0:
+            return ""
+        # 以隨機內容填充，避免 gzip 壓縮後大小失真
+        text = "".join(self.rng.choice("abcdefghijklmnopqrstuvwxyz0123456789 ") for _ in range(size))
+        return '<div class="footer" style="display:none">{}</div>\n'.format(text)
+
+    def _new_session(self) -> StandinSession:
+        session = StandinSession(uuid.uuid4().hex.upper())
+        with self._lock:
+            self.sessions[session.session_id] = session
+        return session
+
+    def _delay(self) -> None:
+        delay = self.config.latency
+        if self.config.jitter > 0:
+            delay += self.rng.uniform(0, self.config.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _anti_cache(self) -> int:
+        return int(time.time() * 1000)
+
+    # 頁面處理 ------------------------------------------------------------
+
+    def booking_page(self, session: StandinSession, errors: Tuple[str, ...] = ()) -> bytes:
+        return render_booking_page(session.session_id, self._anti_cache(), errors, self._padding)
+
+    def captcha_image(self, session: StandinSession) -> bytes:
+        image, answer = self.captcha_factory()
+        session.captcha_answer = answer
+        return image
+
+    def submit_booking(self, session: StandinSession, form: Form) -> bytes:
+        answer, session.captcha_answer = session.captcha_answer, None
+        code = form.get("homeCaptcha:securityCode", "")
+        if answer is None or code.upper() != answer.upper():
+            return self.booking_page(session, (CAPTCHA_ERROR,))
+        if self.rng.random() < self.config.sold_out_rate:
+            return self.booking_page(session, (SOLD_OUT_ERROR,))
+
+        session.booking = form
+        session.trains = self._make_trains(form.get("toTimeTable", "600A"))
+        session.inbound_trains = []
+        if form.get("tripCon:typesoftrip") == ROUND_TRIP:
+            session.inbound_trains = self._make_trains(form.get("backTimeTable") or "600P", first_radio=60)
+        if form.get("bookingMethod") == BY_TRAIN_ID:
+            return self._book_train_id(session, form)
+        return self._train_list(session)
+
+    def _train_list(self, session: StandinSession, errors: Tuple[str, ...] = ()) -> bytes:
+        return render_train_list(session.trains, errors, self._padding, session.inbound_trains)
+
+    def _book_train_id(self, session: StandinSession, form: Form) -> bytes:
+        train_ids = [form.get("toTrainIDInputField", "")]
+        if session.inbound_trains:
+            train_ids.append(form.get("backTrainIDInputField", ""))
+        if not all(train_id.isdigit() and int(train_id) > 0 for train_id in train_ids):
+            return self.booking_page(session, (TRAIN_ID_ERROR,))
+        # 任何車次號碼都視為有座位，時刻沿用查詢時段的第一個班次
+        session.train = session.trains[0]._replace(code=int(train_ids[0]))
+        if session.inbound_trains:
+            session.inbound_train = session.inbound_trains[0]._replace(code=int(train_ids[1]))
+        return self._passenger_form(session, S3_DIRECT_SUBMIT)
+
+    def _passenger_form(self, session: StandinSession, interface: str) -> bytes:
+        session.passengers = _passengers(session.booking)
+        session.ticket_interface = interface
+        return render_passenger_form(session.passengers, interface, padding=self._padding)
+
+    def submit_train(self, session: StandinSession, form: Form) -> bytes:
+        selection = form.get("TrainQueryDataViewPanel:TrainGroup")
+        train = next((t for t in session.trains if t.form_value == selection), None)
+        inbound_selection = form.get(INBOUND_GROUP)
+        inbound_train = next((t for t in session.inbound_trains if t.form_value == inbound_selection), None)
+        if train is None or (session.inbound_trains and inbound_train is None):
+            return self._train_list(session, (NO_TRAIN_SELECTED_ERROR,))
+
+        session.train = train
+        session.inbound_train = inbound_train
+        return self._passenger_form(session, S3_SUBMIT)
+
+    def submit_ticket(self, session: StandinSession, form: Form) -> bytes:
+        errors = []
+        if len(form.get("dummyId", "")) != 10:
+            errors.append(PASSENGER_ID_ERROR)
+        for passenger in session.passengers:
+            if not TICKET_TYPES[passenger.ticket_type][1]:
+                continue
+            field = "TicketPassengerInfoInputPanel:passengerDataView:{}:passengerDataView2:passengerDataIdNumber"
+            if len(form.get(field.format(passenger.index), "")) != 10:
+                errors.append(PASSENGER_ID_ERROR)
+                break
+        if form.get("agree") != "on":
+            errors.append(AGREE_ERROR)
+        if errors or session.train is None:
+            return render_passenger_form(session.passengers, session.ticket_interface, errors, self._padding)
+
+        counts: Dict[str, int] = {}
+        for passenger in session.passengers:
+            counts[passenger.ticket_type] = counts.get(passenger.ticket_type, 0) + 1
+        summary = " ".join("{} {}".format(TICKET_TYPES[t][0], n) for t, n in counts.items())
+        pnr = "{:08d}".format(self.rng.randrange(10 ** 8))
+        start = int(session.booking.get("selectStartStation", 2))
+        dest = int(session.booking.get("selectDestinationStation", 12))
+        legs = [ResultLeg(session.train, session.booking.get("toTimeInputField", ""), start, dest, self._seat())]
+        if session.inbound_train is not None:
+            legs.append(ResultLeg(
+                session.inbound_train, session.booking.get("backTimeInputField", ""), dest, start, self._seat()
+            ))
+        return render_result(
+            pnr=pnr,
+            legs=legs,
+            phone=form.get("dummyPhone", ""),
+            ticket_summary=summary,
+            price=745 * max(len(session.passengers), 1) * len(legs),
+            padding=self._padding,
+        )
+
+    def _seat(self) -> str:
+        return "{}車{}{}".format(self.rng.randint(1, 12), self.rng.randint(1, 20), self.rng.choice("ABCDE"))
+
+    def _make_trains(self, time_table: str, first_radio: int = 18) -> List[StandinTrain]:
+        minutes = _time_table_minutes(time_table) + self.rng.randint(0, 20)
+        trains = []
+        for i in range(self.config.train_count):
+            duration = self.rng.randint(95, 140)
+            trains.append(
+                StandinTrain(
+                    code=self.rng.choice((100, 600, 800, 1500)) + self.rng.randint(1, 99),
+                    depart=_clock(minutes),
+                    arrival=_clock(minutes + duration),
+                    duration=_clock(duration),
+                    form_value="radio{}".format(first_radio + 2 * i),
+                    early_bird=self.rng.choice(("", "", "早鳥9折", "早鳥65折")),
+                    student=self.rng.choice(("", "", "大學生5折")),
+                )
+            )
+            minutes += self.rng.randint(10, 30)
+        return trains
+
+
+def _time_table_minutes(value: str) -> int:
+    """將時刻表代碼（如 "600A"、"1200N"、"130P"）轉為午夜起算的分鐘數"""
+    digits, suffix = value[:-1], value[-1]
+    hour, minute = int(digits[:-2]), int(digits[-2:])
+    if suffix == "A" and hour == 12:
+        hour = 0
+    elif suffix == "P" and hour != 12:
+        hour += 12
+    return hour * 60 + minute
+
+
+def _clock(minutes: int) -> str:
+    return "{:02d}:{:02d}".format(minutes // 60 % 24, minutes % 60)
+
+
+def _passengers(booking: Form) -> List[Passenger]:
+    passengers = []
+    for row in range(len(TICKET_TYPES)):
+        amount = booking.get("ticketPanel:rows:{}:ticketAmount".format(row), "")
+        if len(amount) < 2 or amount[-1] not in TICKET_TYPES:
+            continue
+        for _ in range(int(amount[:-1] or 0)):
+            passengers.append(Passenger(len(passengers), amount[-1]))
+    return passengers
+
+
+class _StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # 保持連線，讓用戶端可以重複使用
+
+    @property
+    def standin(self) -> StandinServer:
+        return self.server.standin  # type: ignore
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+    def date_time_string(self, timestamp: Optional[float] = None) -> str:
+        if timestamp is None:
+            timestamp = time.time() + self.standin.config.clock_offset
+        return super(_StandinHandler, self).date_time_string(timestamp)
+
+    def do_GET(self) -> None:
+        self._dispatch()
+
+    def do_POST(self) -> None:
+        self._dispatch()
+
+    def do_HEAD(self) -> None:
+        # 用戶端預熱連線用，只回標頭且保持連線
+        self.standin._delay()
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _dispatch(self) -> None:
+        standin = self.standin
+        with standin._lock:
+            standin.request_count += 1
+        url = urlsplit(self.path)
+        form = _parse_form(url.query)
+        body = self._read_body()
+        if body:
+            form.update(_parse_form(body.decode("utf-8", errors="replace")))
+        standin._delay()
+
+        if not url.path.startswith("/IMINT/"):
+            self._send(404, b"", "text/plain")
+            return
+        if standin.rng.random() < standin.config.error_rate:
+            headers = {}
+            if standin.config.retry_after is not None:
+                headers["Retry-After"] = str(standin.config.retry_after)
+            self._send(503, render_server_error(), "text/html;charset=UTF-8", headers)
+            return
+
+        interface = form.get("wicket:interface")
+        session = self._session(url.path)
+        if interface is None and self.command == "GET":
+            session = standin._new_session()
+            self._send_html(standin.booking_page(session), session_id=session.session_id)
+            return
+        if session is None:
+            session = standin._new_session()
+            page = standin.booking_page(session, (SESSION_EXPIRED_ERROR,))
+            self._send_html(page, session_id=session.session_id)
+            return
+
+        if interface == CAPTCHA_RESOURCE and self.command == "GET":
+            self._send(200, standin.captcha_image(session), "image/png")
+        elif interface == S1_SUBMIT and self.command == "POST":
+            self._send_html(standin.submit_booking(session, form))
+        elif interface == S2_SUBMIT and self.command == "POST":
+            self._send_html(standin.submit_train(session, form))
+        elif interface is not None and interface == session.ticket_interface and self.command == "POST":
+            self._send_html(standin.submit_ticket(session, form))
+        else:
+            self._send(404, b"", "text/plain")
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _session(self, path: str) -> Optional[StandinSession]:
+        session_id = None
+        if ";jsessionid=" in path:
+            session_id = path.split(";jsessionid=", 1)[1]
+        elif "Cookie" in self.headers:
+            cookie = SimpleCookie(self.headers["Cookie"])
+            if "JSESSIONID" in cookie:
+                session_id = cookie["JSESSIONID"].value
+        return self.standin.sessions.get(session_id) if session_id else None
+
+    def _send_html(self, page: bytes, status: int = 200, session_id: Optional[str] = None) -> None:
+        headers = {}
+        if session_id is not None:
+            headers["Set-Cookie"] = "JSESSIONID={}; Path=/IMINT".format(session_id)
+        if self.standin.config.compress and "gzip" in self.headers.get("Accept-Encoding", ""):
+            page = gzip.compress(page, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+        self._send(status, page, "text/html;charset=UTF-8", headers)
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _parse_form(query: str) -> Form:
+    return {key: values[0] for key, values in parse_qs(query, keep_blank_values=True).items()}
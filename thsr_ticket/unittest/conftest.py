@@ -0,0 +1,77 @@
+import os
+from typing import Any, Callable, Iterator
+
+import pytest
+
+from thsr_ticket.configs.user_config import parse_config
+from thsr_ticket.standin import StandinConfig, StandinServer
+from thsr_ticket.standin.captcha import plain_captcha
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# 替身伺服器上可完成訂票的最小設定（config.json 格式）
+BASE_RAW_CONFIG = {
+    "start_station": "台北",
+    "dest_station": "左營",
+    "outbound_date": "2030-01-25",
+    "outbound_time": "06:00",
+    "personal_id": "A123456789",
+    "phone": "0912345678",
+    "tickets": {"adult": 1},
+}
+
+
+def read_fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURE_DIR, name), "rb") as f:
+        return f.read()
+
+
+def solve_with_standin(server: StandinServer, client: Any, wrong_first: int = 0) -> Callable[[bytes, bool], str]:
+    """直接向替身伺服器取得 `client` 目前 session 的驗證碼答案，前 `wrong_first` 次故意答錯"""
+    attempts = []
+
+    def solve(img: bytes, force_manual: bool) -> str:
+        attempts.append(force_manual)
+        if len(attempts) <= wrong_first:
+            return "0000"
+        return server.captcha_answer(client.sess.cookies["JSESSIONID"])
+    return solve
+
+
+@pytest.fixture
+def load_fixture() -> Callable[[str], bytes]:
+    return read_fixture
+
+
+@pytest.fixture
+def raw_config() -> dict:
+    """測試模組可覆寫此 fixture 以改變欄位"""
+    return dict(BASE_RAW_CONFIG)
+
+
+@pytest.fixture
+def config(raw_config: dict) -> dict:
+    return parse_config(raw_config)
+
+
+@pytest.fixture
+def standin_config() -> StandinConfig:
+    """測試模組可覆寫此 fixture 以改變 seed 或其他伺服器設定"""
+    return StandinConfig()
+
+
+@pytest.fixture
+def standin_server(standin_config: StandinConfig) -> Iterator[StandinServer]:
+    with StandinServer(standin_config, captcha_factory=plain_captcha) as server:
+        yield server
+
+
+@pytest.fixture
+def make_standin(standin_config: StandinConfig) -> Callable[..., StandinServer]:
+    """以 `standin_config` 為基礎、覆寫部分欄位建立另一個替身伺服器（以 with 啟動）"""
+    return lambda **overrides: StandinServer(standin_config._replace(**overrides), captcha_factory=plain_captcha)
+
+
+@pytest.fixture
+def standin_solver() -> Callable[..., Callable[[bytes, bool], str]]:
+    return solve_with_standin
@@ -0,0 +1,28 @@
+import pytest
+
+from thsr_ticket.controller.async_booking_flow import AsyncAutoBookingFlow
+from thsr_ticket.controller.auto_booking_flow import AutoBookingFlow
+from thsr_ticket.remote.async_http_request import AsyncHTTPRequest
+from thsr_ticket.remote.http_request import HTTPRequest
+from thsr_ticket.standin import StandinConfig
+from thsr_ticket.view_model.page_scanner import PageKind
+from thsr_ticket.view_model.parsed_page import ParsedPage
+
+
+@pytest.fixture
+def standin_config() -> StandinConfig:
+    return StandinConfig(seed=3)
+
+
+def test_sync_flow_books_against_standin(standin_server, standin_solver, config):
+    client = HTTPRequest(base_url=standin_server.base_url)
+    flow = AutoBookingFlow(client, standin_solver(standin_server, client))
+    resp = flow.book(config)
+    assert ParsedPage.of(resp).scan.kind is PageKind.RESULT
+
+
+def test_async_flow_books_against_standin(standin_server, standin_solver, config):
+    client = AsyncHTTPRequest(base_url=standin_server.base_url)
+    flow = AsyncAutoBookingFlow(client, standin_solver(standin_server, client.client, wrong_first=1), step_delay=0)
+    resp = flow.book(config)
+    assert ParsedPage.of(resp).scan.kind is PageKind.RESULT
@@ -0,0 +1,144 @@
+from typing import List
+
+import pytest
+from requests.models import Response
+
+from thsr_ticket.controller.availability_watch import (
+    MIN_WATCH_INTERVAL,
+    WatchingEngine,
+    WatchPolicy,
+    diff_snapshots,
+    take_snapshot,
+)
+from thsr_ticket.controller.booking_engine import BookingState, EventKind, Step
+from thsr_ticket.controller.engine_hooks import CallbackHook
+from thsr_ticket.controller.errors import NoTrainAvailable
+from thsr_ticket.controller.headless import compile_config
+from thsr_ticket.controller.input_provider import HeadlessInputProvider
+from thsr_ticket.remote.http_request import HTTPRequest
+from thsr_ticket.remote.retry_policy import RetryPolicy
+from thsr_ticket.standin import StandinConfig
+from thsr_ticket.view_model.avail_trains import AvailTrains
+
+
+@pytest.fixture
+def standin_config() -> StandinConfig:
+    return StandinConfig(seed=3)
+
+
+@pytest.fixture(autouse=True)
+def no_captcha_delay(monkeypatch):
+    monkeypatch.setattr("thsr_ticket.controller.booking_engine.CAPTCHA_RETRY_INTERVAL", 0)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.waits: List[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.waits.append(seconds)
+        self.now += seconds
+
+
+def _engine(raw_config, client, solver, clock, policy=WatchPolicy(interval=1), events=None):
+    plan = compile_config(raw_config)
+    hooks = [CallbackHook(events.append)] if events is not None else []
+    inputs = HeadlessInputProvider(plan.config, solver, plan)
+    return WatchingEngine(client, inputs, hooks, policy, sleep=clock.sleep, clock=clock)
+
+
+def test_books_once_trains_appear(make_standin, standin_solver, raw_config):
+    with make_standin(sold_out_rate=1.0) as server:
+        client = HTTPRequest(base_url=server.base_url)
+        clock = FakeClock()
+        sleep = clock.sleep
+
+        def restock(seconds):
+            sleep(seconds)
+            if len(clock.waits) == 2:
+                server.config = server.config._replace(sold_out_rate=0.0)
+
+        clock.sleep = restock
+        events = []
+        state = _engine(raw_config, client, standin_solver(server, client), clock, events=events).run()
+
+    assert state.completed and state.tickets
+    # 間隔低於下限時以下限為準
+    assert clock.waits == [MIN_WATCH_INTERVAL, MIN_WATCH_INTERVAL]
+    watching = [event for event in events if event.kind is EventKind.WATCHING]
+    assert len(watching) == 3
+    assert watching[-1].data.added and not watching[-1].data.removed
+
+
+def test_unchanged_train_list_skips_parse(raw_config, load_fixture, monkeypatch):
+    calls = []
+    parse = AvailTrains.parse
+    monkeypatch.setattr(AvailTrains, "parse", lambda self, page: calls.append(page) or parse(self, page))
+    clock = FakeClock()
+    engine = _engine(dict(raw_config, train_policy={"train_ids": [9999]}), HTTPRequest(), None, clock)
+
+    state = BookingState()
+    snapshots = []
+    for _ in range(3):
+        resp = Response()
+        resp.status_code = 200
+        resp._content = load_fixture("avail_trains.html")
+        state.book_resp = resp
+        assert engine.after_booking(state) is Step.CAPTCHA
+        snapshots.append(engine.snapshot)
+    assert len(calls) == 1
+    assert len(snapshots[0]) == 3 and snapshots[0] == snapshots[-1]
+
+
+def test_server_retry_after_is_honoured(make_standin, standin_solver, raw_config):
+    with make_standin(retry_after=120) as server:
+        client = HTTPRequest(base_url=server.base_url, policy=RetryPolicy(max_attempts=1))
+        clock = FakeClock()
+        sleep = clock.sleep
+        answer = standin_solver(server, client)
+
+        def overloaded_once(img, force_manual):
+            # 第一次送出查詢時伺服器忙碌，等待後恢復
+            if not clock.waits:
+                server.config = server.config._replace(error_rate=1.0)
+            return answer(img, force_manual)
+
+        def recover(seconds):
+            sleep(seconds)
+            server.config = server.config._replace(error_rate=0.0)
+
+        clock.sleep = recover
+        engine = _engine(raw_config, client, overloaded_once, clock)
+        state = engine.run()
+
+    assert state.completed
+    assert clock.waits == [120]
+    assert engine.failures == 0
+
+
+def test_gives_up_after_max_polls(make_standin, standin_solver, raw_config):
+    with make_standin(sold_out_rate=1.0) as server:
+        client = HTTPRequest(base_url=server.base_url)
+        clock = FakeClock()
+        solver = standin_solver(server, client)
+        engine = _engine(raw_config, client, solver, clock, WatchPolicy(interval=45, max_polls=3))
+        with pytest.raises(NoTrainAvailable):
+            engine.run()
+
+    assert engine.polls == 3
+    assert clock.waits == [45, 45]
+
+
+def test_diff_snapshots(load_fixture):
+    trains = AvailTrains().parse(load_fixture("avail_trains.html"))
+    before = take_snapshot(trains[:2])
+    after = take_snapshot(trains[1:])
+    diff = diff_snapshots(before, after)
+    assert diff.changed
+    assert [key.train_id for key in diff.added] == [trains[2].id]
+    assert [key.train_id for key in diff.removed] == [trains[0].id]
+    assert not diff_snapshots(after, after).changed
@@ -0,0 +1,65 @@
+import pytest
+
+from thsr_ticket.configs.user_config import load_itineraries
+from thsr_ticket.controller.auto_booking_flow import AutoBookingFlow
+from thsr_ticket.controller.batch_runner import BatchRunner, ItineraryOutcome, format_report
+from thsr_ticket.remote.http_request import HTTPRequest
+from thsr_ticket.standin import StandinConfig
+
+ITINERARIES = [
+    {"start_station": "台北", "dest_station": "左營", "outbound_date": "2030-01-25", "outbound_time": "06:00"},
+    {"start_station": "台北", "dest_station": "不存在", "outbound_date": "2030-01-25", "outbound_time": "06:00"},
+    {"start_station": "左營", "dest_station": "台北", "outbound_date": "2030-01-28", "outbound_time": "18:00"},
+]
+
+
+@pytest.fixture
+def standin_config() -> StandinConfig:
+    return StandinConfig(seed=5)
+
+
+@pytest.fixture
+def shared(raw_config) -> dict:
+    """所有行程共用的欄位"""
+    return {key: value for key, value in raw_config.items() if key not in ITINERARIES[0]}
+
+
+def test_load_itineraries_merges_shared_fields(shared):
+    itineraries = load_itineraries(
+        {**shared, "phone": "0900000000", "itineraries": [ITINERARIES[0], {"phone": "0911111111"}]}
+    )
+    assert itineraries[0] == {**shared, "phone": "0900000000", **ITINERARIES[0]}
+    assert itineraries[1]["phone"] == "0911111111"
+    assert load_itineraries(shared) == [shared]
+    for bad in ([], {"start_station": "台北"}):
+        with pytest.raises(ValueError):
+            load_itineraries({**shared, "itineraries": bad})
+
+
+def test_batch_shares_client_and_reports_each_itinerary(standin_server, standin_solver, shared, monkeypatch):
+    monkeypatch.setattr("thsr_ticket.controller.auto_booking_flow.STEP_DELAY", 0)
+    client = HTTPRequest(base_url=standin_server.base_url)
+    sleeps = []
+    runner = BatchRunner(AutoBookingFlow(client, standin_solver(standin_server, client)), gap=5.0, sleep=sleeps.append)
+
+    outcomes = runner.run(load_itineraries({**shared, "itineraries": ITINERARIES}))
+
+    assert [outcome.index for outcome in outcomes] == [1, 2, 3]
+    assert [outcome.ok for outcome in outcomes] == [True, False, True]
+    assert "設定錯誤" in outcomes[1].detail and outcomes[1].elapsed == 0
+    # 每個成功的行程各自使用一個 session，訂位代號不同
+    assert len(standin_server.sessions) == 2
+    assert outcomes[0].detail != outcomes[2].detail
+    # 只在第二個成功的行程前等待，等待時間不超過間隔
+    assert len(sleeps) == 1 and 0 < sleeps[0] <= 5.0
+
+
+def test_format_report():
+    report = format_report([
+        ItineraryOutcome(1, "台北→左營 2030-01-25 06:00", True, 1.234, "12345678"),
+        ItineraryOutcome(2, "左營→台北 2030-01-28 18:00", False, 0.5, "查無可售車次"),
+    ])
+    lines = report.splitlines()
+    assert "成功" in lines[1] and "1.23 秒" in lines[1] and "12345678" in lines[1]
+    assert "失敗" in lines[2] and "查無可售車次" in lines[2]
+    assert lines[-1] == "共 2 個行程，成功 1 個"
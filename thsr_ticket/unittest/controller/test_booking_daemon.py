@@ -0,0 +1,98 @@
+import time
+from typing import Callable
+
+import pytest
+import requests
+
+from thsr_ticket.controller.booking_daemon import BookingDaemon, DaemonBusy, DaemonServer, JobStatus
+from thsr_ticket.controller.errors import InvalidConfig
+from thsr_ticket.remote.http_request import HTTPRequest
+from thsr_ticket.standin import StandinConfig, StandinServer
+
+
+@pytest.fixture
+def standin_config() -> StandinConfig:
+    return StandinConfig(seed=9)
+
+
+@pytest.fixture
+def make_daemon(standin_solver) -> Callable[..., BookingDaemon]:
+    """單一工作執行緒，驗證碼直接向替身伺服器取得答案"""
+    def make(standin: StandinServer, **kwargs) -> BookingDaemon:
+        client = HTTPRequest(base_url=standin.base_url)
+        return BookingDaemon(
+            client_factory=lambda: client, captcha_solver=standin_solver(standin, client), step_delay=0, **kwargs
+        )
+    return make
+
+
+def _wait(daemon: BookingDaemon, job_id: str, timeout: float = 10.0) -> dict:
+    until = time.monotonic() + timeout
+    while time.monotonic() < until:
+        status = daemon.job(job_id).to_dict()
+        if status["status"] not in ("queued", "running"):
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_jobs_over_http(standin_server, make_daemon, raw_config):
+    with make_daemon(standin_server) as daemon, DaemonServer(daemon, port=0) as server:
+        ids = [
+            requests.post(server.base_url + "/jobs", json={"config": raw_config}).json()["id"]
+            for _ in range(2)
+        ]
+        results = [_wait(daemon, job_id) for job_id in ids]
+        assert [r["status"] for r in results] == ["succeeded", "succeeded"]
+        assert results[0]["pnr"] != results[1]["pnr"]
+        assert results[0]["tickets"][0]["id"] == results[0]["pnr"]
+
+        polled = requests.get(f"{server.base_url}/jobs/{ids[0]}").json()
+        assert polled["pnr"] == results[0]["pnr"] and polled["progress"].startswith("訂位完成")
+        assert requests.get(server.base_url + "/health").json() == {"queued": 0, "running": 0, "finished": 2}
+        assert requests.get(server.base_url + "/jobs/unknown").status_code == 404
+
+        bad = requests.post(server.base_url + "/jobs", json={"config": dict(raw_config, start_station="不存在")})
+        assert bad.status_code == 400
+        assert requests.post(server.base_url + "/jobs", data=b"not json").status_code == 400
+    # 每筆工作各自一個 session
+    assert len(standin_server.sessions) == 2
+
+
+def test_queue_is_bounded(standin_server, make_daemon, raw_config):
+    daemon = make_daemon(standin_server, max_queued=1)  # 尚未啟動，工作留在佇列中
+    daemon.submit(raw_config)
+    with pytest.raises(DaemonBusy):
+        daemon.submit(raw_config)
+    with DaemonServer(daemon, port=0) as server:
+        resp = requests.post(server.base_url + "/jobs", json={"config": raw_config})
+        assert resp.status_code == 503 and resp.headers["Retry-After"]
+    assert daemon.stats() == {"queued": 1, "running": 0, "finished": 0}
+    with pytest.raises(InvalidConfig):
+        daemon.submit(raw_config, deadline=0)
+
+
+def test_deadlines(standin_server, make_standin, make_daemon, raw_config):
+    daemon = make_daemon(standin_server)
+    stale = daemon.submit(raw_config, deadline=0.01)
+    time.sleep(0.02)
+    with daemon:
+        assert _wait(daemon, stale.id)["error_type"] == "DeadlineExceeded"
+        assert stale.status is JobStatus.EXPIRED
+
+    with make_standin(latency=0.1) as slow:
+        with make_daemon(slow) as daemon:
+            job = daemon.submit(raw_config, deadline=0.25)
+            result = _wait(daemon, job.id)
+            assert result["status"] == "expired" and result["elapsed"] < 1.0
+
+
+def test_finished_jobs_are_bounded(standin_server, make_daemon, raw_config):
+    with make_daemon(standin_server, max_finished=2) as daemon:
+        ids = []
+        for _ in range(4):
+            ids.append(daemon.submit(raw_config).id)
+            _wait(daemon, ids[-1])
+        assert [daemon.job(job_id) is None for job_id in ids] == [True, True, False, False]
+        assert daemon.job(ids[-1]).plan is None
+        assert daemon.stats()["finished"] == 2
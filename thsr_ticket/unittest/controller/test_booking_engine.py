@@ -0,0 +1,173 @@
+from typing import List, Optional, Tuple
+
+import pytest
+
+from thsr_ticket.configs.user_config import parse_config
+from thsr_ticket.controller.booking_engine import BookingEngine, BookingState, EngineHook, Step
+from thsr_ticket.controller.engine_hooks import LandingPrefetcher, PrefetchHook, TimingHook
+from thsr_ticket.controller.input_provider import ConfigInputProvider, InteractiveInputProvider
+from thsr_ticket.model.db import Record
+from thsr_ticket.remote.http_request import HTTPRequest
+from thsr_ticket.standin import StandinConfig
+from thsr_ticket.view_model.booking_result import BookingResult
+from thsr_ticket.view_model.page_scanner import PageKind
+from thsr_ticket.view_model.parsed_page import ParsedPage
+
+
+@pytest.fixture
+def standin_config() -> StandinConfig:
+    return StandinConfig(seed=5)
+
+
+class RecordingHook(EngineHook):
+    def __init__(self) -> None:
+        self.events: List[Tuple[str, Step, Optional[Step]]] = []
+
+    def before_step(self, step: Step, state: BookingState) -> None:
+        self.events.append(("before", step, None))
+
+    def prepare(self, step: Step, state: BookingState) -> None:
+        self.events.append(("prepare", step, None))
+
+    def after_step(self, step: Step, state: BookingState, next_step: Optional[Step]) -> None:
+        self.events.append(("after", step, next_step))
+
+
+def test_engine_walks_every_step_with_hooks(standin_server, standin_solver, config, monkeypatch):
+    monkeypatch.setattr("thsr_ticket.controller.booking_engine.CAPTCHA_RETRY_INTERVAL", 0)
+    client = HTTPRequest(base_url=standin_server.base_url)
+    hook, timing = RecordingHook(), TimingHook()
+    inputs = ConfigInputProvider(config, standin_solver(standin_server, client, wrong_first=1))
+    state = BookingEngine(client, inputs, [hook, timing]).run()
+
+    assert state.completed
+    assert ParsedPage.of(state.response).scan.kind is PageKind.RESULT
+    transitions = [(step, next_step) for kind, step, next_step in hook.events if kind == "after"]
+    assert transitions == [
+        (Step.FORM, Step.LANDING),
+        (Step.LANDING, Step.CAPTCHA),
+        (Step.CAPTCHA, Step.S1_SUBMIT),
+        (Step.S1_SUBMIT, Step.CAPTCHA),  # 第一次驗證碼錯誤，只重新取得圖片
+        (Step.CAPTCHA, Step.S1_SUBMIT),
+        (Step.S1_SUBMIT, Step.S2_SELECT),
+        (Step.S2_SELECT, Step.S3_SUBMIT),
+        (Step.S3_SUBMIT, Step.RESULT),
+        (Step.RESULT, None),
+    ]
+    assert ("prepare", Step.LANDING, None) in hook.events
+    assert state.captcha_errors == 1
+    assert len(standin_server.sessions) == 1
+    assert set(timing.durations) == set(Step)
+
+
+def test_warm_up_does_not_open_session(standin_server):
+    client = HTTPRequest(base_url=standin_server.base_url)
+    assert client.warm_up()
+    assert not standin_server.sessions
+    assert not client.sess.cookies
+
+
+def test_prefetcher_waits_for_signal(standin_server):
+    client = HTTPRequest(base_url=standin_server.base_url)
+    prefetcher = LandingPrefetcher(client)
+    prefetcher.start()
+    landing, img = prefetcher.result()
+    assert landing.defaults.security_img_src
+    assert img.startswith(b"\x89PNG")
+    assert len(standin_server.sessions) == 1
+
+
+def test_interactive_prompts_run_before_booking_page(standin_server, standin_solver, monkeypatch):
+    client = HTTPRequest(base_url=standin_server.base_url)
+    sessions_at_prompt = []
+
+    def fake_input(prompt: str = "") -> str:
+        sessions_at_prompt.append(len(standin_server.sessions))
+        if "是否繼續" in prompt:
+            return "y"
+        return "A123456789" if "身分證" in prompt else ""
+
+    monkeypatch.setattr("builtins.input", fake_input)
+    inputs = InteractiveInputProvider(
+        captcha_solver=standin_solver(standin_server, client),
+    )
+    state = BookingEngine(client, inputs, [PrefetchHook(client)]).run()
+
+    # 前面的提示不等待網路，首頁在最後幾題才取得
+    assert sessions_at_prompt[0] == 0
+    assert len(standin_server.sessions) == 1
+    assert state.completed
+    assert state.book_model.seat_prefer
+
+
+def test_booking_by_train_id_skips_train_selection(standin_server, standin_solver, raw_config):
+    client = HTTPRequest(base_url=standin_server.base_url)
+    hook = RecordingHook()
+    config = parse_config({**raw_config, "train_id": "0803"})
+    inputs = ConfigInputProvider(config, standin_solver(standin_server, client))
+    state = BookingEngine(client, inputs, [hook]).run()
+
+    assert state.completed
+    assert state.book_model.search_by == "radio33" and state.book_model.to_train_id == 803
+    assert state.train_model is None
+    transitions = [(step, next_step) for kind, step, next_step in hook.events if kind == "after"]
+    assert (Step.S1_SUBMIT, Step.S3_SUBMIT) in transitions
+    assert Step.S2_SELECT not in {step for step, _ in transitions}
+    # 首頁、驗證碼、第一頁、第三頁，比依時間搜尋少一次請求
+    assert standin_server.request_count == 4
+    assert BookingResult().parse(state.ticket_resp)[0].train_id == "803"
+
+
+def test_round_trip_in_one_session(standin_server, standin_solver, raw_config):
+    client = HTTPRequest(base_url=standin_server.base_url)
+    config = parse_config({
+        **raw_config,
+        "inbound_date": "2030-01-28",
+        "inbound_time": "17:00",
+        "return_train_policy": {"depart_after": "17:20"},
+    })
+    state = BookingEngine(client, ConfigInputProvider(config, standin_solver(standin_server, client))).run()
+
+    assert state.completed
+    assert state.book_model.types_of_trip == 1 and state.book_model.inbound_time == "500P"
+    assert state.train_model.selected_inbound_train.startswith("radio")
+    outbound, inbound = BookingResult().parse(state.ticket_resp)
+    assert (outbound.start_station, outbound.dest_station) == ("台北", "左營")
+    assert (inbound.start_station, inbound.dest_station, inbound.date) == ("左營", "台北", "01/28")
+    assert inbound.depart_time >= "17:20"
+    assert inbound.id == outbound.id
+    # 兩個方向共用一次首頁、驗證碼與三頁送出
+    assert len(standin_server.sessions) == 1
+    assert standin_server.request_count == 5
+
+
+def test_interactive_round_trip(standin_server, standin_solver, monkeypatch):
+    client = HTTPRequest(base_url=standin_server.base_url)
+    monkeypatch.setattr(
+        "builtins.input",
+        lambda prompt="": "y" if "去回程" in prompt or "是否繼續" in prompt else (
+            "A123456789" if "身分證" in prompt else ""
+        ),
+    )
+    inputs = InteractiveInputProvider(
+        captcha_solver=standin_solver(standin_server, client),
+    )
+    state = BookingEngine(client, inputs).run()
+
+    assert state.completed
+    assert state.book_model.types_of_trip == 1
+    assert len(BookingResult().parse(state.ticket_resp)) == 2
+
+
+def test_interactive_record_books_one_way(monkeypatch):
+    prompts = []
+    monkeypatch.setattr("builtins.input", lambda prompt="": prompts.append(prompt) or "")
+    record = Record(
+        start_station=2, dest_station=12, outbound_time="600A", adult_num="1F", child_num="0H",
+        disabled_num="0W", elder_num="0E", college_num="0P", youth_num="0T",
+    )
+    form = InteractiveInputProvider(record).booking_form(lambda: None)
+
+    assert form["types_of_trip"] == 0
+    assert "inbound_date" not in form and "inbound_time" not in form
+    assert not any("去回程" in prompt for prompt in prompts)
@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+from thsr_ticket.controller.booking_engine import EventKind, Step
+from thsr_ticket.controller.captcha_helper import ocr_captcha
+from thsr_ticket.controller.errors import (
+    BookingError,
+    CaptchaUnsolved,
+    DeadlineExceeded,
+    InvalidConfig,
+    InvalidPassengerIds,
+    NoTrainAvailable,
+)
+from thsr_ticket.controller.headless import book, compile_config
+from thsr_ticket.controller.input_provider import HeadlessInputProvider
+from thsr_ticket.remote.http_request import HTTPRequest
+from thsr_ticket.standin import StandinConfig
+
+PASSENGERS = [
+    {"field_name": "p0", "passenger_number": 1, "ticket_type": "敬老票"},
+    {"field_name": "p1", "passenger_number": 2, "ticket_type": "愛心票"},
+]
+
+
+@pytest.fixture
+def standin_config() -> StandinConfig:
+    return StandinConfig(seed=3)
+
+
+def test_book_returns_tickets_and_events_without_console_output(standin_server, standin_solver, raw_config, capsys):
+    client = HTTPRequest(base_url=standin_server.base_url)
+    events = []
+    solver = standin_solver(standin_server, client)
+    outcome = book(compile_config(raw_config), client, solver, events.append, step_delay=0)
+
+    assert outcome.pnr == outcome.tickets[0].id and outcome.tickets[0].start_station
+    assert outcome.captcha_errors == 0
+    assert set(outcome.durations) == set(Step)
+    kinds = [event.kind for event in events]
+    assert kinds.count(EventKind.PROGRESS) == 4
+    assert EventKind.TRAIN_SELECTED in kinds
+    assert events[-1].kind is EventKind.COMPLETED and events[-1].data == outcome.tickets
+    assert capsys.readouterr().out == ""
+
+
+def test_sold_out_raises_typed_error(make_standin, standin_solver, raw_config):
+    with make_standin(sold_out_rate=1.0) as standin:
+        client = HTTPRequest(base_url=standin.base_url)
+        events = []
+        with pytest.raises(NoTrainAvailable):
+            book(compile_config(raw_config), client, standin_solver(standin, client), events.append, step_delay=0)
+        assert events[-1].kind is EventKind.REJECTED
+
+
+def test_captcha_gives_up_without_prompting(standin_server, raw_config, monkeypatch):
+    monkeypatch.setattr("thsr_ticket.controller.booking_engine.CAPTCHA_RETRY_INTERVAL", 0)
+    client = HTTPRequest(base_url=standin_server.base_url)
+    solver = lambda img, force_manual: ocr_captcha(img, force_manual) if force_manual else "ZZZZ"  # noqa: E731
+    events = []
+    with pytest.raises(CaptchaUnsolved):
+        book(compile_config(raw_config), client, solver, events.append, step_delay=0)
+    assert [event.data for event in events if event.kind is EventKind.CAPTCHA_RETRY] == [1, 2, 3]
+
+
+def test_compile_config_raises_invalid_config(raw_config):
+    with pytest.raises(InvalidConfig):
+        compile_config({key: value for key, value in raw_config.items() if key != "personal_id"})
+    with pytest.raises(InvalidConfig):
+        compile_config(dict(raw_config, start_station="不存在"))
+    assert issubclass(InvalidConfig, (BookingError, ValueError))
+
+
+def test_headless_passenger_ids():
+    provider = HeadlessInputProvider({}, captcha_solver=None)
+    assert provider.passenger_ids(PASSENGERS, ["B123456789", "C123456789"]) == {"p0": "B123456789", "p1": "C123456789"}
+    for ids in (["B123456789"], ["B123456789", "short"], ["B123456789", "B123456789"]):
+        with pytest.raises(InvalidPassengerIds):
+            provider.passenger_ids(PASSENGERS, ids)
+
+
+def test_deadline_does_not_change_client_budget(standin_server, standin_solver, raw_config):
+    client = HTTPRequest(base_url=standin_server.base_url)
+    client.budget.total = 45.0
+    solver = standin_solver(standin_server, client)
+    book(compile_config(raw_config), client, solver, step_delay=0, deadline=time.monotonic() + 30)
+    assert client.budget.total == 45.0
+
+    with pytest.raises(DeadlineExceeded):
+        book(compile_config(raw_config), client, solver, step_delay=0, deadline=time.monotonic() - 1)
+    assert client.budget.total == 45.0
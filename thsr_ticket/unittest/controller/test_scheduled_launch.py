@@ -0,0 +1,38 @@
+import time
+from datetime import datetime
+
+import pytest
+
+from thsr_ticket.controller.auto_booking_flow import AutoBookingFlow
+from thsr_ticket.controller.scheduled_launch import TAIPEI_TZ, ScheduledLaunch, parse_launch_time
+from thsr_ticket.remote.http_request import HTTPRequest
+from thsr_ticket.standin import StandinConfig, StandinServer
+
+NOW = datetime(2026, 10, 16, 23, 30, tzinfo=TAIPEI_TZ)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("23:59:59.5", datetime(2026, 10, 16, 23, 59, 59, 500000, tzinfo=TAIPEI_TZ)),
+    ("00:00", datetime(2026, 10, 17, 0, 0, tzinfo=TAIPEI_TZ)),
+    ("2026-11-01 08:00", datetime(2026, 11, 1, 8, 0, tzinfo=TAIPEI_TZ)),
+    ("2026-11-01T00:00:00+00:00", datetime(2026, 11, 1, 8, 0, tzinfo=TAIPEI_TZ)),
+])
+def test_parse_launch_time(text, expected):
+    assert parse_launch_time(text, now=NOW) == expected.timestamp()
+
+
+def test_parse_launch_time_rejects_garbage():
+    with pytest.raises(ValueError):
+        parse_launch_time("tomorrow", now=NOW)
+
+
+def test_launch_is_aligned_to_server_clock():
+    with StandinServer(StandinConfig(clock_offset=-2.5)) as server:
+        flow = AutoBookingFlow(HTTPRequest(base_url=server.base_url), lambda img, force_manual: "")
+        launch = ScheduledLaunch(flow, target=0, samples=4)
+        clock = launch.prepare()
+        launch.target = clock.server_time() + 1.5
+        report = launch.wait(clock)
+        assert 0 <= report.skew < 0.005
+        # 伺服器慢 2.5 秒，本機時間應比目標晚約 2.5 秒
+        assert abs(time.time() - launch.target - 2.5) < 0.1
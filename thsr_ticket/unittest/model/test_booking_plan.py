@@ -0,0 +1,147 @@
+import json
+import os
+
+import pytest
+
+from thsr_ticket.configs.user_config import parse_config
+from thsr_ticket.configs.web.param_schema import BookingModel, ConfirmTicketModel, ConfirmTrainModel
+from thsr_ticket.controller.auto_booking_flow import AutoBookingFlow
+from thsr_ticket.model import booking_plan
+from thsr_ticket.model.booking_plan import PlanCache, compile_plan, config_digest, model_from_params
+from thsr_ticket.remote.http_request import HTTPRequest
+from thsr_ticket.standin import StandinConfig
+from thsr_ticket.view_model.booking_page import BookingPageDefaults
+from thsr_ticket.view_model.booking_result import BookingResult
+from thsr_ticket.view_model.page_scanner import PageKind
+from thsr_ticket.view_model.parsed_page import ParsedPage
+
+DEFAULTS = BookingPageDefaults(
+    security_img_src="/img", seat_prefer="radio17", types_of_trip=0, search_by="radio31"
+)
+
+
+@pytest.fixture
+def raw_config(raw_config) -> dict:
+    return dict(raw_config, email="someone@example.com", tickets={"adult": 2, "child": 1})
+
+
+@pytest.fixture
+def standin_config() -> StandinConfig:
+    return StandinConfig(seed=11)
+
+
+def test_plan_matches_model_serialisation(config):
+    plan = compile_plan(config)
+
+    form_data = {name: config[name] for name in config if name in BookingModel.__fields__}
+    book_model = BookingModel(
+        **form_data,
+        security_code="AB12",
+        seat_prefer=DEFAULTS.seat_prefer,
+        types_of_trip=DEFAULTS.types_of_trip,
+        search_by=DEFAULTS.search_by,
+    )
+    assert plan.booking_params("AB12", DEFAULTS) == json.loads(book_model.json(by_alias=True))
+
+    train_model = ConfirmTrainModel(selected_train="radio7")
+    assert plan.train_params("radio7") == json.loads(train_model.json(by_alias=True))
+
+    ticket_model = ConfirmTicketModel(
+        personal_id=config["personal_id"], phone_num=config["phone"], member_radio="radio2", email=config["email"]
+    )
+    assert plan.ticket_params("radio2") == json.loads(ticket_model.json(by_alias=True))
+
+
+def test_compile_rejects_past_date(config):
+    with pytest.raises(ValueError):
+        compile_plan(dict(config, outbound_date="2000-01-01"))
+
+
+def test_model_from_params_round_trip(config):
+    params = compile_plan(config).booking_params("AB12", DEFAULTS)
+    model = model_from_params(BookingModel, params)
+    assert model.security_code == "AB12"
+    assert BookingModel(**model.dict(exclude_unset=True)).outbound_date == "2030/01/25"
+
+
+def test_digest_ignores_key_order(raw_config):
+    reordered = dict(reversed(list(raw_config.items())))
+    assert config_digest(reordered) == config_digest(raw_config)
+    assert config_digest(dict(raw_config, phone="0987654321")) != config_digest(raw_config)
+
+
+def test_cache_skips_compilation_for_same_config(raw_config, tmp_path, monkeypatch):
+    cache = PlanCache(str(tmp_path / "plan.json"))
+    plan = cache.load_or_compile(raw_config)
+    assert os.stat(cache.path).st_mode & 0o777 == 0o600
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cached plan should be reused")
+    monkeypatch.setattr(booking_plan, "compile_plan", fail)
+    assert cache.load_or_compile(raw_config) == plan
+
+    # 設定變更後必須重新編譯
+    with pytest.raises(AssertionError):
+        cache.load_or_compile(dict(raw_config, outbound_time="07:00"))
+
+
+def test_cache_expires_plan_compiled_on_another_day(raw_config, tmp_path):
+    cache = PlanCache(str(tmp_path / "plan.json"))
+    plan = cache.load_or_compile(raw_config)
+    cache.save(plan._replace(compiled_on="2000-01-01"))
+    assert cache.load(plan.digest) is None
+
+
+def test_booking_with_plan_does_no_validation(config, standin_server, standin_solver, monkeypatch):
+    monkeypatch.setattr("thsr_ticket.controller.auto_booking_flow.STEP_DELAY", 0)
+    plan = compile_plan(config)
+
+    def forbidden(*args, **kwargs):
+        raise AssertionError("models should not be validated or serialised after compilation")
+    for model in (BookingModel, ConfirmTrainModel, ConfirmTicketModel):
+        monkeypatch.setattr(model, "__init__", forbidden)
+        monkeypatch.setattr(model, "json", forbidden)
+
+    client = HTTPRequest(base_url=standin_server.base_url)
+    resp = AutoBookingFlow(client, standin_solver(standin_server, client)).book_plan(plan)
+    assert ParsedPage.of(resp).scan.kind is PageKind.RESULT
+
+
+def test_plan_by_train_id_keeps_booking_method(raw_config, standin_server, standin_solver, monkeypatch):
+    monkeypatch.setattr("thsr_ticket.controller.auto_booking_flow.STEP_DELAY", 0)
+    plan = compile_plan(parse_config(dict(raw_config, train_id=1505)))
+    params = plan.booking_params("AB12", DEFAULTS)
+    assert params[booking_plan.SEARCH_BY] == "radio33"
+    assert params["toTrainIDInputField"] == 1505
+
+    client = HTTPRequest(base_url=standin_server.base_url)
+    resp = AutoBookingFlow(client, standin_solver(standin_server, client)).book_plan(plan)
+    assert ParsedPage.of(resp).scan.kind is PageKind.RESULT
+
+
+@pytest.mark.parametrize("train_id", ["abc", -1, "0"])
+def test_invalid_train_id(raw_config, train_id):
+    with pytest.raises(ValueError):
+        parse_config(dict(raw_config, train_id=train_id))
+
+
+def test_round_trip_plan_by_train_id(raw_config, standin_server, standin_solver, monkeypatch):
+    monkeypatch.setattr("thsr_ticket.controller.auto_booking_flow.STEP_DELAY", 0)
+    raw = dict(raw_config, train_id=803, inbound_date="2030-01-28", inbound_time="17:00", inbound_train_id=822)
+    plan = compile_plan(parse_config(raw))
+    params = plan.booking_params("AB12", DEFAULTS)
+    assert params[booking_plan.TYPES_OF_TRIP] == 1
+    assert params["backTrainIDInputField"] == 822
+
+    client = HTTPRequest(base_url=standin_server.base_url)
+    resp = AutoBookingFlow(client, standin_solver(standin_server, client)).book_plan(plan)
+    assert [ticket.train_id for ticket in BookingResult().parse(resp)] == ["803", "822"]
+
+
+@pytest.mark.parametrize("extra", [
+    {"inbound_date": "2030-01-28"},
+    {"inbound_date": "2030-01-28", "inbound_time": "17:00", "train_id": 803},
+])
+def test_incomplete_round_trip(raw_config, extra):
+    with pytest.raises(ValueError):
+        parse_config(dict(raw_config, **extra))
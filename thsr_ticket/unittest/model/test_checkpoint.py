@@ -0,0 +1,71 @@
+import json
+import time
+
+import pytest
+from requests.exceptions import ConnectionError
+
+from thsr_ticket.configs.web.param_schema import BookingModel
+from thsr_ticket.controller.auto_booking_flow import AutoBookingFlow
+from thsr_ticket.model.checkpoint import STEP_BOOKING_FORM, STEP_TRAIN, CheckpointStore
+from thsr_ticket.remote.http_request import HTTPRequest
+from thsr_ticket.standin import StandinConfig, StandinServer
+from thsr_ticket.view_model.page_scanner import PageKind
+from thsr_ticket.view_model.parsed_page import ParsedPage
+
+
+@pytest.fixture
+def standin_config() -> StandinConfig:
+    return StandinConfig(seed=7)
+
+
+def _crashing_client(server: StandinServer, step: str) -> HTTPRequest:
+    client = HTTPRequest(base_url=server.base_url)
+
+    def crash(params, *args):
+        raise ConnectionError("connection reset")
+    setattr(client, step, crash)
+    return client
+
+
+@pytest.mark.parametrize("failing, step", [("submit_train", STEP_BOOKING_FORM), ("submit_ticket", STEP_TRAIN)])
+def test_resume_after_crash(standin_server, standin_solver, config, tmp_path, monkeypatch, failing, step):
+    monkeypatch.setattr("thsr_ticket.controller.auto_booking_flow.STEP_DELAY", 0)
+    store = CheckpointStore(str(tmp_path / "checkpoint.json"))
+    client = _crashing_client(standin_server, failing)
+    with pytest.raises(ConnectionError):
+        AutoBookingFlow(client, standin_solver(standin_server, client), checkpoints=store).book(config)
+
+    checkpoint = store.load()
+    assert checkpoint.step == step
+    assert BookingModel(**checkpoint.models["booking"]).start_station == config["start_station"]
+    assert any(cookie["name"] == "JSESSIONID" for cookie in checkpoint.cookies)
+
+    # 新的 client 沿用同一個伺服器 session，不重新載入首頁或辨識驗證碼
+    def no_captcha(img, force_manual):
+        raise AssertionError("resume should not solve a captcha")
+    resumed = AutoBookingFlow(HTTPRequest(base_url=checkpoint.base_url), no_captcha, checkpoints=store)
+    resp = resumed.resume(checkpoint)
+    assert ParsedPage.of(resp).scan.kind is PageKind.RESULT
+    assert len(standin_server.sessions) == 1
+    assert store.load() is None
+
+
+def test_expired_checkpoint_is_discarded(standin_server, standin_solver, config, tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoint.json"))
+    client = _crashing_client(standin_server, "submit_train")
+    with pytest.raises(ConnectionError):
+        AutoBookingFlow(client, standin_solver(standin_server, client), checkpoints=store).book(config)
+
+    with open(store.path, encoding="utf-8") as f:
+        data = json.load(f)
+    data["saved_at"] = time.time() - 3600
+    with open(store.path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    assert store.load() is None
+    assert not tmp_path.joinpath("checkpoint.json").exists()
+
+
+def test_corrupt_checkpoint_is_ignored(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert CheckpointStore(str(path)).load() is None
@@ -0,0 +1,43 @@
+import json
+from datetime import date
+
+import pytest
+
+from thsr_ticket.configs.web.param_schema import BaseModel, BookingModel, ConfirmTicketModel, ConfirmTrainModel
+
+BOOKING = BookingModel(
+    start_station=2,
+    dest_station=12,
+    search_by="radio31",
+    types_of_trip=0,
+    outbound_date="2030-01-25",
+    outbound_time="600A",
+    security_code="AB12",
+    seat_prefer="radio17",
+    adult_ticket_num="2F",
+)
+
+
+class DatedModel(BaseModel):
+    day: date
+
+
+@pytest.mark.parametrize("model", [
+    BOOKING,
+    ConfirmTrainModel(selected_train="radio7"),
+    ConfirmTicketModel(personal_id="A123456789", phone_num="", member_radio="radio2"),
+    DatedModel(day=date(2030, 1, 25)),
+])
+def test_params_same_as_json_round_trip(model):
+    expected = json.loads(model.json(by_alias=True))
+    params = model.params()
+    assert params == expected
+    assert list(params) == list(expected)
+
+
+def test_with_security_code_keeps_other_fields():
+    retry = BOOKING.with_security_code("ZZ99")
+    assert retry.security_code == "ZZ99"
+    assert BOOKING.security_code == "AB12"
+    assert retry.params() == dict(BOOKING.params(), **{"homeCaptcha:securityCode": "ZZ99"})
+    assert retry.dict(exclude_unset=True).keys() == BOOKING.dict(exclude_unset=True).keys()
@@ -0,0 +1,88 @@
+import jsonschema
+import pytest
+
+from thsr_ticket.configs.web.param_schema import (
+    BOOKING_SCHEMA,
+    BOOKING_VALIDATOR,
+    CONFIRM_TICKET_SHEMA,
+    CONFIRM_TICKET_VALIDATOR,
+    CONFIRM_TRAIN_SCHEMA,
+    CONFIRM_TRAIN_VALIDATOR,
+)
+from thsr_ticket.configs.web.schema_validator import compile_schema
+
+BOOKING_PARAMS = {
+    "BookingS1Form:hf:0": "",
+    "selectStartStation": 2,
+    "selectDestinationStation": 12,
+    "trainCon:trainRadioGroup": 0,
+    "tripCon:typesoftrip": 0,
+    "seatCon:seatRadioGroup": "radio17",
+    "bookingMethod": "radio31",
+    "toTimeInputField": "2030/01/25",
+    "toTimeTable": "600A",
+    "ticketPanel:rows:0:ticketAmount": "1F",
+    "homeCaptcha:securityCode": "AB12",
+}
+TRAIN_PARAMS = {"BookingS2Form:hf:0": "", "TrainQueryDataViewPanel:TrainGroup": "radio21"}
+TICKET_PARAMS = {"dummyId": "A123456789", "agree": "on", "diffOver": 1, "idInputRadio": 0}
+
+
+def _variants():
+    yield BOOKING_VALIDATOR, BOOKING_SCHEMA, BOOKING_PARAMS
+    for key, value in [
+        ("selectStartStation", 13),
+        ("selectStartStation", True),  # bool 與 1 在 Python 中相等，但 jsonschema 視為不同
+        ("selectStartStation", 2.0),
+        ("selectStartStation", "2"),
+        ("tripCon:typesoftrip", False),
+        ("bookingMethod", "radio"),
+        ("bookingMethod", "xradio3"),
+        ("toTimeTable", "123A"),
+        ("toTimeTable", ["600A"]),
+        ("ticketPanel:rows:0:ticketAmount", "11F"),
+        ("ticketPanel:rows:5:ticketAmount", "0T"),  # schema 中沒有的欄位
+    ]:
+        yield BOOKING_VALIDATOR, BOOKING_SCHEMA, dict(BOOKING_PARAMS, **{key: value})
+    yield BOOKING_VALIDATOR, BOOKING_SCHEMA, {k: v for k, v in BOOKING_PARAMS.items() if k != "toTimeTable"}
+    yield CONFIRM_TRAIN_VALIDATOR, CONFIRM_TRAIN_SCHEMA, TRAIN_PARAMS
+    yield (
+        CONFIRM_TRAIN_VALIDATOR, CONFIRM_TRAIN_SCHEMA, dict(TRAIN_PARAMS, **{"TrainQueryDataViewPanel:TrainGroup": 21})
+    )
+    yield CONFIRM_TICKET_VALIDATOR, CONFIRM_TICKET_SHEMA, TICKET_PARAMS
+    yield CONFIRM_TICKET_VALIDATOR, CONFIRM_TICKET_SHEMA, dict(TICKET_PARAMS, agree="off")
+    yield CONFIRM_TICKET_VALIDATOR, CONFIRM_TICKET_SHEMA, dict(TICKET_PARAMS, TgoError="1")
+
+
+@pytest.mark.parametrize("validator, schema, params", list(_variants()))
+def test_same_result_as_jsonschema(validator, schema, params):
+    try:
+        jsonschema.validate(params, schema=schema)
+    except jsonschema.exceptions.ValidationError as expected:
+        with pytest.raises(jsonschema.exceptions.ValidationError) as raised:
+            validator.validate(params)
+        assert raised.value.message == expected.message
+        assert not validator.is_valid(params)
+    else:
+        validator.validate(params)
+        assert validator.is_valid(params)
+
+
+def test_compile_schema_is_cached():
+    assert compile_schema(BOOKING_SCHEMA) is BOOKING_VALIDATOR
+    assert compile_schema(dict(BOOKING_SCHEMA)) is not BOOKING_VALIDATOR
+
+
+def test_unsupported_keywords_use_jsonschema():
+    validator = compile_schema({"type": "object", "properties": {"n": {"type": "integer", "minimum": 3}}})
+    assert validator.is_valid({"n": 3})
+    assert not validator.is_valid({"n": 2})
+
+
+def test_allows():
+    assert BOOKING_VALIDATOR.allows("toTimeTable", "600A")
+    assert not BOOKING_VALIDATOR.allows("toTimeTable", "601A")
+    assert not BOOKING_VALIDATOR.allows("toTimeTable", ["600A"])
+    assert BOOKING_VALIDATOR.allows("homeCaptcha:securityCode", "anything")
+    with pytest.raises(KeyError):
+        BOOKING_VALIDATOR.allows("ticketPanel:rows:5:ticketAmount", "0T")
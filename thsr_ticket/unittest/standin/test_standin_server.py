@@ -0,0 +1,85 @@
+from typing import Iterator
+
+import pytest
+
+from thsr_ticket.controller.booking_engine import _parse_passenger_id_fields
+from thsr_ticket.controller.captcha_helper import has_train_data, is_captcha_error, parse_error_feedback
+from thsr_ticket.remote.http_request import HTTPRequest
+from thsr_ticket.standin import StandinConfig, StandinServer
+from thsr_ticket.standin.captcha import plain_captcha
+from thsr_ticket.view_model.avail_trains import AvailTrains
+from thsr_ticket.view_model.booking_result import BookingResult
+from thsr_ticket.view_model.parsed_page import ParsedPage
+
+
+@pytest.fixture(scope="module")
+def server() -> Iterator[StandinServer]:
+    config = StandinConfig(train_count=5, page_padding=2000, seed=7)
+    with StandinServer(config, captcha_factory=plain_captcha) as standin:
+        yield standin
+
+
+def _booking_params(landing, security_code: str) -> dict:
+    return {
+        "BookingS1Form:hf:0": "",
+        "selectStartStation": 2,
+        "selectDestinationStation": 12,
+        "trainCon:trainRadioGroup": 0,
+        "tripCon:typesoftrip": landing.defaults.types_of_trip,
+        "seatCon:seatRadioGroup": landing.defaults.seat_prefer,
+        "bookingMethod": landing.defaults.search_by,
+        "toTimeInputField": "2030/01/25",
+        "toTimeTable": "600A",
+        "ticketPanel:rows:0:ticketAmount": "1F",
+        "ticketPanel:rows:3:ticketAmount": "1E",
+        "homeCaptcha:securityCode": security_code,
+    }
+
+
+def test_full_booking_flow(server):
+    client = HTTPRequest(base_url=server.base_url)
+    landing = client.open_booking_page()
+    assert landing.defaults.search_by == "radio31"
+    assert client.request_security_code_img(landing).headers["Content-Type"] == "image/png"
+    landing.release()
+
+    answer = server.captcha_answer(client.sess.cookies["JSESSIONID"])
+    resp = client.submit_booking_form(_booking_params(landing, answer))
+    assert has_train_data(resp)
+    trains = AvailTrains().parse(resp)
+    assert len(trains) == 5
+
+    resp = client.submit_train({"BookingS2Form:hf:0": "", "TrainQueryDataViewPanel:TrainGroup": trains[0].form_value})
+    passengers = _parse_passenger_id_fields(ParsedPage.of(resp))
+    assert [p["ticket_type"] for p in passengers] == ["敬老票"]
+
+    params = {
+        "dummyId": "A123456789",
+        "dummyPhone": "0912345678",
+        "agree": "on",
+        passengers[0]["field_name"]: "B123456789",
+    }
+    ticket = BookingResult().parse(client.submit_ticket(params))[0]
+    assert ticket.train_id == str(trains[0].id)
+    assert ticket.start_station == "台北"
+    assert ticket.dest_station == "左營"
+
+
+def test_captcha_error_and_refresh(server):
+    client = HTTPRequest(base_url=server.base_url)
+    landing = client.open_booking_page()
+    client.request_security_code_img(landing)
+    landing.release()
+
+    resp = client.submit_booking_form(_booking_params(landing, "0000"))
+    assert is_captcha_error(parse_error_feedback(resp))
+
+    # 驗證碼錯誤後需重新取得圖片，同一個 session 可以繼續送出
+    client.refresh_security_code_img(landing.defaults.security_img_src, resp)
+    answer = server.captcha_answer(client.sess.cookies["JSESSIONID"])
+    assert has_train_data(client.submit_booking_form(_booking_params(landing, answer)))
+
+
+def test_server_error_rate():
+    with StandinServer(StandinConfig(error_rate=1.0), captcha_factory=plain_captcha) as standin:
+        assert HTTPRequest(base_url=standin.base_url).request_booking_page().status_code == 503
@@ -0,0 +1,92 @@
+import gzip
+import os
+import stat
+from urllib.parse import quote_plus
+
+import pytest
+
+from thsr_ticket.controller.headless import book, compile_config
+from thsr_ticket.remote.cassette import REDACTED, CassetteError, load_cassette
+from thsr_ticket.remote.http_request import HTTPRequest
+from thsr_ticket.standin import StandinConfig, StandinServer
+from thsr_ticket.standin.captcha import plain_captcha
+
+
+def _search(client: HTTPRequest, answer_of) -> list:
+    landing = client.open_booking_page()
+    img = client.request_security_code_img(landing).content
+    landing.release()
+    params = {
+        "selectStartStation": 2,
+        "selectDestinationStation": 12,
+        "tripCon:typesoftrip": landing.defaults.types_of_trip,
+        "seatCon:seatRadioGroup": landing.defaults.seat_prefer,
+        "bookingMethod": landing.defaults.search_by,
+        "toTimeInputField": "2030/01/25",
+        "toTimeTable": "600A",
+        "homeCaptcha:securityCode": answer_of(client.sess.cookies["JSESSIONID"]),
+    }
+    resp = client.submit_booking_form(params)
+    return [landing.html, img, resp.content]
+
+
+def test_record_and_replay(tmp_path):
+    path = str(tmp_path / "search.jsonl.gz")
+    with StandinServer(StandinConfig(seed=1), captcha_factory=plain_captcha) as server:
+        base_url = server.base_url
+        recorder = HTTPRequest(base_url=base_url, cassette=path, cassette_mode="record")
+        recorded = _search(recorder, server.captcha_answer)
+        session_id = recorder.sess.cookies["JSESSIONID"]
+
+    interactions = load_cassette(path)
+    assert [i.method for i in interactions] == ["GET", "GET", "POST"]
+    assert interactions[1].body_encoding == "base64"
+
+    # 伺服器已關閉，重播不需連網；Cookie 會從卡帶中還原（JSESSIONID 已遮蔽），驗證碼內容不影響比對
+    player = HTTPRequest(base_url=base_url, cassette=path, cassette_mode="replay")
+    assert _search(player, lambda _: "ABCD") == [
+        content.replace(session_id.encode(), REDACTED.encode()) for content in recorded
+    ]
+    assert player.sess.cookies["JSESSIONID"] == REDACTED
+
+    with pytest.raises(CassetteError):
+        player.request_booking_page()
+
+
+def test_recording_is_private_and_redacted(tmp_path, raw_config, make_standin, standin_solver):
+    path = str(tmp_path / "booking.jsonl.gz")
+    raw_config = dict(
+        raw_config, email="someone@example.com", tickets={"adult": 1, "elder": 1}, passenger_ids=["B123456789"],
+    )
+    with make_standin(seed=1) as server:
+        client = HTTPRequest(base_url=server.base_url, cassette=path, cassette_mode="record")
+        outcome = book(compile_config(raw_config), client, standin_solver(server, client), step_delay=0)
+        session_id = client.sess.cookies["JSESSIONID"]
+    client.sess.adapters["http://"].writer.close()
+
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        recorded = f.read()
+    secrets = [session_id, raw_config["personal_id"], raw_config["phone"], raw_config["email"], "B123456789"]
+    for secret in secrets + [quote_plus(secret) for secret in secrets]:
+        assert secret not in recorded
+    assert outcome.pnr in recorded
+    assert "passengerDataIdNumber=" + REDACTED in recorded
+
+    # 遮蔽後仍可完整重播
+    player = HTTPRequest(base_url=server.base_url, cassette=path, cassette_mode="replay")
+    assert book(compile_config(raw_config), player, lambda img, force_manual: "ABCD", step_delay=0).pnr == outcome.pnr
+
+
+def test_replay_mismatch(tmp_path):
+    path = str(tmp_path / "landing.jsonl.gz")
+    with StandinServer(captcha_factory=plain_captcha) as server:
+        HTTPRequest(base_url=server.base_url, cassette=path).request_booking_page()
+        player = HTTPRequest(base_url=server.base_url, cassette=path, cassette_mode="replay")
+        with pytest.raises(CassetteError):
+            player.submit_train({"TrainQueryDataViewPanel:TrainGroup": "radio18"})
+
+
+def test_unknown_cassette_mode(tmp_path):
+    with pytest.raises(ValueError):
+        HTTPRequest(cassette=str(tmp_path / "x.jsonl.gz"), cassette_mode="rewind")
@@ -0,0 +1,29 @@
+from typing import Iterator
+
+import pytest
+
+from thsr_ticket.remote.clock_sync import estimate_clock_offset
+from thsr_ticket.remote.http_request import HTTPRequest
+from thsr_ticket.standin import StandinConfig, StandinServer
+
+CLOCK_OFFSET = 12.345
+
+
+@pytest.fixture(scope="module")
+def server() -> Iterator[StandinServer]:
+    with StandinServer(StandinConfig(clock_offset=CLOCK_OFFSET)) as standin:
+        yield standin
+
+
+def test_estimate_clock_offset_resolves_sub_second(server):
+    clock = estimate_clock_offset(HTTPRequest(base_url=server.base_url), samples=6)
+    # 6 個樣本把一秒的區間縮小到約 1/32 秒
+    assert clock.error < 0.05
+    assert abs(clock.offset - CLOCK_OFFSET) <= clock.error + clock.rtt + 0.01
+    assert clock.samples == 6
+
+
+def test_single_sample_is_within_one_second(server):
+    clock = estimate_clock_offset(HTTPRequest(base_url=server.base_url), samples=1)
+    assert clock.error == pytest.approx(0.5)
+    assert abs(clock.offset - CLOCK_OFFSET) < 0.5 + clock.rtt
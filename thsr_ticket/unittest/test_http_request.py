@@ -1,4 +1,5 @@
-from thsr_ticket.remote.http_request import HTTPRequest
+from thsr_ticket.configs.web.http_config import HTTPConfig
+from thsr_ticket.remote.http_request import HTTPRequest, refresh_captcha_src
 
 
 def test_requests_work():
@@ -7,3 +8,24 @@ def test_requests_work():
     resp = client.request_booking_page()
     assert resp.status_code == 200
     assert client.request_security_code_img(resp.content).status_code == 200
+
+
+def test_refresh_captcha_src():
+    listener = "/IMINT/?wicket:interface=:0:BookingS1Form:homeCaptcha:passCode::IResourceListener"
+    src = listener + "&wicket:antiCache=1700000000000"
+    refreshed = refresh_captcha_src(src)
+    assert refreshed.startswith(listener + "&")
+    assert "wicket:antiCache=1700000000000" not in refreshed
+    assert refresh_captcha_src("/img?x=1").startswith("/img?x=1&wicket:antiCache=")
+
+
+def test_refresh_security_code_img_prefers_error_page(load_fixture, monkeypatch):
+    client = HTTPRequest()
+    urls = []
+    monkeypatch.setattr(client.sess, "request", lambda method, url, **kwargs: urls.append(url))
+
+    client.refresh_security_code_img("/old", load_fixture("error_page.html"))
+    client.refresh_security_code_img("/old?wicket:antiCache=1")
+    assert "antiCache=1700000000999" in urls[0]
+    assert urls[1].startswith(HTTPConfig.BASE_URL + "/old?wicket:antiCache=")
+    assert urls[1] != HTTPConfig.BASE_URL + "/old?wicket:antiCache=1"
@@ -0,0 +1,87 @@
+import pytest
+
+from thsr_ticket.configs.common import AVAILABLE_TIME_TABLE, MAX_TICKET_NUM
+from thsr_ticket.configs.registry import (
+    SLOT_BY_TIME,
+    STATION_BY_NAME,
+    STATION_BY_PTX_ID,
+    STATION_BY_WEB_ID,
+    STATIONS,
+    TICKET_BY_CODE,
+    TICKET_CODE,
+    TIME_BY_SLOT,
+)
+from thsr_ticket.configs.rest.station_id import StationID
+from thsr_ticket.configs.user_config import (
+    format_ticket_num,
+    station_name_to_code,
+    system_format_to_time,
+    time_to_system_format,
+)
+from thsr_ticket.configs.web.enums import StationMapping, TicketType
+from thsr_ticket.model.web.booking_form.ticket_num import AdultTicket, ElderTicket
+from thsr_ticket.model.web.booking_form.time_table import TimeTable
+
+
+def test_stations_cover_every_mapping():
+    assert [s.mapping for s in STATIONS] == list(StationMapping)
+    assert sorted(STATION_BY_PTX_ID) == sorted(vars(StationID()).values())
+    for station in STATIONS:
+        assert STATION_BY_WEB_ID[station.web_id] is station
+        assert STATION_BY_PTX_ID[station.ptx_id] is station
+        assert STATION_BY_NAME[station.zh] is station
+        assert STATION_BY_NAME[station.en] is station
+
+
+@pytest.mark.parametrize("name, code", [("台北", 2), ("Zuouing", 12), ("7", 7), ("07", 7), (3, 3)])
+def test_station_name_to_code(name, code):
+    assert station_name_to_code(name) == code
+
+
+@pytest.mark.parametrize("name", ["台中站", "13", "0", "Taipei "])
+def test_station_name_to_code_rejects(name):
+    with pytest.raises(ValueError):
+        station_name_to_code(name)
+
+
+def test_time_slots_round_trip():
+    assert list(TIME_BY_SLOT) == AVAILABLE_TIME_TABLE
+    for slot, clock in TIME_BY_SLOT.items():
+        assert SLOT_BY_TIME[clock] == slot
+        assert time_to_system_format(clock) == slot
+        assert system_format_to_time(slot) == clock
+
+
+@pytest.mark.parametrize("clock, slot", [("0:01", "1201A"), ("6:00", "600A"), ("12:00", "1200N"), ("13:30", "130P")])
+def test_time_to_system_format(clock, slot):
+    assert time_to_system_format(clock) == slot
+
+
+@pytest.mark.parametrize("clock", ["00:00", "07:15", "24:00", "7", "ab:cd"])
+def test_time_to_system_format_rejects(clock):
+    with pytest.raises(ValueError):
+        time_to_system_format(clock)
+
+
+def test_ticket_codes():
+    assert TICKET_CODE[(TicketType.ADULT, 2)] == "2F"
+    assert TICKET_BY_CODE["10E"] == (TicketType.ELDER, 10)
+    assert len(TICKET_CODE) == len(TicketType) * (MAX_TICKET_NUM + 1)
+    assert format_ticket_num(3, TicketType.YOUTH) == "3T"
+    with pytest.raises(ValueError):
+        format_ticket_num(MAX_TICKET_NUM + 1, TicketType.ADULT)
+
+
+def test_tables_are_read_only():
+    with pytest.raises(TypeError):
+        STATION_BY_WEB_ID[13] = STATIONS[0]  # type: ignore
+
+
+def test_legacy_lookups_use_registry():
+    assert TimeTable().get_time(3) == "600A"
+    with pytest.raises(ValueError):
+        TimeTable().get_time(len(AVAILABLE_TIME_TABLE) + 1)
+    assert AdultTicket().get_code(4) == "4F"
+    assert ElderTicket().get_code(0) == "0E"
+    with pytest.raises(ValueError):
+        AdultTicket().get_code(11)
@@ -0,0 +1,78 @@
+import random
+
+import pytest
+from requests.exceptions import ConnectTimeout, ReadTimeout
+from requests.models import Response
+
+from thsr_ticket.remote.http_request import HTTPRequest
+from thsr_ticket.remote.retry_policy import BudgetExceeded, RetryPolicy, backoff_delay, is_retryable
+from thsr_ticket.standin import StandinConfig, StandinServer
+from thsr_ticket.standin.captcha import plain_captcha
+
+
+def _response(status: int, retry_after: str = None) -> Response:
+    resp = Response()
+    resp.status_code = status
+    if retry_after is not None:
+        resp.headers["Retry-After"] = retry_after
+    return resp
+
+
+def test_backoff_delay():
+    policy = RetryPolicy(backoff_base=0.5, backoff_max=2.0)
+    rng = random.Random(0)
+    for attempt, cap in ((1, 0.5), (2, 1.0), (3, 2.0), (6, 2.0)):
+        assert all(0 <= backoff_delay(policy, attempt, rng=rng) <= cap for _ in range(50))
+    assert backoff_delay(policy, 1, _response(503, "3"), rng) >= 3
+    assert backoff_delay(policy, 1, _response(503, "Wed, 21 Oct 2015 07:28:00 GMT"), rng) <= 0.5
+
+
+def test_is_retryable():
+    policy = RetryPolicy()
+    assert is_retryable(policy, "GET", _response(500), None)
+    assert is_retryable(policy, "GET", None, ReadTimeout())
+    assert not is_retryable(policy, "GET", _response(404), None)
+    # 表單送出只在確定伺服器未處理時重試
+    assert is_retryable(policy, "POST", _response(503), None)
+    assert is_retryable(policy, "POST", None, ConnectTimeout())
+    assert not is_retryable(policy, "POST", _response(500), None)
+    assert not is_retryable(policy, "POST", None, ReadTimeout())
+
+
+def test_gives_up_after_max_attempts():
+    with StandinServer(StandinConfig(error_rate=1.0), captcha_factory=plain_captcha) as server:
+        client = HTTPRequest(base_url=server.base_url, policy=RetryPolicy(max_attempts=3, backoff_base=0.01))
+        assert client.request_booking_page().status_code == 503
+        assert server.request_count == 3
+
+
+def test_retry_after_beyond_step_deadline():
+    config = StandinConfig(error_rate=1.0, retry_after=30)
+    with StandinServer(config, captcha_factory=plain_captcha) as server:
+        client = HTTPRequest(base_url=server.base_url, policy=RetryPolicy(step_deadline=1.0))
+        with pytest.raises(BudgetExceeded) as exc_info:
+            client.request_booking_page()
+        assert (exc_info.value.step, exc_info.value.scope) == ("booking_page", "step")
+        assert server.request_count == 1
+
+
+def test_slow_step_uses_up_step_deadline():
+    with StandinServer(StandinConfig(latency=0.3), captcha_factory=plain_captcha) as server:
+        policy = RetryPolicy(read_timeout=0.1, step_deadline=0.5, max_attempts=10, backoff_base=0.05)
+        with pytest.raises(BudgetExceeded) as exc_info:
+            HTTPRequest(base_url=server.base_url, policy=policy).request_booking_page()
+        assert exc_info.value.step == "booking_page"
+
+
+def test_run_budget_shared_across_steps():
+    with StandinServer(StandinConfig(latency=0.2), captcha_factory=plain_captcha) as server:
+        policy = RetryPolicy(run_budget=0.35, backoff_base=0.05)
+        client = HTTPRequest(base_url=server.base_url, policy=policy)
+        landing = client.open_booking_page()
+        with pytest.raises(BudgetExceeded) as exc_info:
+            client.request_security_code_img(landing)
+        assert (exc_info.value.step, exc_info.value.scope) == ("security_code_img", "run")
+        assert set(exc_info.value.spent) == {"booking_page", "security_code_img"}
+
+        client.start_run()
+        assert client.request_security_code_img(landing).status_code == 200
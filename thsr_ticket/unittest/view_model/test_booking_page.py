@@ -0,0 +1,44 @@
+from thsr_ticket.view_model.booking_page import (
+    BookingPageDefaults,
+    StreamedBookingPage,
+    booking_page_defaults,
+)
+from thsr_ticket.view_model.parsed_page import ParsedPage
+
+
+def _chunks(html, size=64):
+    return iter([html[i:i + size] for i in range(0, len(html), size)])
+
+
+def test_stream_stops_early(load_fixture):
+    html = load_fixture("booking_page.html")
+    landing = StreamedBookingPage(_chunks(html))
+
+    assert landing.defaults == BookingPageDefaults(
+        security_img_src="/IMINT/?wicket:interface=:0:BookingS1Form:homeCaptcha:passCode::IResourceListener"
+                         "&wicket:antiCache=1700000000000",
+        seat_prefer="0",
+        types_of_trip=0,
+        search_by="radio31",
+    )
+    assert landing.bytes_read < len(html)
+
+    landing.release()
+    assert landing.html == html
+
+
+def test_stream_matches_dom(load_fixture):
+    for name in ["booking_page.html", "error_page.html"]:
+        html = load_fixture(name)
+        assert StreamedBookingPage(_chunks(html, 7)).defaults == booking_page_defaults(ParsedPage(html))
+
+
+def test_multibyte_split_across_chunks(load_fixture):
+    html = load_fixture("booking_page.html")
+    assert StreamedBookingPage(_chunks(html, 1)).defaults.seat_prefer == "0"
+
+
+def test_boolean_checked_attribute(load_fixture):
+    html = load_fixture("booking_page.html").replace(b'checked="checked"', b'checked')
+    landing = StreamedBookingPage(_chunks(html))
+    assert landing.defaults == booking_page_defaults(ParsedPage(html))
@@ -0,0 +1,64 @@
+import pytest
+
+from thsr_ticket.view_model.page_scanner import PageKind, scan_page, train_list_digest
+from thsr_ticket.view_model.parsed_page import ParsedPage
+from thsr_ticket.view_model.error_feedback import ErrorFeedback
+from thsr_ticket.controller.captcha_helper import parse_error_feedback, is_captcha_error
+from thsr_ticket.remote.http_request import parse_security_img_url
+
+
+@pytest.mark.parametrize("name,kind", [
+    ("booking_page.html", PageKind.BOOKING_FORM),
+    ("avail_trains.html", PageKind.TRAIN_LIST),
+    ("confirm_ticket.html", PageKind.PASSENGER_FORM),
+    ("booking_result.html", PageKind.RESULT),
+    ("error_page.html", PageKind.ERROR),
+])
+def test_page_kind(load_fixture, name, kind):
+    assert scan_page(load_fixture(name)).kind is kind
+
+
+def test_errors_match_dom(load_fixture):
+    html = load_fixture("error_page.html")
+    scan = scan_page(html)
+    soup = ParsedPage(html, "html.parser").soup
+    assert scan.errors == [span.text for span in soup.find_all("span", class_="feedbackPanelERROR")]
+
+    page = ParsedPage(html)
+    assert is_captcha_error(parse_error_feedback(page))
+    assert len(ErrorFeedback().parse(page)) == 2
+    assert not page.is_parsed
+
+
+@pytest.mark.parametrize("name", ["booking_page.html", "error_page.html"])
+def test_captcha_src_match_dom(load_fixture, name):
+    html = load_fixture(name)
+    element = ParsedPage(html, "html.parser").soup.find(id="BookingS1Form_homeCaptcha_passCode")
+    assert scan_page(html).captcha_src == element["src"]
+
+    page = ParsedPage(html)
+    assert parse_security_img_url(page).endswith(element["src"])
+    assert not page.is_parsed
+
+
+def test_undecidable_falls_back_to_dom():
+    html = '<span class="feedbackPanelERROR">請輸入<b>身分證字號</b>&amp;電話</span>'.encode("utf-8")
+    scan = scan_page(html)
+    assert scan.errors is None
+    assert scan.kind is PageKind.ERROR
+    assert parse_error_feedback(html) == ['請輸入身分證字號&電話']
+
+
+def test_no_errors(load_fixture):
+    assert scan_page(load_fixture("avail_trains.html")).errors == []
+    assert scan_page(load_fixture("avail_trains.html")).captcha_src is None
+
+
+def test_train_list_digest(load_fixture):
+    html = load_fixture("avail_trains.html")
+    digest = train_list_digest(html)
+    assert digest is not None and digest == train_list_digest(bytes(html))
+    # 時刻或優惠改變時摘要不同，其餘內容改變時不影響
+    assert train_list_digest(html.replace(b'QueryDeparture="06:26"', b'QueryDeparture="06:27"', 1)) != digest
+    assert train_list_digest(html.replace(b"</title>", b" </title>", 1)) == digest
+    assert train_list_digest(load_fixture("error_page.html")) is None
@@ -0,0 +1,39 @@
+from requests.models import Response
+
+from thsr_ticket.view_model.parsed_page import ParsedPage
+from thsr_ticket.view_model.error_feedback import ErrorFeedback
+from thsr_ticket.controller.captcha_helper import parse_error_feedback, has_train_data
+
+HTML = '<html><body><span class="feedbackPanelERROR">檢測碼輸入錯誤</span></body></html>'.encode('utf-8')
+
+
+def _response(content: bytes) -> Response:
+    resp = Response()
+    resp._content = content
+    resp.status_code = 200
+    return resp
+
+
+def test_parse_lazily():
+    page = ParsedPage(HTML)
+    assert not page.is_parsed
+    assert page.soup is page.soup
+    assert page.is_parsed
+
+
+def test_cached_on_response():
+    resp = _response(HTML)
+    page = ParsedPage.of(resp)
+    assert ParsedPage.of(resp) is page
+    assert ParsedPage.of(page) is page
+
+
+def test_shared_between_consumers():
+    resp = _response(HTML)
+    assert not has_train_data(resp)
+    assert not ParsedPage.of(resp).is_parsed
+
+    assert parse_error_feedback(resp) == ['檢測碼輸入錯誤']
+    soup = ParsedPage.of(resp).soup
+    assert [e.msg for e in ErrorFeedback().parse(resp)] == ['檢測碼輸入錯誤']
+    assert ParsedPage.of(resp).soup is soup
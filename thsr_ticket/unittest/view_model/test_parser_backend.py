@@ -0,0 +1,42 @@
+import pytest
+
+from thsr_ticket.view_model.parsed_page import ParsedPage
+from thsr_ticket.view_model.parser_backend import (
+    available_backends,
+    get_parser_backend,
+    set_parser_backend,
+)
+from thsr_ticket.view_model.avail_trains import AvailTrains
+from thsr_ticket.view_model.booking_result import BookingResult
+from thsr_ticket.view_model.error_feedback import ErrorFeedback
+from thsr_ticket.controller.booking_engine import _parse_passenger_id_fields
+
+REFERENCE = "html.parser"
+
+
+def _parse_all(load_fixture, backend):
+    return {
+        "trains": AvailTrains().parse(ParsedPage(load_fixture("avail_trains.html"), backend)),
+        "result": BookingResult().parse(ParsedPage(load_fixture("booking_result.html"), backend)),
+        "errors": ErrorFeedback().parse(ParsedPage(load_fixture("error_page.html"), backend)),
+        "passengers": _parse_passenger_id_fields(ParsedPage(load_fixture("confirm_ticket.html"), backend)),
+    }
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_backend_parity(load_fixture, backend):
+    expected = _parse_all(load_fixture, REFERENCE)
+    assert len(expected["trains"]) == 3
+    assert len(expected["passengers"]) == 2
+    assert _parse_all(load_fixture, backend) == expected
+
+
+def test_default_backend_prefers_fastest():
+    set_parser_backend(None)
+    assert get_parser_backend() == available_backends()[0]
+
+
+def test_set_unknown_backend():
+    with pytest.raises(ValueError):
+        set_parser_backend("selectolax")
+    assert get_parser_backend() in available_backends()
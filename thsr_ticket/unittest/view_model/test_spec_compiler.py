@@ -0,0 +1,42 @@
+import pytest
+
+from thsr_ticket.configs.web.parse_avail_train import ParseAvailTrain
+from thsr_ticket.configs.web.parse_html_element import BOOKING_PAGE, BOOKING_RESULT
+from thsr_ticket.view_model.parsed_page import ParsedPage
+from thsr_ticket.view_model.spec_compiler import CompiledGroupSpec, CompiledSpec, compile_spec
+
+
+@pytest.mark.parametrize("name,specs", [
+    ("booking_result.html", BOOKING_RESULT),
+    ("booking_page.html", BOOKING_PAGE),
+    ("error_page.html", BOOKING_PAGE),
+])
+def test_extract_matches_find(load_fixture, name, specs):
+    soup = ParsedPage(load_fixture(name)).soup
+    fields = CompiledSpec(specs).extract(soup)
+    for field, spec in specs.items():
+        assert fields[field] is soup.find(**spec), field
+
+
+def test_extract_groups_matches_find(load_fixture):
+    soup = ParsedPage(load_fixture("avail_trains.html")).soup
+    cond = ParseAvailTrain()
+    specs = {"train_id": cond.train_id, "duration": cond.duration, "student": cond.college_student_discount}
+    groups = CompiledGroupSpec(dict(name="label", **cond.from_html), specs).extract_groups(soup)
+
+    items = soup.find_all("label", **cond.from_html)
+    assert len(groups) == len(items) == 3
+    for fields, item in zip(groups, items):
+        for field, spec in specs.items():
+            assert fields[field] is item.find(**spec), field
+
+
+def test_missing_field_is_none():
+    soup = ParsedPage(b"<div><p class='pnr-code'><span>1</span></p></div>").soup
+    fields = compile_spec(BOOKING_RESULT).extract(soup)
+    assert fields["ticket_id"].find("span").text == "1"
+    assert fields["train_id"] is None
+
+
+def test_compile_spec_cached():
+    assert compile_spec(BOOKING_RESULT) is compile_spec(BOOKING_RESULT)
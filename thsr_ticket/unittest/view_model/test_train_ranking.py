@@ -0,0 +1,99 @@
+import pytest
+
+from thsr_ticket.configs.user_config import parse_train_policy
+from thsr_ticket.configs.web.param_schema import Train
+from thsr_ticket.controller.errors import NoMatchingTrain
+from thsr_ticket.controller.input_provider import ConfigInputProvider
+from thsr_ticket.view_model.avail_trains import AvailTrains, shortest_travel_time
+from thsr_ticket.view_model.parsed_page import ParsedPage
+from thsr_ticket.view_model.train_ranking import RankingPolicy, TrainKey, TrainRanker
+
+
+def _train(train_id, depart, arrive, travel, early_bird=False, student=False):
+    return Train(
+        id=train_id,
+        depart=depart,
+        arrive=arrive,
+        travel_time=travel,
+        discount_str="",
+        form_value=f"radio{train_id}",
+        early_bird=early_bird,
+        student_discount=student,
+    )
+
+
+TRAINS = [
+    _train(803, "06:26", "08:00", "01:34", early_bird=True),
+    _train(1505, "06:45", "08:50", "02:05", early_bird=True, student=True),
+    _train(109, "07:00", "08:36", "01:36"),
+    _train(611, "07:30", "09:04", "01:34"),
+]
+
+
+def _best(**policy):
+    train = TrainRanker(RankingPolicy(**policy)).best(TRAINS)
+    return None if train is None else train.id
+
+
+def test_keys_from_fixture(load_fixture):
+    trains = AvailTrains().parse(ParsedPage(load_fixture("avail_trains.html")))
+    keys = {train.id: TrainKey.of(train) for train in trains}
+    assert keys[803] == TrainKey(depart=386, arrive=480, travel=94, early_bird=True, student=False, train_id=803)
+    assert keys[1505].early_bird and keys[1505].student
+    assert not keys[109].discounted
+
+
+def test_key_crosses_midnight():
+    key = TrainKey.of(_train(1, "23:30", "00:50", "01:20"))
+    assert key.arrive - key.depart == key.travel
+
+
+def test_default_is_shortest_travel_time_first_on_page():
+    assert _best() == 803
+    assert shortest_travel_time(TRAINS).id == 803
+    assert shortest_travel_time([]) is None
+
+
+def test_filters():
+    assert _best(depart_after=7 * 60) == 611
+    assert _best(depart_before=6 * 60 + 30) == 803
+    assert _best(arrive_by=8 * 60 + 40, exclude_train_ids=[803]) == 109
+    assert _best(train_ids=[1505, 109]) == 109
+    assert _best(depart_after=8 * 60) is None
+
+
+def test_weights():
+    assert _best(prefer_discount=True, discount_bonus=40, exclude_train_ids=[803]) == 1505
+    # 盡早出發：出發時間的權重壓過乘車時間
+    assert _best(depart_after=6 * 60 + 40, depart_weight=10) == 1505
+
+
+def test_rank_matches_best():
+    ranker = TrainRanker(RankingPolicy(prefer_discount=True, depart_weight=1))
+    ranked = ranker.rank(TRAINS)
+    assert ranked[0] is ranker.best(TRAINS)
+    assert [t.id for t in TrainRanker().rank(TRAINS)] == [803, 611, 109, 1505]
+
+
+def test_parse_train_policy():
+    policy = parse_train_policy({
+        "depart_after": "06:30",
+        "arrive_by": "9:05",
+        "prefer_discount": True,
+        "exclude_train_ids": ["803", 109],
+    })
+    assert policy == {"depart_after": 390, "arrive_by": 545, "prefer_discount": True, "exclude_train_ids": [109, 803]}
+    assert _best(**policy) == 611
+
+    for bad in ({"depart_after": "25:00"}, {"train_ids": ["abc"]}, {"depart_weight": -1}, {"latest": "08:00"}):
+        with pytest.raises(ValueError):
+            parse_train_policy(bad)
+
+
+def test_config_provider_uses_policy():
+    provider = ConfigInputProvider({"train_policy": {"train_ids": [109]}}, captcha_solver=None)
+    assert provider.select_train(TRAINS).id == 109
+
+    provider = ConfigInputProvider({"train_policy": {"train_ids": [1]}}, captcha_solver=None)
+    with pytest.raises(NoMatchingTrain):
+        provider.select_train(TRAINS)
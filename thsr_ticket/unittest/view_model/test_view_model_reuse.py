@@ -0,0 +1,20 @@
+from thsr_ticket.view_model.avail_trains import AvailTrains
+from thsr_ticket.view_model.error_feedback import ErrorFeedback
+
+
+def test_avail_trains_does_not_accumulate(load_fixture):
+    avail = AvailTrains()
+    first = avail.parse(load_fixture("avail_trains.html"))
+    for _ in range(3):
+        again = avail.parse(load_fixture("avail_trains.html"))
+    assert again == first and avail.avail_trains == first
+    assert avail.inbound_trains == []
+
+
+def test_error_feedback_does_not_accumulate(load_fixture):
+    feedback = ErrorFeedback()
+    errors = feedback.parse(load_fixture("error_page.html"))
+    assert errors
+    for _ in range(3):
+        assert feedback.parse(load_fixture("error_page.html")) == errors
+    assert feedback.parse(load_fixture("avail_trains.html")) == []
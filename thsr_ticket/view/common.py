@@ -1,7 +1,7 @@
 from typing import Iterable
 
 from thsr_ticket.model.db import Record
-from thsr_ticket.model.web.booking_form.station_mapping import StationMapping
+from thsr_ticket.configs.registry import STATION_BY_WEB_ID
 
 
 def history_info(hists: Iterable[Record], select: bool = True) -> int:
@@ -9,8 +9,8 @@ def history_info(hists: Iterable[Record], select: bool = True) -> int:
         print("第{}筆紀錄".format(idx))
         print("  身分證字號: " + r.personal_id)
         print("  手機號碼: " + r.phone)
-        print("  起程站: " + StationMapping(r.start_station).name)
-        print("  到達站: " + StationMapping(r.dest_station).name)
+        print("  起程站: " + STATION_BY_WEB_ID[r.start_station].en)
+        print("  到達站: " + STATION_BY_WEB_ID[r.dest_station].en)
         t_str = r.outbound_time
         print("  出發時間: {}:{} (A: 早上, P: 下午, N: 中午)".format(t_str[:-3], t_str[-3:]))
         print("  大人票數: " + r.adult_num[:-1])
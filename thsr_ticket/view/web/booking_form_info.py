@@ -2,7 +2,8 @@ from typing import Any
 import datetime
 
 from thsr_ticket.configs.common import DAYS_BEFORE_BOOKING_AVAILABLE
-from thsr_ticket.model.web.booking_form.station_mapping import StationMapping
+from thsr_ticket.configs.registry import TIME_BY_SLOT
+from thsr_ticket.configs.web.enums import StationMapping
 from thsr_ticket.model.web.booking_form.ticket_num import BaseTicket
 from thsr_ticket.model.web.booking_form.time_table import TimeTable
 
@@ -42,13 +43,7 @@ class BookingFormInfo:
     def time_table_info(self, default_value: int = None, select: bool = True) -> str:
         print("選擇出發時間:")
         for t in self.time_table:
-            t_int = int(t.time[:-1])
-            if t.time[-1] == "A" and (t_int // 100) == 12:
-                t_int = "{:04d}".format(t_int % 1200)  # type: ignore
-            elif t_int != 1230 and t.time[-1] == "P":
-                t_int += 1200
-            t_str = str(t_int)
-            print("{}. {}:{}".format(t.value, t_str[:-2], t_str[-2:]))
+            print("{}. {}".format(t.value, TIME_BY_SLOT[t.time]))
 
         if select:
             return self.time_table.get_time(
@@ -16,10 +16,12 @@ class ShowBookingResult(AbstractShow):
         hint = ["日期", "起程站", "到達站", "出發時間", "到達時間", "車次"]
         fmt = "{:>6}" * len(hint)
         print(fmt.format(*hint))
-        info = [
-            ticket.date, ticket.start_station, ticket.dest_station, ticket.depart_time,
-            ticket.arrival_time, ticket.train_id
-        ]
-        print("    {}   {}     {}     {}    {}      {}".format(*info))
-        print("    {} {}".format(ticket.seat_class, ticket.seat))
+        # 去回程時依序為去程、回程
+        for leg in tickets:
+            info = [
+                leg.date, leg.start_station, leg.dest_station, leg.depart_time,
+                leg.arrival_time, leg.train_id
+            ]
+            print("    {}   {}     {}     {}    {}      {}".format(*info))
+            print("    {} {}".format(leg.seat_class, leg.seat))
         return 0
@@ -1,13 +1,15 @@
 from typing import List, Any
 from bs4 import BeautifulSoup
 
+from thsr_ticket.view_model.parsed_page import ParsedPage, PageSource
+
 
 class AbstractViewModel:
     def __init__(self) -> None:
         pass
 
-    def parse(self, html: bytes) -> List[Any]:
+    def parse(self, page: PageSource) -> List[Any]:
         raise NotImplementedError
 
-    def _parser(self, html: bytes) -> BeautifulSoup:
-        return BeautifulSoup(html, features="html.parser")
+    def _parser(self, page: PageSource) -> BeautifulSoup:
+        return ParsedPage.of(page).soup
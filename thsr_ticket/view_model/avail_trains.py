@@ -1,51 +1,59 @@
 from typing import List, Mapping, Optional
-from bs4.element import Tag
 
 from thsr_ticket.view_model.abstract_view_model import AbstractViewModel
+from thsr_ticket.view_model.parsed_page import PageSource
+from thsr_ticket.view_model.spec_compiler import CompiledGroupSpec, Fields
+from thsr_ticket.view_model.train_ranking import TrainRanker
 from thsr_ticket.configs.web.parse_avail_train import ParseAvailTrain
 from thsr_ticket.configs.web.param_schema import Train
 
 
-def _parse_travel_time_minutes(travel_time: str) -> int:
-    """將旅程時間字串轉換為分鐘數
+def _compile_train_spec() -> CompiledGroupSpec:
+    """以 ParseAvailTrain 的條件建立班次清單的單次走訪萃取器"""
+    specs = {
+        name: spec for name, spec in vars(ParseAvailTrain).items()
+        if not name.startswith('_')
+    }
+    group = specs.pop('from_html')
+    return CompiledGroupSpec(dict(name='label', **group), specs)
 
-    Args:
-        travel_time: 旅程時間字串（如 "01:30" 或 "00:45"）
-
-    Returns:
-        int: 總分鐘數
-    """
-    parts = travel_time.split(":")
-    if len(parts) == 2:
-        hours = int(parts[0])
-        minutes = int(parts[1])
-        return hours * 60 + minutes
-    return 9999  # 無法解析時回傳大數值
 
+_TRAIN_SPEC = _compile_train_spec()
 
 
 class AvailTrains(AbstractViewModel):
     def __init__(self) -> None:
         super(AvailTrains, self).__init__()
         self.avail_trains: List[Train] = []
+        self.inbound_trains: List[Train] = []  # 去回程的回程班次
         self.cond = ParseAvailTrain()
 
-    def parse(self, html: bytes) -> List[Train]:
-        page = self._parser(html)
-        avail = page.find_all('label', **self.cond.from_html)
+    def parse(self, page: PageSource) -> List[Train]:
+        """解析班次清單，回傳去程班次；去回程的回程班次存於 `inbound_trains`
+
+        每次呼叫都重新開始，同一個實例重複使用時不會累積上一個頁面的班次。
+        """
+        self.avail_trains = []
+        self.inbound_trains = []
+        page = self._parser(page)
+        avail = _TRAIN_SPEC.extract_groups(page)
         return self._parse_train(avail)
 
-    def _parse_train(self, avail: List[Tag]) -> List[Train]:
+    def _parse_train(self, avail: List[Fields]) -> List[Train]:
         for item in avail:
-            train_id = int(item.find(**self.cond.train_id).text)
-            depart_time = item.find(**self.cond.depart).text
-            arrival_time = item.find(**self.cond.arrival).text
-            travel_time = item.find(**self.cond.duration).find_next(
+            if item['form_value'] is not None:
+                form_tag, trains = item['form_value'], self.avail_trains
+            else:
+                form_tag, trains = item['inbound_form_value'], self.inbound_trains
+            train_id = int(item['train_id'].text)
+            depart_time = item['depart'].text
+            arrival_time = item['arrival'].text
+            travel_time = item['duration'].find_next(
                 'span', {'class': 'material-icons'}
-            ).fetchNextSiblings()[0].text
+            ).find_next_sibling().text
             discount_str = self._parse_discount(item)
-            form_value = item.find(**self.cond.form_value).attrs['value']
-            self.avail_trains.append(
+            form_value = form_tag.attrs['value']
+            trains.append(
                 Train(
                     id=train_id,
                     depart=depart_time,
@@ -53,15 +61,17 @@ class AvailTrains(AbstractViewModel):
                     travel_time=travel_time,
                     discount_str=discount_str,
                     form_value=form_value,
+                    early_bird=item['early_bird_discount'] is not None,
+                    student_discount=item['college_student_discount'] is not None,
                 )
             )
         return self.avail_trains
 
-    def _parse_discount(self, item: Tag) -> str:
+    def _parse_discount(self, item: Fields) -> str:
         discounts = []
-        if tag := item.find(**self.cond.early_bird_discount):
+        if tag := item['early_bird_discount']:
             discounts.append(tag.find_next().text)
-        if tag := item.find(**self.cond.college_student_discount):
+        if tag := item['college_student_discount']:
             discounts.append(tag.find_next().text)
         if discounts:
             joined_str = ', '.join(discounts)
@@ -74,10 +84,9 @@ class AvailTrains(AbstractViewModel):
         Returns:
             Train: 乘車時間最短的班次，若無可用班次則回傳 None
         """
-        if not self.avail_trains:
-            return None
+        return shortest_travel_time(self.avail_trains)
+
 
-        return min(
-            self.avail_trains,
-            key=lambda t: _parse_travel_time_minutes(t.travel_time)
-        )
+def shortest_travel_time(trains: List[Train]) -> Optional[Train]:
+    """選擇乘車時間最短的班次，若無可用班次則回傳 None"""
+    return TrainRanker().best(trains)
@@ -0,0 +1,133 @@
+"""訂票首頁的串流解析
+
+首頁只需要四個值：驗證碼圖片網址、座位偏好、行程類型與訂位方式的預設選項。
+`BookingPageParser` 以事件驅動的方式邊下載邊解析，四個值都出現後即停止，
+不必等待整份 HTML 下載完畢，也不必建立 DOM 樹。
+"""
+import codecs
+from html.parser import HTMLParser
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from thsr_ticket.configs.web.parse_html_element import BOOKING_PAGE
+from thsr_ticket.view_model.parsed_page import ParsedPage
+
+_CAPTCHA_ID = BOOKING_PAGE["security_code_img"]["id"]
+_SEAT_PREFER_ID = BOOKING_PAGE["seat_prefer_radio"]["id"]
+_TYPES_OF_TRIP_ID = BOOKING_PAGE["types_of_trip"]["id"]
+_SEARCH_BY_NAME = BOOKING_PAGE["search_by_radio"]["attrs"]["name"]
+
+
+class BookingPageDefaults(NamedTuple):
+    security_img_src: str
+    seat_prefer: str
+    types_of_trip: int
+    search_by: str
+
+
+class BookingPageParser(HTMLParser):
+    """邊接收邊解析訂票首頁，取得表單預設值後 `done` 即為 True"""
+
+    def __init__(self) -> None:
+        super(BookingPageParser, self).__init__()
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._pending: Optional[str] = None  # 等待下一個 selected 選項的欄位
+        self.security_img_src: Optional[str] = None
+        self.seat_prefer: Optional[str] = None
+        self.types_of_trip: Optional[int] = None
+        self.search_by: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return None not in (self.security_img_src, self.seat_prefer, self.types_of_trip, self.search_by)
+
+    def feed_bytes(self, data: bytes) -> bool:
+        """餵入一段回應內容，回傳是否已取得全部預設值"""
+        if not self.done:
+            self.feed(self._decoder.decode(data))
+        return self.done
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        attr_map = dict(attrs)
+        elem_id = attr_map.get("id")
+        if elem_id == _CAPTCHA_ID:
+            self.security_img_src = attr_map.get("src")
+        elif elem_id == _SEAT_PREFER_ID and self.seat_prefer is None:
+            self._pending = "seat_prefer"
+        elif elem_id == _TYPES_OF_TRIP_ID and self.types_of_trip is None:
+            self._pending = "types_of_trip"
+        elif self._pending and attr_map.get("selected") == "selected":
+            value = attr_map.get("value")
+            if self._pending == "seat_prefer":
+                self.seat_prefer = value
+            else:
+                self.types_of_trip = int(value)
+            self._pending = None
+
+        if (
+            tag == "input"
+            and attr_map.get("name") == _SEARCH_BY_NAME
+            and "checked" in attr_map
+            and self.search_by is None
+        ):
+            self.search_by = attr_map.get("value")
+
+    def result(self) -> BookingPageDefaults:
+        return BookingPageDefaults(
+            security_img_src=self.security_img_src,
+            seat_prefer=self.seat_prefer,
+            types_of_trip=self.types_of_trip,
+            search_by=self.search_by,
+        )
+
+
+class StreamedBookingPage:
+    """串流中的訂票首頁
+
+    建立時只讀取到能取得 `defaults` 為止，剩餘內容留在連線上，
+    呼叫端可以先去下載驗證碼圖片，之後再以 `release()` 讀完剩餘內容、歸還連線。
+    """
+
+    def __init__(self, chunks: Iterator[bytes]) -> None:
+        self._chunks = chunks
+        self._received: List[bytes] = []
+        self._page: Optional[ParsedPage] = None
+        self.defaults = self._parse()
+
+    def _parse(self) -> BookingPageDefaults:
+        parser = BookingPageParser()
+        for chunk in self._chunks:
+            self._received.append(chunk)
+            if parser.feed_bytes(chunk):
+                return parser.result()
+        # 串流解析未能取得全部欄位（頁面結構改變等），改用完整 DOM 解析
+        return booking_page_defaults(self.page)
+
+    @property
+    def bytes_read(self) -> int:
+        return sum(len(chunk) for chunk in self._received)
+
+    def release(self) -> None:
+        """讀完剩餘內容，讓連線回到 connection pool"""
+        self._received.extend(self._chunks)
+
+    @property
+    def html(self) -> bytes:
+        self.release()
+        return b"".join(self._received)
+
+    @property
+    def page(self) -> ParsedPage:
+        if self._page is None:
+            self._page = ParsedPage(self.html)
+        return self._page
+
+
+def booking_page_defaults(page: ParsedPage) -> BookingPageDefaults:
+    """以完整 DOM 解析取得訂票首頁的預設值"""
+    fields = page.find_fields(BOOKING_PAGE)
+    return BookingPageDefaults(
+        security_img_src=fields["security_code_img"]["src"],
+        seat_prefer=fields["seat_prefer_radio"].find_next(selected="selected").attrs["value"],
+        types_of_trip=int(fields["types_of_trip"].find_next(selected="selected").attrs["value"]),
+        search_by=fields["search_by_radio"].attrs["value"],
+    )
@@ -4,7 +4,9 @@ from collections import namedtuple
 from bs4 import BeautifulSoup
 
 from thsr_ticket.view_model.abstract_view_model import AbstractViewModel
-from thsr_ticket.configs.web.parse_html_element import BOOKING_RESULT
+from thsr_ticket.view_model.parsed_page import ParsedPage, PageSource
+from thsr_ticket.view_model.spec_compiler import compile_spec
+from thsr_ticket.configs.web.parse_html_element import BOOKING_RESULT, TICKET_CARD
 
 Ticket = namedtuple("Ticket", [
         "id", "price", "start_station", "dest_station", "train_id", "depart_time", "arrival_time",
@@ -12,26 +14,33 @@ Ticket = namedtuple("Ticket", [
 ])
 
 
+# 回程車票區塊中的欄位，條件與去程相同
+_CARD_FIELDS: Mapping[str, Mapping[str, Any]] = {
+    name: BOOKING_RESULT[name] for name in ("seat_num", "seat_class", "depart_station", "arrival_station", "date")
+}
+
+
 class BookingResult(AbstractViewModel):
     def __init__(self) -> None:
         super(BookingResult, self).__init__()
         self.ticket: Ticket = None
 
-    def parse(self, html: bytes) -> List[Ticket]:
-        page = self._parser(html)
-        booking_id = page.find(**BOOKING_RESULT["ticket_id"]).find("span").text
-        deadline = page.find(**BOOKING_RESULT["payment_deadline"]).find_next(text='（付款期限：').find_next().text
-        total_price = page.find(**BOOKING_RESULT["total_price"]).text
-        train_id = page.find(**BOOKING_RESULT["train_id"]).text
-        depart_time = page.find(**BOOKING_RESULT["depart_time"]).text
-        arrival_time = page.find(**BOOKING_RESULT["arrival_time"]).text
-        seat_num = page.find(**BOOKING_RESULT["seat_num"]).find_next().text
-        seat_class = page.find(**BOOKING_RESULT["seat_class"]).find_next().text
-        depart_station = page.find(**BOOKING_RESULT["depart_station"]).find_next().text
-        arrival_station = page.find(**BOOKING_RESULT["arrival_station"]).find_next().text
-        ticket_num_info = page.find(**BOOKING_RESULT["ticket_num"]).find_next().text
+    def parse(self, page: PageSource) -> List[Ticket]:
+        """解析訂位結果，去回程時回傳去程與回程兩張車票（訂位代號、票數與總價相同）"""
+        fields = ParsedPage.of(page).find_fields(BOOKING_RESULT)
+        booking_id = fields["ticket_id"].find("span").text
+        deadline = fields["payment_deadline"].find_next(string='（付款期限：').find_next().text
+        total_price = fields["total_price"].text
+        train_id = fields["train_id"].text
+        depart_time = fields["depart_time"].text
+        arrival_time = fields["arrival_time"].text
+        seat_num = fields["seat_num"].find_next().text
+        seat_class = fields["seat_class"].find_next().text
+        depart_station = fields["depart_station"].find_next().text
+        arrival_station = fields["arrival_station"].find_next().text
+        ticket_num_info = fields["ticket_num"].find_next().text
         ticket_num_info = ticket_num_info.strip().replace('\xa0', ' ')
-        date = page.find(**BOOKING_RESULT["date"]).find_next().text
+        date = fields["date"].find_next().text
         self.ticket = Ticket(
             id=booking_id,
             payment_deadline=deadline,
@@ -46,7 +55,23 @@ class BookingResult(AbstractViewModel):
             dest_station=arrival_station,
             date=date,
         )
-        return [self.ticket]
+        if fields["inbound_train_id"] is None:
+            return [self.ticket]
+        return [self.ticket, self._parse_inbound(fields)]
+
+    def _parse_inbound(self, fields: Mapping[str, Any]) -> Ticket:
+        card = fields["inbound_train_id"].find_parent(**TICKET_CARD)
+        card_fields = compile_spec(_CARD_FIELDS).extract(card)
+        return self.ticket._replace(
+            train_id=fields["inbound_train_id"].text,
+            depart_time=fields["inbound_depart_time"].text,
+            arrival_time=fields["inbound_arrival_time"].text,
+            seat=card_fields["seat_num"].find_next().text,
+            seat_class=card_fields["seat_class"].find_next().text,
+            start_station=card_fields["depart_station"].find_next().text,
+            dest_station=card_fields["arrival_station"].find_next().text,
+            date=card_fields["date"].find_next().text,
+        )
 
     def parse_ticket_num(self, page: BeautifulSoup) -> str:
         tags = page.find(**BOOKING_RESULT["ticket_num"]).find_next_siblings()
@@ -2,6 +2,7 @@ from typing import List
 from collections import namedtuple
 
 from thsr_ticket.view_model.abstract_view_model import AbstractViewModel
+from thsr_ticket.view_model.parsed_page import ParsedPage, PageSource
 from thsr_ticket.configs.web.parse_html_element import ERROR_FEEDBACK
 
 Error = namedtuple("Error", ["msg"])
@@ -12,9 +13,15 @@ class ErrorFeedback(AbstractViewModel):
         super(ErrorFeedback, self).__init__()
         self.errors: List[Error] = []
 
-    def parse(self, html: bytes) -> List[Error]:
-        page = self._parser(html)
-        items = page.find_all(**ERROR_FEEDBACK)
+    def parse(self, page: PageSource) -> List[Error]:
+        """解析頁面中的錯誤訊息，每次呼叫都重新開始（不保留上一個頁面的結果）"""
+        self.errors = []
+        page = ParsedPage.of(page)
+        if page.scan.errors is not None:
+            self.errors.extend(Error(msg) for msg in page.scan.errors)
+            return self.errors
+
+        items = self._parser(page).find_all(**ERROR_FEEDBACK)
         for it in items:
             self.errors.append(Error(it.text))
 
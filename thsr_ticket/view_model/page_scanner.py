@@ -0,0 +1,133 @@
+"""不建立 DOM 的快速頁面判讀
+
+以預先編譯的 bytes 正規表示式判斷回應屬於哪一頁，並取出錯誤訊息與驗證碼圖片網址。
+驗證碼重試時每次都要判讀，因此盡量避免完整解析；當掃描結果無法確定時（例如錯誤訊息
+內含其他標籤），對應欄位會是 None，由呼叫端改用完整的 DOM 解析。
+
+`train_list_digest` 只取班次清單中與班次有關的片段計算摘要，監看模式以此判斷清單是否與上一次相同。
+"""
+import hashlib
+import html as html_lib
+import re
+from enum import Enum
+from typing import List, NamedTuple, Optional
+
+from thsr_ticket.configs.web.parse_html_element import BOOKING_PAGE, ERROR_FEEDBACK
+
+
+class PageKind(Enum):
+    BOOKING_FORM = "booking_form"
+    TRAIN_LIST = "train_list"
+    PASSENGER_FORM = "passenger_form"
+    RESULT = "result"
+    ERROR = "error"
+    UNKNOWN = "unknown"
+
+
+class PageScan(NamedTuple):
+    kind: PageKind
+    errors: Optional[List[str]]  # None 表示無法判定，需完整解析
+    captcha_src: Optional[str]  # None 表示頁面上找不到或無法判定
+
+
+# 依優先順序檢查，越後面的頁面越早出現在流程中
+_KIND_MARKERS = (
+    (PageKind.RESULT, b'class="pnr-code"'),
+    (PageKind.PASSENGER_FORM, b'BookingS3Form'),
+    (PageKind.TRAIN_LIST, b'TrainQueryDataViewPanel'),
+)
+_BOOKING_FORM_MARKER = b'BookingS1Form'
+
+_ERROR_CLASS = ERROR_FEEDBACK["attrs"]["class"].encode()
+_ERROR_TAG = ERROR_FEEDBACK["name"].encode()
+_ERROR_START = re.compile(
+    rb'<(\w+)\b[^>]*?\bclass\s*=\s*["\']?[^"\'>]*\b' + re.escape(_ERROR_CLASS) + rb'\b[^>]*>',
+    re.I,
+)
+_ERROR_END = re.compile(rb'</' + re.escape(_ERROR_TAG) + rb'\s*>', re.I)
+
+_CAPTCHA_ID = BOOKING_PAGE["security_code_img"]["id"].encode()
+_CAPTCHA_TAG = re.compile(
+    rb'<\w+\b[^>]*?\bid\s*=\s*["\']?' + re.escape(_CAPTCHA_ID) + rb'(?=["\'\s/>])[^>]*>',
+    re.I,
+)
+_SRC_ATTR = re.compile(rb'\bsrc\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))', re.I)
+
+# 班次的選項（含車次、出發與抵達時刻的屬性）與優惠標記，依頁面順序
+_TRAIN_OPTION = rb'<input\b[^>]*?\bname\s*=\s*["\']?TrainQueryDataViewPanel2?:TrainGroup\b[^>]*>'
+_TRAIN_FRAGMENTS = re.compile(
+    _TRAIN_OPTION
+    + rb'|<p\b[^>]*?\bclass\s*=\s*["\']?(?:early-bird|student)\b[^>]*>\s*<span\b[^>]*>[^<]*',
+    re.I,
+)
+
+
+def scan_page(html: bytes) -> PageScan:
+    """掃描頁面，回傳頁面種類、錯誤訊息與驗證碼圖片網址"""
+    errors = _scan_errors(html)
+    return PageScan(
+        kind=_classify(html, errors),
+        errors=errors,
+        captcha_src=_scan_captcha_src(html),
+    )
+
+
+def _classify(html: bytes, errors: Optional[List[str]]) -> PageKind:
+    for kind, marker in _KIND_MARKERS:
+        if marker in html:
+            return kind
+    if errors is None or errors:
+        return PageKind.ERROR
+    if _BOOKING_FORM_MARKER in html:
+        return PageKind.BOOKING_FORM
+    return PageKind.UNKNOWN
+
+
+def _scan_errors(html: bytes) -> Optional[List[str]]:
+    if _ERROR_CLASS not in html:
+        return []
+
+    errors = []
+    for start in _ERROR_START.finditer(html):
+        if start.group(1).lower() != _ERROR_TAG:
+            continue
+        end = _ERROR_END.search(html, start.end())
+        if end is None:
+            return None
+        inner = html[start.end():end.start()]
+        if b'<' in inner:
+            # 含有巢狀標籤，交給完整解析處理
+            return None
+        try:
+            errors.append(html_lib.unescape(inner.decode("utf-8")))
+        except UnicodeDecodeError:
+            return None
+    return errors
+
+
+def _scan_captcha_src(html: bytes) -> Optional[str]:
+    if _CAPTCHA_ID not in html:
+        return None
+    tag = _CAPTCHA_TAG.search(html)
+    if tag is None:
+        return None
+    src = _SRC_ATTR.search(tag.group(0))
+    if src is None:
+        return None
+    value = next(group for group in src.groups() if group is not None)
+    return html_lib.unescape(value.decode("utf-8"))
+
+
+def train_list_digest(html: bytes) -> Optional[bytes]:
+    """班次清單的摘要，班次（車次、時刻、優惠）相同時摘要相同
+
+    Returns:
+        頁面上沒有班次選項時回傳 None
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    found = False
+    for fragment in _TRAIN_FRAGMENTS.finditer(html):
+        found = True
+        digest.update(fragment.group(0))
+        digest.update(b"\0")
+    return digest.digest() if found else None
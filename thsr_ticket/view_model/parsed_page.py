@@ -0,0 +1,78 @@
+"""單一回應頁面的解析快取
+
+同一個回應在訂票流程中會被多處使用（驗證碼網址、表單預設值、錯誤訊息、班次清單…），
+`ParsedPage` 讓這些地方共用同一棵 DOM 樹，每個 `Response` 只會被解析一次。
+"""
+from typing import Any, Dict, Mapping, Optional, Union
+
+from bs4 import BeautifulSoup
+from requests.models import Response
+
+from thsr_ticket.view_model.parser_backend import build_soup
+from thsr_ticket.view_model.page_scanner import PageScan, scan_page
+from thsr_ticket.view_model.spec_compiler import Fields, compile_spec
+
+
+_CACHE_ATTR = "_thsr_parsed_page"
+
+
+class ParsedPage:
+    """延遲解析的頁面物件
+
+    第一次存取 `soup` 時才建立 DOM 樹，之後重複使用。
+    `backend` 未指定時使用 `parser_backend` 目前的設定。
+    `scan` 為不建立 DOM 的快速判讀結果，能判定時應優先使用。
+    """
+
+    def __init__(self, html: bytes, backend: Optional[str] = None) -> None:
+        self.html = html
+        self.backend = backend
+        self._soup: BeautifulSoup = None
+        self._scan: PageScan = None
+        self._fields: Dict[int, Fields] = {}
+
+    @classmethod
+    def of(cls, source: "PageSource") -> "ParsedPage":
+        """取得對應的 ParsedPage
+
+        Args:
+            source: ParsedPage、requests 的 Response 或原始 HTML bytes
+
+        Returns:
+            ParsedPage: 若來源為 Response，結果會快取在該 Response 上
+        """
+        if isinstance(source, ParsedPage):
+            return source
+        if isinstance(source, Response):
+            page = getattr(source, _CACHE_ATTR, None)
+            if page is None:
+                page = cls(source.content)
+                setattr(source, _CACHE_ATTR, page)
+            return page
+        return cls(source)
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        if self._soup is None:
+            self._soup = build_soup(self.html, self.backend)
+        return self._soup
+
+    @property
+    def scan(self) -> PageScan:
+        if self._scan is None:
+            self._scan = scan_page(self.html)
+        return self._scan
+
+    def find_fields(self, specs: Mapping[str, Mapping[str, Any]]) -> Fields:
+        """以單次走訪找出 `specs` 中每個欄位的第一個符合元素（結果會快取）"""
+        key = id(specs)
+        if key not in self._fields:
+            self._fields[key] = compile_spec(specs).extract(self.soup)
+        return self._fields[key]
+
+    @property
+    def is_parsed(self) -> bool:
+        return self._soup is not None
+
+
+PageSource = Union[ParsedPage, Response, bytes]
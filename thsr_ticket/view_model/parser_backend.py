@@ -0,0 +1,68 @@
+"""HTML 解析器後端設定
+
+所有 DOM 解析都透過 `build_soup` 建立，方便統一切換 BeautifulSoup 的 tree builder。
+預設優先使用速度較快的 lxml，未安裝時退回 Python 內建的 html.parser。
+可透過環境變數 `THSR_HTML_PARSER` 或 `set_parser_backend()` 指定後端。
+"""
+import os
+from typing import List, Optional
+
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+
+# 依速度由快到慢排列，預設選用第一個可用的後端
+PARSER_BACKENDS = ("lxml", "html.parser")
+PARSER_ENV_VAR = "THSR_HTML_PARSER"
+
+_backend: Optional[str] = None
+
+
+def is_available(name: str) -> bool:
+    """檢查指定的解析器後端是否已安裝"""
+    return builder_registry.lookup(name) is not None
+
+
+def available_backends() -> List[str]:
+    """列出目前環境可用的解析器後端（依優先順序）"""
+    return [name for name in PARSER_BACKENDS if is_available(name)]
+
+
+def get_parser_backend() -> str:
+    """取得目前使用的解析器後端名稱"""
+    global _backend
+    if _backend is None:
+        _backend = _resolve(os.environ.get(PARSER_ENV_VAR))
+    return _backend
+
+
+def set_parser_backend(name: Optional[str]) -> str:
+    """設定解析器後端
+
+    Args:
+        name: 後端名稱（如 "lxml", "html.parser"），傳入 None 則回到預設值
+
+    Returns:
+        str: 實際採用的後端名稱
+
+    Raises:
+        ValueError: 若指定的後端不存在或未安裝
+    """
+    global _backend
+    _backend = _resolve(name)
+    return _backend
+
+
+def build_soup(html: bytes, backend: Optional[str] = None) -> BeautifulSoup:
+    """以指定（或目前設定）的後端建立 DOM 樹"""
+    return BeautifulSoup(html, features=backend or get_parser_backend())
+
+
+def _resolve(name: Optional[str]) -> str:
+    if not name:
+        # html.parser 為標準函式庫，必定可用
+        return available_backends()[0]
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"未知的 HTML 解析器: {name}。可用選項: {', '.join(PARSER_BACKENDS)}")
+    if not is_available(name):
+        raise ValueError(f"HTML 解析器 {name} 未安裝")
+    return name
@@ -0,0 +1,161 @@
+"""將宣告式的元素選擇條件編譯成單次走訪的萃取器
+
+`configs/web` 中的選擇條件（如 `BOOKING_RESULT`、`ParseAvailTrain`）原本是逐一交給
+`page.find(**spec)`，每個欄位都要從根節點重新走訪一次 DOM 樹。這裡把所有條件依
+id、class、標籤名稱與文字建立索引，只走訪一次就填滿全部欄位。
+
+支援的條件與 `find()` 相同的子集：`name`、`id`、`attrs`（值為 True 表示屬性存在）、
+`text` / `string`，以及其他以關鍵字傳入的屬性。
+"""
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from bs4.element import NavigableString, PageElement, Tag
+
+Fields = Dict[str, Optional[PageElement]]
+
+
+class _Matcher:
+    def __init__(self, field: str, spec: Mapping[str, Any]) -> None:
+        spec = dict(spec)
+        self.field = field
+        self.name: Optional[str] = spec.pop("name", None)
+        self.text: Optional[str] = spec.pop("text", spec.pop("string", None))
+        attrs = dict(spec.pop("attrs", {}))
+        attrs.update(spec)
+        self.attrs: Dict[str, Any] = attrs
+
+    @property
+    def matches_string(self) -> bool:
+        """只有文字條件時，比對的是文字節點本身（與 `find(text=...)` 相同）"""
+        return self.text is not None and self.name is None and not self.attrs
+
+    def match(self, tag: Tag) -> bool:
+        if self.name is not None and tag.name != self.name:
+            return False
+        for key, expected in self.attrs.items():
+            actual = tag.attrs.get(key)
+            if expected is True:
+                if actual is None:
+                    return False
+            elif isinstance(actual, list):
+                if expected not in actual and expected != " ".join(actual):
+                    return False
+            elif actual != expected:
+                return False
+        return self.text is None or tag.string == self.text
+
+
+class _Index:
+    """依 id / class / 標籤名稱 / 文字分桶，讓每個節點只需比對少數候選條件"""
+
+    def __init__(self, matchers: List[_Matcher]) -> None:
+        self.by_id: Dict[str, List[_Matcher]] = {}
+        self.by_class: Dict[str, List[_Matcher]] = {}
+        self.by_name: Dict[str, List[_Matcher]] = {}
+        self.by_text: Dict[str, List[_Matcher]] = {}
+        self.generic: List[_Matcher] = []
+        for m in matchers:
+            if m.matches_string:
+                self.by_text.setdefault(m.text, []).append(m)
+            elif isinstance(m.attrs.get("id"), str):
+                self.by_id.setdefault(m.attrs["id"], []).append(m)
+            elif isinstance(m.attrs.get("class"), str) and " " not in m.attrs["class"]:
+                self.by_class.setdefault(m.attrs["class"], []).append(m)
+            elif m.name is not None:
+                self.by_name.setdefault(m.name, []).append(m)
+            else:
+                self.generic.append(m)
+
+    def candidates(self, node: PageElement) -> Iterator[_Matcher]:
+        if isinstance(node, Tag):
+            attrs = node.attrs
+            if "id" in attrs:
+                yield from self.by_id.get(attrs["id"], ())
+            classes = attrs.get("class")
+            if classes:
+                for cls in classes:
+                    yield from self.by_class.get(cls, ())
+            yield from self.by_name.get(node.name, ())
+            yield from self.generic
+        elif self.by_text and isinstance(node, NavigableString):
+            yield from self.by_text.get(str(node), ())
+
+
+def _walk(root: Tag) -> Iterator[Tuple[PageElement, bool]]:
+    """深度優先走訪，進入節點時產生 (node, True)，離開 Tag 時產生 (tag, False)"""
+    stack = [(root, iter(root.contents))]
+    while stack:
+        parent, children = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            yield parent, False
+            continue
+        yield child, True
+        if isinstance(child, Tag):
+            stack.append((child, iter(child.contents)))
+
+
+class CompiledSpec:
+    """多個欄位條件的單次走訪萃取器，每個欄位取文件順序中的第一個符合節點"""
+
+    def __init__(self, specs: Mapping[str, Mapping[str, Any]]) -> None:
+        self.fields = list(specs)
+        self._index = _Index([_Matcher(field, spec) for field, spec in specs.items()])
+
+    def extract(self, root: Tag) -> Fields:
+        found: Fields = dict.fromkeys(self.fields)
+        remaining = len(self.fields)
+        for node in root.descendants:
+            for m in self._index.candidates(node):
+                if found[m.field] is None and (m.matches_string or m.match(node)):
+                    found[m.field] = node
+                    remaining -= 1
+                    if remaining == 0:
+                        return found
+        return found
+
+
+class CompiledGroupSpec:
+    """重複區塊（如班次清單中的每一列）的單次走訪萃取器
+
+    每遇到一個符合 `group` 的元素就開始一筆新紀錄，並在離開該元素前把其子孫中
+    第一個符合各欄位條件的節點填入紀錄中。
+    """
+
+    def __init__(self, group: Mapping[str, Any], specs: Mapping[str, Mapping[str, Any]]) -> None:
+        self.fields = list(specs)
+        self._group = _Matcher("", group)
+        self._index = _Index([_Matcher(field, spec) for field, spec in specs.items()])
+
+    def extract_groups(self, root: Tag) -> List[Fields]:
+        groups: List[Fields] = []
+        current: Optional[Fields] = None
+        owner: Optional[Tag] = None
+        for node, entering in _walk(root):
+            if not entering:
+                if node is owner:
+                    current = owner = None
+                continue
+            if current is None:
+                if isinstance(node, Tag) and self._group.match(node):
+                    current = dict.fromkeys(self.fields)
+                    owner = node
+                    groups.append(current)
+                continue
+            for m in self._index.candidates(node):
+                if current[m.field] is None and (m.matches_string or m.match(node)):
+                    current[m.field] = node
+        return groups
+
+
+_compiled: Dict[int, Tuple[Mapping[str, Any], CompiledSpec]] = {}
+
+
+def compile_spec(specs: Mapping[str, Mapping[str, Any]]) -> CompiledSpec:
+    """編譯並快取模組層級的選擇條件（以物件身分為鍵）"""
+    entry = _compiled.get(id(specs))
+    if entry is None or entry[0] is not specs:
+        entry = (specs, CompiledSpec(specs))
+        _compiled[id(specs)] = entry
+    return entry[1]
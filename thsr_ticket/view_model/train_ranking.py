@@ -0,0 +1,115 @@
+"""班次排序
+
+把第二頁解析出的 `Train` 一次轉成整數鍵（出發、抵達與乘車分鐘數、優惠旗標），
+再依 `RankingPolicy` 過濾並計分，單次走訪即可選出最佳班次，不必先排序整份清單。
+
+分數（越小越好）＝ 乘車分鐘 × travel_weight
+                 ＋ 比時段起點晚出發的分鐘 × depart_weight
+                 − 有早鳥或大學生優惠時的 discount_bonus（prefer_discount 開啟時）
+
+同分時取頁面上較前面的班次。預設的 policy 即為「乘車時間最短」。
+"""
+from typing import FrozenSet, List, NamedTuple, Optional, Sequence, Tuple
+
+from thsr_ticket.configs.web.param_schema import Train
+
+MINUTES_PER_DAY = 24 * 60
+UNPARSABLE_MINUTES = 9999  # 無法解析的時間排在最後
+
+
+def clock_minutes(clock: str) -> int:
+    """"HH:MM" 轉為分鐘數，無法解析時回傳 `UNPARSABLE_MINUTES`"""
+    parts = clock.split(":")
+    if len(parts) != 2:
+        return UNPARSABLE_MINUTES
+    try:
+        return int(parts[0]) * 60 + int(parts[1])
+    except ValueError:
+        return UNPARSABLE_MINUTES
+
+
+class TrainKey(NamedTuple):
+    depart: int  # 出發時刻（午夜起算的分鐘）
+    arrive: int  # 抵達時刻，跨午夜時加上一天
+    travel: int  # 乘車分鐘
+    early_bird: bool
+    student: bool
+    train_id: int
+
+    @classmethod
+    def of(cls, train: Train) -> "TrainKey":
+        depart = clock_minutes(train.depart)
+        arrive = clock_minutes(train.arrive)
+        if arrive < depart:
+            arrive += MINUTES_PER_DAY
+        return cls(
+            depart=depart,
+            arrive=arrive,
+            travel=clock_minutes(train.travel_time),
+            early_bird=train.early_bird,
+            student=train.student_discount,
+            train_id=train.id,
+        )
+
+    @property
+    def discounted(self) -> bool:
+        return self.early_bird or self.student
+
+
+class RankingPolicy(NamedTuple):
+    """選車條件，時刻皆為午夜起算的分鐘數（見 `user_config.parse_train_policy`）"""
+    depart_after: Optional[int] = None  # 最早出發時刻
+    depart_before: Optional[int] = None  # 最晚出發時刻
+    arrive_by: Optional[int] = None  # 最晚抵達時刻
+    prefer_discount: bool = False
+    train_ids: Sequence[int] = ()  # 只考慮這些車次（空白表示不限）
+    exclude_train_ids: Sequence[int] = ()  # 排除的車次
+    travel_weight: int = 1
+    depart_weight: int = 0
+    discount_bonus: int = 30
+
+
+class TrainRanker:
+    def __init__(self, policy: RankingPolicy = RankingPolicy()) -> None:
+        self.policy = policy
+        self._allow: FrozenSet[int] = frozenset(policy.train_ids)
+        self._deny: FrozenSet[int] = frozenset(policy.exclude_train_ids)
+        self._window_start = policy.depart_after or 0
+
+    def eligible(self, key: TrainKey) -> bool:
+        p = self.policy
+        if self._allow and key.train_id not in self._allow:
+            return False
+        if key.train_id in self._deny:
+            return False
+        if p.depart_after is not None and key.depart < p.depart_after:
+            return False
+        if p.depart_before is not None and key.depart > p.depart_before:
+            return False
+        if p.arrive_by is not None and key.arrive > p.arrive_by:
+            return False
+        return True
+
+    def score(self, key: TrainKey) -> int:
+        p = self.policy
+        score = key.travel * p.travel_weight + max(key.depart - self._window_start, 0) * p.depart_weight
+        if p.prefer_discount and key.discounted:
+            score -= p.discount_bonus
+        return score
+
+    def best(self, trains: Sequence[Train]) -> Optional[Train]:
+        """符合條件且分數最低的班次，沒有符合的班次時回傳 None"""
+        best: Optional[Tuple[int, int]] = None
+        for idx, train in enumerate(trains):
+            key = TrainKey.of(train)
+            if not self.eligible(key):
+                continue
+            candidate = (self.score(key), idx)
+            if best is None or candidate < best:
+                best = candidate
+        return None if best is None else trains[best[1]]
+
+    def rank(self, trains: Sequence[Train]) -> List[Train]:
+        """符合條件的班次，依分數排序"""
+        keyed = [(self.score(key), idx) for idx, key in enumerate(map(TrainKey.of, trains)) if self.eligible(key)]
+        return [trains[idx] for _, idx in sorted(keyed)]